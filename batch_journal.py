@@ -0,0 +1,206 @@
+"""
+Batch Journal Module
+Append-only checkpoint journal that makes batch runs crash-safe and resumable
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Item statuses
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_REJECTED = "rejected"
+STATUS_DEFERRED = "deferred"
+
+# Items in these states are never re-processed on resume
+FINAL_STATUSES = {STATUS_DONE, STATUS_REJECTED, STATUS_DEFERRED}
+
+# Journal file of one GUI batch inside JOURNAL_DIR
+JOURNAL_NAME_PATTERN = "batch_journal_{batch_id}.jsonl"
+
+# Line appended once a run has gone through all of its input
+FINISHED_EVENT = "finished"
+
+
+def batch_journal_path(directory, batch_id: str) -> Path:
+    """Return the journal file of a batch"""
+    return Path(directory) / JOURNAL_NAME_PATTERN.format(batch_id=batch_id)
+
+
+def latest_batch_journal(directory) -> Optional[Path]:
+    """Return the journal of the most recently started batch, or None"""
+    paths = sorted(Path(directory).glob(JOURNAL_NAME_PATTERN.format(batch_id="*")))
+    return paths[-1] if paths else None
+
+
+class BatchJournal:
+    """
+    Append-only journal keyed by YouTube video ID.
+
+    Every status change is written as one JSON line and fsync'd before the
+    call returns. The latest line for a video ID wins when the journal is
+    replayed, so resuming a batch only re-queues failed or pending items.
+    A run that went through all of its input appends a "finished" line;
+    unfinished() tells whether starting over would discard work.
+    Only the status, URL and line number of each video's latest entry are
+    held in memory; recipes stay on disk and are streamed back from their
+    lines when a batch is resumed, so memory does not grow with them.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        # video_id -> (status, url, line number of the latest entry)
+        self._entries: Dict[str, Tuple[str, str, int]] = {}
+        self._lines = 0
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Tuple[str, str, int]]:
+        """
+        Replay the journal file into memory
+
+        Returns:
+            dict: (status, url, line number) of the latest entry per video ID, in first-seen order
+        """
+        self._entries = {}
+        self._lines = 0
+        self.finished = False
+        if not self.path.exists():
+            return self._entries
+
+        for line_number, entry in self._read(repair=True):
+            self._lines = line_number + 1
+            if entry is None:
+                continue
+            if entry.get("event") == FINISHED_EVENT:
+                self.finished = True
+                continue
+            self.finished = False
+            self._entries[entry["videoId"]] = (entry["status"], entry["url"], line_number)
+
+        return self._entries
+
+    def _read(self, repair: bool = False) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """
+        Yield (line number, entry or None for blank and unreadable lines)
+
+        Args:
+            repair: Cut off a torn last line (from a crash mid-write), so the
+                next append starts on a line of its own
+        """
+        with open(self.path, "rb") as f:
+            complete = 0
+            for line_number, raw in enumerate(f):
+                if not raw.endswith(b"\n"):
+                    if repair:
+                        os.truncate(self.path, complete)
+                    return
+                complete += len(raw)
+                try:
+                    entry = json.loads(raw) if raw.strip() else None
+                except json.JSONDecodeError:
+                    entry = None
+                yield line_number, entry
+
+    def start(self, urls: List[str], video_ids: List[str], resume: bool = False):
+        """
+        Begin a batch, registering every URL as pending
+
+        Args:
+            urls: YouTube URLs of the batch
+            video_ids: Video ID for each URL
+            resume: Keep the existing journal and only add unseen videos
+        """
+        if resume:
+            self.load()
+        else:
+            self._entries = {}
+            self._lines = 0
+            self.finished = False
+            self.path.write_bytes(b"")
+
+        for url, video_id in zip(urls, video_ids):
+            if video_id not in self._entries:
+                self.record(video_id, url, STATUS_PENDING)
+
+    def record(self, video_id: str, url: str, status: str,
+               recipe: Optional[Dict] = None, error: Optional[str] = None):
+        """
+        Append a status change for a video and force it to disk
+
+        Args:
+            video_id: YouTube video ID
+            url: YouTube URL
+            status: One of the STATUS_* constants
+            recipe: Extracted recipe (for completed items)
+            error: Error message (for failed items)
+        """
+        entry = {
+            "videoId": video_id,
+            "url": url,
+            "status": status,
+            "updatedAt": datetime.utcnow().isoformat() + "Z"
+        }
+        if recipe is not None:
+            entry["recipe"] = recipe
+        if error is not None:
+            entry["error"] = error
+
+        with self._lock:
+            line_number = self._append(entry)
+            self.finished = False
+            self._entries[video_id] = (status, url, line_number)
+
+    def finish(self):
+        """Mark the run as having gone through all of its input"""
+        with self._lock:
+            self._append({"event": FINISHED_EVENT, "updatedAt": datetime.utcnow().isoformat() + "Z"})
+            self.finished = True
+
+    def unfinished(self) -> bool:
+        """Replay the journal; True when it holds items of a run that never finished"""
+        self.load()
+        return bool(self._entries) and not self.finished
+
+    def _append(self, entry: Dict) -> int:
+        """Write one line (caller holds the lock); returns its line number"""
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._lines += 1
+        return self._lines - 1
+
+    def status(self, video_id: str) -> Optional[str]:
+        """Return the latest status recorded for a video, or None"""
+        entry = self._entries.get(video_id)
+        return entry[0] if entry else None
+
+    def unfinished_urls(self) -> List[str]:
+        """Return URLs of pending or failed items, in journal order"""
+        return [url for status, url, _ in self._entries.values() if status not in FINAL_STATUSES]
+
+    def deferred_entries(self) -> Iterator[Tuple[str, str, Dict]]:
+        """Stream (video_id, url, recipe) for every item still waiting for review"""
+        for entry in self._latest_recipes(STATUS_DEFERRED):
+            yield entry["videoId"], entry["url"], entry["recipe"]
+
+    def completed_recipes(self) -> Iterator[Dict]:
+        """Stream the recipes of every completed item, in journal order"""
+        for entry in self._latest_recipes(STATUS_DONE):
+            yield entry["recipe"]
+
+    def _latest_recipes(self, status: str) -> Iterator[Dict]:
+        """Re-read the journal and yield the latest entries with this status that carry a recipe"""
+        if not self.path.exists():
+            return
+        wanted = {line_number for entry_status, _, line_number in self._entries.values() if entry_status == status}
+        for line_number, entry in self._read():
+            if line_number in wanted and entry is not None and "recipe" in entry:
+                yield entry
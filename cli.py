@@ -0,0 +1,412 @@
+"""
+YouTube Recipe Generator - Command Line Runner
+Headless batch extraction for servers (does not import tkinter)
+
+Usage:
+    python cli.py --input urls.txt --concurrency 8 --output output/recipes.jsonl.zst
+    cat urls.txt | python cli.py --no-transcript defer
+    python cli.py --input videos.csv --rejects output/bad_lines.txt
+    python cli.py --input urls.txt --lookahead 1000
+    python cli.py --input urls.txt --concurrency 2 --max-concurrency 16
+    python cli.py --search "ciorbă" --tag vegan --cuisine italian --max-time 30
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import (
+    AVAILABLE_TAGS,
+    OUTPUT_DIR,
+    CLI_JOURNAL_FILE,
+    RECIPE_STORE_FILE,
+    TRANSCRIPT_DIR,
+    MODEL_TIERS,
+    HEDGE_PERCENTILE,
+    HEDGE_BUDGET,
+    SCHEDULER_LOOKAHEAD,
+    CONCURRENCY_INITIAL,
+    CONCURRENCY_MAX,
+    CONCURRENCY_THROTTLE_RETRIES,
+    EXPORT_SHARD_MAX_BYTES,
+    EXPORT_SHARD_MAX_RECIPES,
+    NUTRITION_SOURCE,
+    ensure_dirs,
+    select_tiers,
+    load_api_key
+)
+from gemini_service import call_gemini_api
+from recipe_pipeline import (
+    process_url,
+    CascadeStats,
+    RESULT_ACCEPTED,
+    RESULT_NEEDS_REVIEW,
+    RESULT_INVALID,
+    POLICY_ACCEPT,
+    POLICY_REJECT,
+    POLICY_DEFER,
+    NO_TRANSCRIPT_POLICIES
+)
+from recipe_store import RecipeStore
+from url_ingest import UrlIngestor, open_url_file
+from transcripts import SavingsTracker
+from hedging import HedgedExtractor
+from scheduler import JobScheduler, CostEstimator
+from concurrency import AdaptiveLimiter, should_retry
+from nutrition import get_calculator, NUTRITION_SOURCE_LOCAL
+from export_writer import JsonlExportWriter, ShardedExportWriter
+from batch_journal import (
+    BatchJournal,
+    FINAL_STATUSES,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_REJECTED,
+    STATUS_DEFERRED
+)
+
+
+def log(message: str):
+    """Write a progress line to stderr (stdout stays free for piping)"""
+    print(message, file=sys.stderr, flush=True)
+
+
+def load_tags(tags_file) -> list:
+    """Read comma or newline separated tags, defaulting to AVAILABLE_TAGS"""
+    if not tags_file:
+        return AVAILABLE_TAGS
+    with open(tags_file, "r", encoding="utf-8") as f:
+        content = f.read().replace("\n", ",")
+    return [tag.strip() for tag in content.split(",") if tag.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Extract recipes from YouTube videos without the GUI"
+    )
+    parser.add_argument("--input", "-i", default="-",
+                        help="Text or CSV file with YouTube URLs ('-' for stdin, default)")
+    parser.add_argument("--rejects", default=None,
+                        help="File for input lines without a YouTube URL (default: output/rejected_urls_<ts>.txt)")
+    parser.add_argument("--api-key", default=None,
+                        help="Gemini API key (default: GEMINI_API_KEY or the saved .env key)")
+    parser.add_argument("--tags-file", default=None,
+                        help="File with the allowed tags (default: built-in Mealee tags)")
+    parser.add_argument("--concurrency", "-c", type=int, default=CONCURRENCY_INITIAL,
+                        help="Videos processed in parallel at the start; adapted to latency and throttling "
+                             f"(default: {CONCURRENCY_INITIAL})")
+    parser.add_argument("--max-concurrency", type=int, default=CONCURRENCY_MAX,
+                        help=f"Upper bound of the adaptive concurrency (default: {CONCURRENCY_MAX})")
+    parser.add_argument("--fixed-concurrency", action="store_true",
+                        help="Keep --concurrency fixed instead of adapting it")
+    parser.add_argument("--output", "-o", default=None,
+                        help="Streaming export file (.json, .jsonl, optionally .gz/.zst)")
+    parser.add_argument("--store", default=None,
+                        help=f"SQLite recipe store (default when --output is not given: {RECIPE_STORE_FILE})")
+    parser.add_argument("--no-transcript", choices=NO_TRANSCRIPT_POLICIES, default=POLICY_DEFER,
+                        help="What to do with recipes generated without a transcript (default: defer)")
+    parser.add_argument("--deferred-output", default=None,
+                        help="JSONL file for deferred recipes (default: output/recipes_deferred_<ts>.jsonl)")
+    parser.add_argument("--journal", default=str(CLI_JOURNAL_FILE),
+                        help=f"Checkpoint journal (default: {CLI_JOURNAL_FILE})")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip videos already completed in the journal")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Discard the journal of an unfinished earlier run and start over")
+    parser.add_argument("--transcripts", default=str(TRANSCRIPT_DIR),
+                        help="Directory with <video_id>.vtt/.srt/.txt transcripts used instead of video analysis "
+                             f"(default: {TRANSCRIPT_DIR})")
+    parser.add_argument("--tiers", default=None,
+                        help="Comma separated model tiers to cascade through "
+                             f"(default: {','.join(tier['name'] for tier in MODEL_TIERS)})")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Send a duplicate request when a call is slower than recent calls")
+    parser.add_argument("--hedge-percentile", type=float, default=HEDGE_PERCENTILE,
+                        help=f"Latency percentile that triggers a hedge (default: {HEDGE_PERCENTILE})")
+    parser.add_argument("--hedge-budget", type=float, default=HEDGE_BUDGET,
+                        help=f"Maximum extra requests as a fraction of all calls (default: {HEDGE_BUDGET})")
+    parser.add_argument("--lookahead", type=int, default=SCHEDULER_LOOKAHEAD,
+                        help="Input URLs read ahead and ordered shortest-job-first "
+                             f"(1 keeps input order, default: {SCHEDULER_LOOKAHEAD})")
+    parser.add_argument("--fake-backend", action="store_true",
+                        help="Use the deterministic local fake instead of Gemini")
+
+    query = parser.add_argument_group("search the recipe store instead of extracting (prints JSON Lines)")
+    query.add_argument("--search", nargs="?", const="", default=None, metavar="TEXT",
+                       help="Full-text query over title, description, ingredients and instructions")
+    query.add_argument("--tag", action="append", default=[], help="Required tag (repeatable)")
+    query.add_argument("--category", default=None, help="Exact category")
+    query.add_argument("--cuisine", default=None, help="Exact cuisine")
+    query.add_argument("--difficulty", default=None, help="Exact difficulty")
+    query.add_argument("--max-time", type=int, default=None, help="Maximum totalTime in minutes")
+    query.add_argument("--limit", type=int, default=100, help="Maximum recipes printed (default: 100)")
+    return parser
+
+
+def is_search(args) -> bool:
+    return (args.search is not None or bool(args.tag) or args.max_time is not None
+            or any(value is not None for value in (args.category, args.cuisine, args.difficulty)))
+
+
+def search(args) -> int:
+    """
+    Print the stored recipes matching the query options, one JSON object per line
+
+    Returns:
+        int: Process exit code
+    """
+    store_path = args.store or RECIPE_STORE_FILE
+    if not os.path.exists(store_path):
+        log(f"Error: recipe store not found: {store_path}")
+        return 1
+
+    store = RecipeStore(store_path)
+    try:
+        recipes = store.search(text=args.search or None, tags=args.tag, category=args.category,
+                               cuisine=args.cuisine, difficulty=args.difficulty,
+                               max_total_time=args.max_time, limit=args.limit)
+    except sqlite3.OperationalError as e:
+        # Malformed FTS5 query
+        log(f"Error: invalid search: {e}")
+        return 1
+    finally:
+        store.close()
+
+    for recipe in recipes:
+        sys.stdout.write(json.dumps(recipe, ensure_ascii=False) + "\n")
+    log(f"{len(recipes)} recipes found")
+    return 0
+
+
+def run(args) -> int:
+    """
+    Run the extraction pipeline over every input URL
+
+    Returns:
+        int: Process exit code
+    """
+    if args.fake_backend:
+        from fake_backend import fake_call_gemini_api
+        extract_fn, api_key = fake_call_gemini_api, "fake"
+    else:
+        extract_fn = call_gemini_api
+        api_key = args.api_key or os.getenv("GEMINI_API_KEY") or load_api_key()
+        if not api_key:
+            log("Error: no Gemini API key (use --api-key or GEMINI_API_KEY)")
+            return 1
+
+    journal = BatchJournal(args.journal)
+    if not args.resume and not args.fresh and journal.unfinished():
+        log(f"Error: {args.journal} holds an unfinished run; pass --resume to continue it "
+            f"or --fresh to discard it")
+        return 1
+
+    hedger = None
+    if args.hedge:
+        hedger = extract_fn = HedgedExtractor(extract_fn, q=args.hedge_percentile, budget=args.hedge_budget)
+
+    try:
+        tiers = select_tiers(args.tiers)
+    except ValueError as e:
+        log(f"Error: {e}")
+        return 1
+
+    ensure_dirs()
+    available_tags = load_tags(args.tags_file)
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+
+    # Sinks: the streaming export and/or the recipe store
+    writer = None
+    if args.output:
+        writer = ShardedExportWriter(args.output, max_bytes=EXPORT_SHARD_MAX_BYTES,
+                                     max_recipes=EXPORT_SHARD_MAX_RECIPES)
+    store_path = args.store or (None if args.output else RECIPE_STORE_FILE)
+    store = RecipeStore(store_path) if store_path else None
+
+    # Opened on the first deferred recipe, so runs without any leave no file behind
+    deferred = None
+    deferred_path = args.deferred_output or OUTPUT_DIR / f"recipes_deferred_{timestamp}.jsonl"
+
+    journal.start([], [], resume=args.resume)
+    if args.resume:
+        # The sinks were opened fresh: carry over what the interrupted run already wrote to them
+        if writer:
+            carried = writer.write_all(journal.completed_recipes())
+            log(f"Resume: {carried} recipes carried over from {args.journal} into the export")
+        if args.deferred_output:
+            for _, _, recipe in journal.deferred_entries():
+                if deferred is None:
+                    deferred = JsonlExportWriter(deferred_path)
+                deferred.write(recipe)
+
+    transcript_dir = args.transcripts if args.transcripts and os.path.isdir(args.transcripts) else None
+    savings = SavingsTracker()
+    cascade = CascadeStats(tiers)
+
+    counts = {STATUS_DONE: 0, STATUS_FAILED: 0, STATUS_REJECTED: 0, STATUS_DEFERRED: 0, "skipped": 0, "requeued": 0}
+    # Throttled calls per video, for the requeue cap
+    throttle_retries = Counter()
+    started = time.monotonic()
+
+    def handle(result):
+        """Route one result to the sinks (always runs on the main thread)"""
+        nonlocal deferred
+        recipe = result.recipe
+        status = STATUS_DONE
+        cascade.record(result)
+
+        if result.status not in (RESULT_ACCEPTED, RESULT_NEEDS_REVIEW):
+            status = STATUS_FAILED
+            label = "invalid" if result.status == RESULT_INVALID else "error"
+            log(f"[{label}] {result.video_id}: {result.message}")
+            journal.record(result.video_id, result.url, status, error=result.message)
+            counts[status] += 1
+            return
+
+        note = savings.record(result.source, result.elapsed, result.usage)
+
+        if result.status == RESULT_NEEDS_REVIEW and args.no_transcript != POLICY_ACCEPT:
+            if args.no_transcript == POLICY_REJECT:
+                status = STATUS_REJECTED
+                journal.record(result.video_id, result.url, status)
+            else:
+                status = STATUS_DEFERRED
+                if deferred is None:
+                    deferred = JsonlExportWriter(deferred_path)
+                deferred.write(recipe)
+                journal.record(result.video_id, result.url, status, recipe=recipe)
+            log(f"[{status}] {result.video_id}: no transcript - {recipe['title']}")
+            counts[status] += 1
+            return
+
+        if writer:
+            writer.write(recipe)
+        if store:
+            store.add(recipe, video_id=result.video_id, batch_id=timestamp)
+        journal.record(result.video_id, result.url, status, recipe=recipe)
+        counts[status] += 1
+        log(f"[ok] {result.video_id} ({result.elapsed:.1f}s, {result.tier}, {note}): {recipe['title']}"
+            + (f" - quality issues: {'; '.join(result.issues)}" if result.issues else ""))
+
+    def fail(item, error: Exception):
+        """Journal a video whose extraction or result handling raised"""
+        video_id, url = item
+        log(f"[error] {video_id}: {error}")
+        journal.record(video_id, url, STATUS_FAILED, error=str(error))
+        counts[STATUS_FAILED] += 1
+
+    lines = sys.stdin if args.input == "-" else open_url_file(args.input)
+    ingestor = UrlIngestor(lines, args.rejects or OUTPUT_DIR / f"rejected_urls_{timestamp}.txt")
+    limiter = AdaptiveLimiter(args.concurrency,
+                              max_limit=args.concurrency if args.fixed_concurrency else args.max_concurrency,
+                              adaptive=not args.fixed_concurrency,
+                              on_change=lambda old, new, reason: log(f"[concurrency] {old} -> {new} ({reason})"))
+    if hedger:
+        hedger.limiter = limiter
+
+    # Shortest-job-first within a lookahead window of the input
+    scheduler = JobScheduler()
+    estimator = CostEstimator(transcript_dir)
+    lookahead = max(1, args.lookahead)
+    source = iter(ingestor)
+    exhausted = False
+
+    try:
+        with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+            # future -> (input item, limiter token, expected seconds)
+            in_flight = {}
+
+            while True:
+                while not exhausted and len(scheduler) < lookahead:
+                    item = next(source, None)
+                    if item is None:
+                        exhausted = True
+                    elif journal.status(item[0]) in FINAL_STATUSES:
+                        counts["skipped"] += 1
+                    else:
+                        scheduler.submit(item, cost=estimator.estimate(item[0]))
+
+                # In-flight window bounded by the adaptive limit keeps memory flat for huge inputs
+                while limiter.available():
+                    item = scheduler.pop()
+                    if item is None:
+                        break
+                    token = limiter.acquire()
+                    future = executor.submit(process_url, item[1], available_tags, api_key, extract_fn,
+                                             transcript_dir, tiers)
+                    in_flight[future] = (item, token, estimator.estimate(item[0]))
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item, token, expected = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # One broken video must not end a long run
+                        limiter.release(token, 0.0, error=True)
+                        fail(item, e)
+                        continue
+                    limiter.release_result(token, result, expected)
+                    if should_retry(result, throttle_retries[item[0]]):
+                        # Rate limited, not broken: try again once the limiter has backed off
+                        throttle_retries[item[0]] += 1
+                        counts["requeued"] += 1
+                        cascade.record(result)
+                        scheduler.submit(item, cost=expected)
+                        log(f"[throttled] {result.video_id}: requeued "
+                            f"({throttle_retries[item[0]]}/{CONCURRENCY_THROTTLE_RETRIES})")
+                        continue
+                    estimator.observe(result.video_id, result.elapsed)
+                    try:
+                        handle(result)
+                    except Exception as e:
+                        fail(item, e)
+        journal.finish()
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+        if writer:
+            writer.close()
+        if deferred:
+            deferred.close()
+        if store:
+            store.close()
+
+    elapsed = time.monotonic() - started
+    log(f"Input: {ingestor.summary()}")
+    log(savings.summary())
+    for line in cascade.report():
+        log(line)
+    for line in hedger.report() if hedger else []:
+        log(line)
+    for line in limiter.report():
+        log(line)
+    if NUTRITION_SOURCE == NUTRITION_SOURCE_LOCAL:
+        unmatched = get_calculator().unmatched_summary()
+        if unmatched:
+            log(f"Ingredients not in the nutrient table: {unmatched}")
+    processed = sum(counts[status] for status in (STATUS_DONE, STATUS_FAILED, STATUS_REJECTED, STATUS_DEFERRED))
+    log(
+        f"Done in {elapsed:.1f}s: {counts[STATUS_DONE]} ok, {counts[STATUS_FAILED]} failed, "
+        f"{counts[STATUS_REJECTED]} rejected, {counts[STATUS_DEFERRED]} deferred, "
+        f"{counts['skipped']} skipped, {counts['requeued']} requeued after throttling "
+        f"({processed / elapsed if elapsed else 0:.2f} videos/s)"
+    )
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if is_search(args):
+        return search(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
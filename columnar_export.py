@@ -0,0 +1,244 @@
+"""
+Columnar Export Module
+Writes recipes as Parquet / Arrow tables for analytics (recipes, ingredients, tags)
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable
+
+# Recipes buffered per record batch before being flushed to disk
+BATCH_SIZE = 10_000
+
+# Table name -> file stem inside the export directory
+TABLES = ("recipes", "ingredients", "tags")
+
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+
+
+def _require_pyarrow():
+    """Import pyarrow lazily so the rest of the app works without it"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise ImportError(
+            "Columnar export requires pyarrow. Install it with: pip install pyarrow"
+        )
+
+
+def _schemas(pa) -> Dict:
+    dict_string = pa.dictionary(pa.int16(), pa.string())
+    return {
+        "recipes": pa.schema([
+            ("recipeId", pa.string()),
+            ("title", pa.string()),
+            ("description", pa.string()),
+            ("prepTime", pa.int32()),
+            ("cookTime", pa.int32()),
+            ("totalTime", pa.int32()),
+            ("servings", pa.int32()),
+            ("difficulty", dict_string),
+            ("category", dict_string),
+            ("cuisine", dict_string),
+            ("calories", pa.float64()),
+            ("protein", pa.float64()),
+            ("carbs", pa.float64()),
+            ("fats", pa.float64()),
+            ("healthScore", pa.int32()),
+            ("ingredientCount", pa.int32()),
+            ("stepCount", pa.int32()),
+            ("createdAt", pa.string()),
+        ]),
+        "ingredients": pa.schema([
+            ("recipeId", pa.string()),
+            ("position", pa.int32()),
+            ("name", pa.string()),
+            ("quantity", pa.float64()),
+            ("unit", dict_string),
+        ]),
+        "tags": pa.schema([
+            ("recipeId", pa.string()),
+            ("tag", dict_string),
+        ]),
+    }
+
+
+class _Columns:
+    """
+    Column-wise buffer for one table.
+
+    Dictionary-encoded columns keep one growing dictionary for the whole
+    export, so every flushed batch only appends dictionary deltas (Arrow IPC
+    files do not allow replacing a dictionary between batches).
+    """
+
+    def __init__(self, pa, schema):
+        self.pa = pa
+        self.schema = schema
+        self.columns = {name: [] for name in schema.names}
+        self.dictionaries = {
+            field.name: {} for field in schema
+            if pa.types.is_dictionary(field.type)
+        }
+
+    def __len__(self):
+        return len(self.columns[self.schema.names[0]])
+
+    def append(self, **values):
+        for name, column in self.columns.items():
+            value = values.get(name)
+            dictionary = self.dictionaries.get(name)
+            if dictionary is not None and value is not None:
+                value = dictionary.setdefault(value, len(dictionary))
+            column.append(value)
+
+    def to_table(self):
+        pa = self.pa
+        arrays = []
+        for field in self.schema:
+            values = self.columns[field.name]
+            if field.name in self.dictionaries:
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(values, type=field.type.index_type),
+                    pa.array(list(self.dictionaries[field.name]), type=field.type.value_type)
+                ))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+            values.clear()
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+
+class ColumnarExportWriter:
+    """
+    Streams recipes into three columnar tables inside an export directory:
+    recipes (one row per recipe), ingredients (exploded, one row per
+    ingredient) and tags (one row per recipe tag). Difficulty, category,
+    cuisine, unit and tag columns are dictionary-encoded.
+
+    Rows are flushed every BATCH_SIZE recipes, so memory stays bounded.
+    """
+
+    def __init__(self, export_dir, file_format: str = FORMAT_PARQUET):
+        if file_format not in (FORMAT_PARQUET, FORMAT_ARROW):
+            raise ValueError(f"Unknown columnar format: {file_format}")
+
+        self.pa = _require_pyarrow()
+        self.export_dir = Path(export_dir)
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        self.file_format = file_format
+        self.count = 0
+
+        schemas = _schemas(self.pa)
+        self._buffers = {name: _Columns(self.pa, schemas[name]) for name in TABLES}
+        self._writers = {name: self._open_writer(name, schemas[name]) for name in TABLES}
+
+    def _open_writer(self, name: str, schema):
+        path = self.export_dir / f"{name}.{self.file_format}"
+        if self.file_format == FORMAT_PARQUET:
+            return self.pa.parquet.ParquetWriter(str(path), schema, use_dictionary=True)
+        options = self.pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        return self.pa.ipc.new_file(str(path), schema, options=options)
+
+    def write(self, recipe: Dict):
+        """Add a single recipe (and its ingredients and tags) to the tables"""
+        recipe_id = recipe["recipeId"]
+        nutrition = recipe.get("nutrition") or {}
+        ingredients = recipe.get("ingredients", [])
+
+        self._buffers["recipes"].append(
+            recipeId=recipe_id,
+            title=recipe.get("title"),
+            description=recipe.get("description"),
+            prepTime=recipe.get("prepTime"),
+            cookTime=recipe.get("cookTime"),
+            totalTime=recipe.get("totalTime"),
+            servings=recipe.get("servings"),
+            difficulty=recipe.get("difficulty"),
+            category=recipe.get("category"),
+            cuisine=recipe.get("cuisine"),
+            calories=nutrition.get("calories"),
+            protein=nutrition.get("protein"),
+            carbs=nutrition.get("carbs"),
+            fats=nutrition.get("fats"),
+            healthScore=nutrition.get("healthScore"),
+            ingredientCount=len(ingredients),
+            stepCount=len(recipe.get("instructions", [])),
+            createdAt=recipe.get("createdAt")
+        )
+
+        for position, ingredient in enumerate(ingredients):
+            self._buffers["ingredients"].append(
+                recipeId=recipe_id,
+                position=position,
+                name=ingredient.get("name"),
+                quantity=ingredient.get("quantity"),
+                unit=ingredient.get("unit")
+            )
+
+        for tag in recipe.get("tags", []):
+            self._buffers["tags"].append(recipeId=recipe_id, tag=tag)
+
+        self.count += 1
+        if len(self._buffers["recipes"]) >= BATCH_SIZE:
+            self._flush()
+
+    def write_all(self, recipes: Iterable[Dict]) -> int:
+        """Add every recipe from an iterable, returns the number written"""
+        for recipe in recipes:
+            self.write(recipe)
+        return self.count
+
+    def _flush(self):
+        for name in TABLES:
+            if len(self._buffers[name]):
+                self._writers[name].write_table(self._buffers[name].to_table())
+
+    def close(self):
+        """Flush pending rows and finalize every table file"""
+        if self._writers is None:
+            return
+        self._flush()
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_columnar(export_dir, memory_map: bool = True) -> Dict:
+    """
+    Load a columnar export as pyarrow tables
+
+    Arrow files are memory-mapped, so columns are read zero-copy and only
+    the pages actually touched are loaded. Parquet files are memory-mapped
+    and decoded.
+
+    Args:
+        export_dir: Directory written by ColumnarExportWriter
+        memory_map: Memory-map the files instead of reading them
+
+    Returns:
+        dict: Table name -> pyarrow.Table (call .to_pandas() for DataFrames)
+    """
+    pa = _require_pyarrow()
+    export_dir = Path(export_dir)
+    tables = {}
+
+    for name in TABLES:
+        arrow_path = export_dir / f"{name}.{FORMAT_ARROW}"
+        parquet_path = export_dir / f"{name}.{FORMAT_PARQUET}"
+
+        if arrow_path.exists():
+            source = pa.memory_map(str(arrow_path), "r") if memory_map else pa.OSFile(str(arrow_path), "rb")
+            tables[name] = pa.ipc.open_file(source).read_all()
+        elif parquet_path.exists():
+            tables[name] = pa.parquet.read_table(str(parquet_path), memory_map=memory_map)
+
+    return tables
@@ -0,0 +1,231 @@
+"""
+Concurrency Module
+Adaptive (AIMD) limit on the number of extractions in flight, driven by latency,
+throttling and error feedback from finished calls
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import (CONCURRENCY_INITIAL, CONCURRENCY_MIN, CONCURRENCY_MAX, CONCURRENCY_INCREASE,
+                    CONCURRENCY_THROTTLE_BACKOFF, CONCURRENCY_LATENCY_BACKOFF, CONCURRENCY_LATENCY_SPIKE,
+                    CONCURRENCY_MAX_ERROR_RATE, CONCURRENCY_WINDOW, CONCURRENCY_THROTTLE_RETRIES)
+from recipe_pipeline import RESULT_ERROR
+
+# Why the limit changed
+REASON_HEALTHY = "healthy"
+REASON_THROTTLED = "throttled"
+REASON_LATENCY = "latency"
+REASON_ERRORS = "errors"
+
+# Error messages that mean the API is rate limiting us (HTTP 429 / RESOURCE_EXHAUSTED)
+THROTTLE_PATTERN = re.compile(r"\b429\b|resource\s+(has\s+been\s+)?exhausted|rate.?limit|quota", re.IGNORECASE)
+
+# Smoothing of the latency averages compared for spike detection
+FAST_ALPHA = 0.3
+SLOW_ALPHA = 0.05
+
+# Limit changes kept for the report
+HISTORY_SIZE = 1000
+
+
+def is_throttled(result) -> bool:
+    """True when any model tier of an ExtractionResult was rate limited"""
+    reasons = [attempt["reason"] for attempt in result.attempts or []] + [result.message or ""]
+    return any(THROTTLE_PATTERN.search(reason) for reason in reasons)
+
+
+def should_retry(result, retries: int) -> bool:
+    """A call that failed only because it was throttled is queued again, up to CONCURRENCY_THROTTLE_RETRIES times"""
+    return result.status == RESULT_ERROR and retries < CONCURRENCY_THROTTLE_RETRIES and is_throttled(result)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on extractions in flight (thread-safe).
+
+    The runner starts a call only while `available()` is positive and
+    hands every finished call back with `release()`. A healthy call that
+    started while all slots were busy raises the limit by
+    CONCURRENCY_INCREASE / limit, so the limit grows by about one per
+    round of calls. Throttling, a latency spike (fast latency average
+    above CONCURRENCY_LATENCY_SPIKE times the slow one) or an error rate
+    above CONCURRENCY_MAX_ERROR_RATE in the last CONCURRENCY_WINDOW calls
+    multiplies it by a backoff factor instead. Only calls started after
+    the last cut can cut again, so one burst of 429s from calls that
+    were already in flight halves the limit once, not once per call.
+
+    Latency is compared as elapsed / expected seconds when the runner
+    passes the CostEstimator's estimate, so long videos do not look like
+    spikes.
+    """
+
+    def __init__(self, initial: int = CONCURRENCY_INITIAL, min_limit: int = CONCURRENCY_MIN,
+                 max_limit: int = CONCURRENCY_MAX, adaptive: bool = True,
+                 on_change: Optional[Callable[[int, int, str], None]] = None, clock: Callable = time.monotonic):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.adaptive = adaptive
+        self.on_change = on_change
+        self.clock = clock
+
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases: Dict[str, int] = {REASON_THROTTLED: 0, REASON_LATENCY: 0, REASON_ERRORS: 0}
+        self.low = self.high = self.limit
+        self._started = clock()
+        self.history: deque = deque([(0.0, self.limit, "initial")], maxlen=HISTORY_SIZE)
+        self._last_cut = self._started
+        self._errors = deque(maxlen=CONCURRENCY_WINDOW)
+        self._fast: Optional[float] = None
+        self._slow: Optional[float] = None
+        self._samples = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def available(self) -> int:
+        """Calls that may be started now"""
+        with self._lock:
+            return max(0, int(self._limit) - self.in_flight)
+
+    def acquire(self) -> Tuple[float, bool]:
+        """
+        Count a call as started
+
+        Returns:
+            tuple: Token for release() (start time, whether all slots were busy)
+        """
+        with self._lock:
+            self.in_flight += 1
+            return self.clock(), self.in_flight >= int(self._limit)
+
+    def try_acquire(self) -> Optional[Tuple[float, bool]]:
+        """acquire() only when a slot is free; returns None otherwise"""
+        with self._lock:
+            if self.in_flight >= int(self._limit):
+                return None
+            self.in_flight += 1
+            return self.clock(), self.in_flight >= int(self._limit)
+
+    def cancel(self, token: Tuple[float, bool]):
+        """Give back a slot whose call was never made (no feedback on the limit)"""
+        with self._lock:
+            self.in_flight -= 1
+
+    def release(self, token: Tuple[float, bool], latency: float, expected: Optional[float] = None,
+                throttled: bool = False, error: bool = False) -> Optional[str]:
+        """
+        Count a call as finished and adapt the limit
+
+        Args:
+            token: Value returned by acquire() for this call
+            latency: Seconds the call took
+            expected: Expected seconds for this call (e.g. CostEstimator.estimate)
+            throttled: The API answered with a rate limit error
+            error: The call failed for another reason
+
+        Returns:
+            str: Reason of the limit change, or None when it did not change
+        """
+        started, saturated = token
+        with self._lock:
+            self.in_flight -= 1
+            if not self.adaptive:
+                return None
+
+            old = int(self._limit)
+            after_cut = started >= self._last_cut
+            self._errors.append(error)
+            if not throttled and not error:
+                self._observe(latency / expected if expected else latency)
+
+            reason = None
+            if throttled:
+                if after_cut:
+                    reason = self._cut(CONCURRENCY_THROTTLE_BACKOFF, REASON_THROTTLED)
+            elif (len(self._errors) >= CONCURRENCY_WINDOW // 2
+                  and sum(self._errors) / len(self._errors) > CONCURRENCY_MAX_ERROR_RATE):
+                if after_cut:
+                    self._errors.clear()
+                    reason = self._cut(CONCURRENCY_THROTTLE_BACKOFF, REASON_ERRORS)
+            elif self._spike():
+                if after_cut:
+                    # Start the next comparison from the long-run average
+                    self._fast = self._slow
+                    reason = self._cut(CONCURRENCY_LATENCY_BACKOFF, REASON_LATENCY)
+            elif not error and saturated:
+                self._limit = min(self._limit + CONCURRENCY_INCREASE / self._limit, float(self.max_limit))
+                reason = REASON_HEALTHY
+
+            new = int(self._limit)
+            if new == old:
+                return None
+            if reason == REASON_HEALTHY:
+                self.increases += 1
+            else:
+                self.decreases[reason] += 1
+            self.low, self.high = min(self.low, new), max(self.high, new)
+            self.history.append((self.clock() - self._started, new, reason))
+
+        if self.on_change is not None:
+            self.on_change(old, new, reason)
+        return reason
+
+    def release_result(self, token: Tuple[float, bool], result, expected: Optional[float] = None) -> Optional[str]:
+        """release() for an ExtractionResult of process_url"""
+        throttled = is_throttled(result)
+        return self.release(token, result.elapsed, expected, throttled=throttled,
+                            error=result.status == RESULT_ERROR and not throttled)
+
+    def _observe(self, sample: float):
+        self._samples += 1
+        if self._fast is None:
+            self._fast = self._slow = sample
+            return
+        self._fast += FAST_ALPHA * (sample - self._fast)
+        self._slow += SLOW_ALPHA * (sample - self._slow)
+
+    def _spike(self) -> bool:
+        return (self._samples >= CONCURRENCY_WINDOW and self._slow > 0
+                and self._fast > self._slow * CONCURRENCY_LATENCY_SPIKE)
+
+    def _cut(self, factor: float, reason: str) -> str:
+        self._limit = max(float(self.min_limit), self._limit * factor)
+        self._last_cut = self.clock()
+        return reason
+
+    def snapshot(self) -> Dict:
+        """Current limit and counters, for metrics"""
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "inFlight": self.in_flight,
+                "adaptive": self.adaptive,
+                "min": self.low,
+                "max": self.high,
+                "increases": self.increases,
+                "decreases": dict(self.decreases),
+                "history": [{"t": round(t, 3), "limit": limit, "reason": reason}
+                            for t, limit, reason in self.history]
+            }
+
+    def report(self) -> List[str]:
+        """Final limit, range, change counts and the limit history"""
+        with self._lock:
+            if not self.adaptive:
+                return [f"Concurrency: fixed at {self.limit}"]
+            cuts = ", ".join(f"{count} {reason}" for reason, count in self.decreases.items() if count)
+            history = " ".join(f"{limit}@{t:.0f}s" for t, limit, _ in self.history)
+            return [
+                f"Concurrency: limit {self.limit} (range {self.low}-{self.high}), "
+                f"{self.increases} increases, {sum(self.decreases.values())} decreases"
+                + (f" ({cuts})" if cuts else ""),
+                f"Concurrency history: {history}"
+            ]
@@ -11,15 +11,43 @@ BASE_DIR = Path(__file__).parent
 ASSETS_DIR = BASE_DIR / "assets"
 OUTPUT_DIR = BASE_DIR / "output"
 CONFIG_FILE = BASE_DIR / ".env"
+# One checkpoint journal per GUI batch (batch_journal_<batch_id>.jsonl)
+JOURNAL_DIR = OUTPUT_DIR / "journals"
+CLI_JOURNAL_FILE = OUTPUT_DIR / "cli_batch_journal.jsonl"
+WORK_QUEUE_FILE = OUTPUT_DIR / "work_queue.db"
+RECIPE_STORE_FILE = OUTPUT_DIR / "recipes.db"
+EXPORT_MANIFEST_FILE = OUTPUT_DIR / "export_manifest.json"
 
-# Ensure directories exist
-ASSETS_DIR.mkdir(exist_ok=True)
-OUTPUT_DIR.mkdir(exist_ok=True)
+# Per-100 g nutrient table used by the local nutrition calculator
+NUTRIENT_TABLE_FILE = ASSETS_DIR / "nutrients.csv"
+
+# Local subtitles (<video_id>.vtt / .srt / .txt) used instead of video analysis when present
+TRANSCRIPT_DIR = BASE_DIR / "transcripts"
+
+# Export settings
+EXPORT_SOURCE = "youtube_recipe_generator_v1.0"
+EXPORT_TARGET_APP = "mealee"
+
+# Exports are split into shards above these limits (None = unlimited)
+EXPORT_SHARD_MAX_BYTES = 100 * 1024 * 1024
+EXPORT_SHARD_MAX_RECIPES = None
+
+# Mealee bulk import: endpoint (or MEALEE_IMPORT_URL / --url), recipes per request,
+# requests in flight and retries per chunk
+MEALEE_IMPORT_URL = os.getenv("MEALEE_IMPORT_URL", "")
+MEALEE_CHUNK_SIZE = 200
+MEALEE_PARALLEL_CHUNKS = 4
+MEALEE_MAX_RETRIES = 5
+MEALEE_TIMEOUT_SECONDS = 30
+MEALEE_GZIP_LEVEL = 6
 
 # Default placeholder image
 PLACEHOLDER_IMAGE_URL = "https://example.com/placeholder.jpg"
 
 # Gemini API Configuration
+# Billed tokens per second of analysed video (1 fps frames plus audio)
+VIDEO_TOKENS_PER_SECOND = 290
+
 GEMINI_MODEL = "gemini-2.0-flash-exp"
 GENERATION_CONFIG = {
     "temperature": 0.7,
@@ -36,6 +64,74 @@ SAFETY_SETTINGS = [
     {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"}
 ]
 
+# Extraction prompt: "compact" (compiled from the schema, numbered tags) or "full"
+PROMPT_STYLE = "compact"
+
+# Nutrition block: "local" (computed from the ingredients by nutrition.py, not asked
+# from the model) or "model" (estimated by the model)
+NUTRITION_SOURCE = "local"
+
+# Share of the weighed ingredients of a recipe that must be found in the nutrient table
+# for local nutrition; below it the recipe is flagged instead of getting near-zero values
+NUTRITION_MIN_MATCHED_SHARE = 0.6
+
+# Model cascade: every video starts on the first tier and moves to the next one
+# when validation or the quality checks fail. Prices in USD per million tokens (input, output).
+MODEL_TIERS = [
+    {
+        "name": "fast",
+        "model": "gemini-2.0-flash-lite",
+        "generation_config": {**GENERATION_CONFIG, "temperature": 0.4, "max_output_tokens": 4096},
+        "price_per_million": (0.075, 0.30)
+    },
+    {
+        "name": "standard",
+        "model": GEMINI_MODEL,
+        "generation_config": GENERATION_CONFIG,
+        "price_per_million": (0.10, 0.40)
+    },
+    {
+        "name": "strong",
+        "model": "gemini-1.5-pro",
+        "generation_config": {**GENERATION_CONFIG, "temperature": 0.3},
+        "price_per_million": (1.25, 5.00)
+    }
+]
+
+# Request hedging: a duplicate request is sent when a call is slower than this
+# percentile of the last HEDGE_WINDOW calls; at most HEDGE_BUDGET extra requests per call
+HEDGE_PERCENTILE = 0.9
+HEDGE_BUDGET = 0.1
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+
+# Quality checks that send a valid recipe to the next tier
+QUALITY_MIN_STEPS = 3
+QUALITY_MIN_INGREDIENTS = 2
+
+# Job scheduling: waiting promotes a job by one priority class every
+# SCHEDULER_AGING_SECONDS; costs are expected seconds per extraction
+SCHEDULER_AGING_SECONDS = 60
+SCHEDULER_DEFAULT_COST = 10.0
+SCHEDULER_COST_PER_VIDEO_MINUTE = 1.0
+SCHEDULER_LOOKAHEAD = 256
+
+# Adaptive concurrency (AIMD): the number of extractions in flight grows by
+# CONCURRENCY_INCREASE per round of healthy calls and is multiplied by a backoff
+# factor on throttling (429), latency spikes or a high error rate
+CONCURRENCY_INITIAL = 4
+CONCURRENCY_MIN = 1
+CONCURRENCY_MAX = 32
+CONCURRENCY_INCREASE = 1.0
+CONCURRENCY_THROTTLE_BACKOFF = 0.5
+CONCURRENCY_LATENCY_BACKOFF = 0.75
+# Spike: recent latency (fast average) above this multiple of the long-run average
+CONCURRENCY_LATENCY_SPIKE = 2.0
+CONCURRENCY_MAX_ERROR_RATE = 0.2
+CONCURRENCY_WINDOW = 20
+# A video whose call was throttled goes back into the queue up to this many times
+CONCURRENCY_THROTTLE_RETRIES = 3
+
 # Mealee App Constants
 VALID_UNITS = [
     "ml", "l", "linguriță", "lingură", "cană",
@@ -101,6 +197,11 @@ AVAILABLE_TAGS = [
     "pentru familie", "single serving", "prăjit", "fierbințel", "rece"
 ]
 
+# Progress log: lines kept in the widget and batching of updates
+LOG_MAX_LINES = 2000
+LOG_FLUSH_INTERVAL_MS = 50
+LOG_MAX_EVENTS_PER_FLUSH = 5000
+
 # GUI Text (Romanian)
 GUI_TEXT = {
     "window_title": "Generator Rețete YouTube",
@@ -108,24 +209,75 @@ GUI_TEXT = {
     "api_key_save": "Salvează",
     "tags_label": "Etichete Disponibile (separate prin virgulă):",
     "urls_label": "Link-uri YouTube (unul pe linie):",
+    "import_button": "Importă din fișier...",
+    "import_summary": "{count} URL-uri din {name}",
+    "urls_ingest_summary": "URL-uri: {accepted} valide, {duplicates} duplicate, {rejected} respinse",
+    "urls_rejected_file": "Liniile fără link YouTube au fost salvate în: {path}",
     "urls_placeholder": "Introduceți link-uri YouTube aici...\nExemplu: https://www.youtube.com/watch?v=...",
     "generate_button": "Generează Rețete",
+    "resume_checkbox": "Reia lotul întrerupt",
+    "resume_summary": "Se reia lotul anterior: {done} rețete finalizate, {remaining} video-uri rămase",
+    "scheduler_added": "Adăugate în fața lotului curent: {count} video-uri",
+    "scheduler_nothing_new": "Nu există link-uri noi de adăugat în lotul curent.",
+    "scheduler_finishing": "Lotul curent se încheie. Încercați din nou în câteva secunde.",
+    "concurrency_changed": "Paralelism: {old} → {new} video-uri simultan ({reason})",
+    "concurrency_reason_healthy": "apeluri rapide, fără erori",
+    "concurrency_reason_throttled": "limită de cereri atinsă, 429",
+    "concurrency_reason_latency": "latență în creștere",
+    "concurrency_reason_errors": "prea multe erori",
+    "concurrency_requeued": "↻ Limită de cereri atinsă, video reprogramat ({attempt}/{max}): {url}",
+    "concurrency_summary": "Paralelism adaptiv: {limit} la final (între {low} și {high}), {increases} creșteri, {decreases} reduceri",
     "progress_label": "Progres:",
     "preview_button": "Previzualizare",
     "export_button": "Exportă JSON",
     "confirmation_title": "Confirmare Rețetă",
     "confirmation_warning": "⚠ Acest video nu are transcriere.\nGemini a generat rețeta bazat pe conținutul vizual.",
-    "confirmation_accept": "Da",
-    "confirmation_edit": "Editare",
-    "confirmation_reject": "Nu",
+    "review_button": "Revizuire ({count})",
+    "review_queued": "⚠ Fără transcriere – rețetă trimisă la revizuire: {title}",
+    "review_accept_selected": "Acceptă selectate",
+    "review_reject_selected": "Respinge selectate",
+    "review_accept_all": "Acceptă toate",
+    "review_reject_all": "Respinge toate",
     "success_message": "✓ Generat {count} rețete cu succes!",
     "export_success": "✓ Rețete exportate în: {path}",
+    "export_delta_checkbox": "Doar rețete noi sau modificate (delta)",
+    "export_delta_summary": "Export delta: {written} rețete noi/modificate, {unchanged} neschimbate, {shards} fișier(e)",
+    "export_delta_columnar": "Exportul delta este disponibil doar pentru JSON / JSON Lines, nu pentru .parquet / .arrow.",
+    "transcript_used": "Transcriere locală folosită: ~{tokens} tokeni (~{saved} economisiți față de analiza video), {elapsed:.1f}s",
+    "transcript_summary": "Transcrieri locale: {count} rețete, ~{saved} tokeni economisiți; durată medie {transcript_avg:.1f}s (video: {video_avg:.1f}s)",
+    "cascade_escalated": "↑ Model {from_tier} → {to_tier}: {reason}",
+    "cascade_tier_stats": "Model {tier}: {calls} apeluri, {success_rate:.0%} reușite, {escalated} escaladate, {avg_seconds:.1f}s în medie, {tokens} tokeni, ~${cost:.4f}",
+    "autosave_started": "Rețetele se salvează automat în: {path}",
     "error_no_api_key": "Vă rugăm să introduceți cheia API Gemini.",
     "error_no_urls": "Vă rugăm să introduceți cel puțin un link YouTube.",
-    "error_invalid_url": "✗ URL invalid: {url}",
-    "error_processing": "✗ Eroare la procesare: {error}"
+    "quality_issues": "⚠ Probleme de calitate: {issues}",
+    "nutrition_unmatched": "Ingrediente lipsă din tabelul nutrițional (valorile lor nu sunt calculate): {names}",
+    "error_processing": "✗ Eroare la procesare: {error}",
+    "error_ui_callback": "✗ Eroare în interfață: {error}"
 }
 
+def ensure_dirs():
+    """Create the assets and output directories (called by the entry points, not on import)"""
+    ASSETS_DIR.mkdir(exist_ok=True)
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    JOURNAL_DIR.mkdir(exist_ok=True)
+
+def select_tiers(names=None) -> list:
+    """
+    Return the MODEL_TIERS named in a comma separated list (the --tiers option), in that order
+
+    Raises:
+        ValueError: If a name is not one of the MODEL_TIERS
+    """
+    if not names:
+        return MODEL_TIERS
+    by_name = {tier["name"]: tier for tier in MODEL_TIERS}
+    wanted = [name.strip() for name in names.split(",") if name.strip()]
+    unknown = [name for name in wanted if name not in by_name]
+    if unknown:
+        raise ValueError(f"unknown tier {', '.join(unknown)} in --tiers (available: {', '.join(by_name)})")
+    return [by_name[name] for name in wanted]
+
 def load_api_key():
     """Load API key from .env file"""
     try:
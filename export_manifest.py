@@ -0,0 +1,88 @@
+"""
+Export Manifest Module
+Content-addressed manifest of exported recipes, used for delta exports
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+# Set anew on every extraction, so not part of a recipe's content
+VOLATILE_FIELDS = ("createdAt",)
+
+
+def recipe_content_hash(recipe: Dict) -> str:
+    """
+    Hash the canonical JSON form of a recipe
+
+    Args:
+        recipe: Recipe dictionary
+
+    Returns:
+        str: Hex SHA-256 digest (independent of key order and of VOLATILE_FIELDS)
+    """
+    content = {key: value for key, value in recipe.items() if key not in VOLATILE_FIELDS}
+    canonical = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ExportManifest:
+    """
+    Maps recipeId -> content hash for everything already exported.
+    recipeIds are derived from the video ID, so a re-extracted video with
+    the same content is recognised as unchanged.
+
+    In delta mode only recipes whose hash is missing or different from the
+    manifest are emitted; the manifest is only rewritten (atomically) once
+    the export has completed.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.hashes: Dict[str, str] = {}
+        self.unchanged = 0
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.hashes = data.get("recipes", {})
+
+    def changed(self, recipes: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Yield only recipes that are new or changed since the last export
+
+        Args:
+            recipes: Candidate recipes
+
+        Yields:
+            dict: Recipes to include in the delta
+        """
+        for recipe in recipes:
+            digest = recipe_content_hash(recipe)
+            recipe_id = recipe["recipeId"]
+            if self.hashes.get(recipe_id) == digest:
+                self.unchanged += 1
+                continue
+            self.hashes[recipe_id] = digest
+            yield recipe
+
+    def save(self, shards: Iterable = ()):
+        """
+        Atomically write the manifest
+
+        Args:
+            shards: Files produced by the export this manifest describes
+        """
+        data = {
+            "exportDate": datetime.utcnow().isoformat() + "Z",
+            "shards": [str(shard) for shard in shards],
+            "recipes": self.hashes
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,320 @@
+"""
+Export Writer Module
+Streams recipes to disk one at a time as JSONL or framed JSON,
+optionally compressed (gzip / zstd) and sharded by size or recipe count
+"""
+
+import gzip
+import io
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import EXPORT_SOURCE, EXPORT_TARGET_APP
+from recipe_model import Recipe
+
+# Width reserved for the patched-in totalRecipes value (JSON allows the padding)
+COUNT_FIELD_WIDTH = 12
+
+# Compression suffixes understood by open_export_writer
+COMPRESSION_GZIP = ".gz"
+COMPRESSION_ZSTD = ".zst"
+COMPRESSION_LEVELS = {COMPRESSION_GZIP: 6, COMPRESSION_ZSTD: 10}
+
+
+def build_export_metadata(total_recipes: int = 0) -> Dict:
+    """
+    Build the metadata header shared by all export formats
+
+    Args:
+        total_recipes: Number of recipes in the export
+
+    Returns:
+        dict: Export metadata
+    """
+    return {
+        "exportDate": datetime.utcnow().isoformat() + "Z",
+        "totalRecipes": total_recipes,
+        "source": EXPORT_SOURCE,
+        "targetApp": EXPORT_TARGET_APP
+    }
+
+
+def dump_compact(data) -> bytes:
+    """Serialize to compact UTF-8 JSON (no indentation, no spaces)"""
+    if isinstance(data, Recipe):
+        data = data.to_dict()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def split_compression(file_path) -> tuple:
+    """
+    Split a trailing compression suffix off an export path
+
+    Args:
+        file_path: e.g. "recipes.jsonl.zst"
+
+    Returns:
+        tuple: (path without compression suffix, compression suffix or None)
+    """
+    path = Path(file_path)
+    suffix = path.suffix.lower()
+    if suffix in COMPRESSION_LEVELS:
+        return path.with_suffix(""), suffix
+    return path, None
+
+
+def _open_compressed(file_path, compression: str):
+    """Open a binary write stream that compresses into file_path"""
+    if compression == COMPRESSION_GZIP:
+        return gzip.open(file_path, "wb", compresslevel=COMPRESSION_LEVELS[COMPRESSION_GZIP])
+
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires zstandard. Install it with: pip install zstandard")
+
+    compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVELS[COMPRESSION_ZSTD])
+    return compressor.stream_writer(open(file_path, "wb"), closefd=True)
+
+
+def open_export_reader(file_path):
+    """
+    Open an export for reading as UTF-8 text, decompressing .gz / .zst files
+
+    Args:
+        file_path: Export written by the writers below, e.g. "recipes.jsonl.gz"
+
+    Returns:
+        Text stream (use as a context manager)
+    """
+    _, compression = split_compression(file_path)
+    if compression is None:
+        return open(file_path, "r", encoding="utf-8")
+    if compression == COMPRESSION_GZIP:
+        return gzip.open(file_path, "rt", encoding="utf-8")
+
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires zstandard. Install it with: pip install zstandard")
+
+    reader = zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+    return io.TextIOWrapper(reader, encoding="utf-8")
+
+
+class JsonlExportWriter:
+    """
+    Writes one compact recipe JSON object per line.
+
+    Uncompressed files are flushed after every line, so a crash leaves all
+    previously written recipes readable. Compressed files are streamed
+    through the compressor and only flushed on close.
+    """
+
+    def __init__(self, file_path, fsync: bool = False, compression: Optional[str] = None):
+        self.file_path = Path(file_path)
+        self.fsync = fsync
+        self.compression = compression
+        self.count = 0
+        self.bytes_written = 0
+        self._file = self._open()
+
+    def _open(self):
+        if self.compression:
+            return _open_compressed(self.file_path, self.compression)
+        return open(self.file_path, "wb")
+
+    def _write_bytes(self, data: bytes):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def write(self, recipe):
+        """Append a single recipe (dict or Recipe) to the export"""
+        self._write_bytes(dump_compact(recipe) + b"\n")
+        self._flush()
+        self.count += 1
+
+    def write_all(self, recipes: Iterable) -> int:
+        """Append every recipe from an iterable, returns the number written"""
+        for recipe in recipes:
+            self.write(recipe)
+        return self.count
+
+    def _flush(self):
+        if self.compression:
+            return
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Flush and close the underlying file"""
+        if not self._file.closed:
+            self._flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FramedJsonExportWriter(JsonlExportWriter):
+    """
+    Writes the Mealee export structure ({"metadata": ..., "recipes": [...]})
+    incrementally.
+
+    The metadata header is written first with a fixed-width placeholder for
+    totalRecipes, which is patched in place when the writer is closed.
+    Compressed output is staged in an uncompressed ".part" file (the patch
+    needs a seekable file) and compressed on close.
+    """
+
+    def __init__(self, file_path, fsync: bool = False, compression: Optional[str] = None):
+        super().__init__(file_path, fsync=fsync, compression=compression)
+        self._count_offset = self._write_header()
+
+    def _open(self):
+        if self.compression:
+            self._staging_path = self.file_path.with_name(self.file_path.name + ".part")
+            return open(self._staging_path, "w+b")
+        return open(self.file_path, "wb")
+
+    def _flush(self):
+        # The staging file is a plain file even when the output is compressed
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _write_header(self) -> int:
+        metadata = dump_compact(build_export_metadata(0))
+        marker = b'"totalRecipes":'
+        split_at = metadata.index(marker) + len(marker)
+        # Skip the serialized 0 so the placeholder takes its place
+        prefix = b'{"metadata":' + metadata[:split_at]
+        suffix = metadata[split_at + 1:] + b',"recipes":['
+
+        self._write_bytes(prefix)
+        count_offset = self._file.tell()
+        self._write_bytes(b"0".ljust(COUNT_FIELD_WIDTH))
+        self._write_bytes(suffix)
+        self._flush()
+        return count_offset
+
+    def write(self, recipe):
+        """Append a single recipe (dict or Recipe) to the recipes array"""
+        separator = b"\n" if self.count == 0 else b",\n"
+        self._write_bytes(separator + dump_compact(recipe))
+        self._flush()
+        self.count += 1
+
+    def close(self):
+        """Terminate the array, patch the recipe count and close the file"""
+        if self._file.closed:
+            return
+        self._write_bytes(b"\n]}\n")
+        self._file.seek(self._count_offset)
+        self._file.write(str(self.count).encode("ascii").ljust(COUNT_FIELD_WIDTH))
+
+        if self.compression:
+            self._file.seek(0)
+            with _open_compressed(self.file_path, self.compression) as target:
+                shutil.copyfileobj(self._file, target, 1024 * 1024)
+            self._file.close()
+            os.remove(self._staging_path)
+            return
+
+        self._file.seek(0, os.SEEK_END)
+        super().close()
+
+
+def open_export_writer(file_path, fsync: bool = False):
+    """
+    Open a streaming export writer based on the file extension
+
+    Args:
+        file_path: Destination file (.jsonl for JSON Lines, anything else for
+            framed JSON), optionally followed by .gz or .zst
+        fsync: Force every written recipe to stable storage
+
+    Returns:
+        JsonlExportWriter or FramedJsonExportWriter
+    """
+    base_path, compression = split_compression(file_path)
+    if base_path.suffix.lower() == ".jsonl":
+        return JsonlExportWriter(file_path, fsync=fsync, compression=compression)
+    return FramedJsonExportWriter(file_path, fsync=fsync, compression=compression)
+
+
+class ShardedExportWriter:
+    """
+    Splits an export into several files once a shard reaches max_bytes
+    (uncompressed) or max_recipes.
+
+    The first shard is written to file_path itself; if a second shard is
+    needed, all shards are named "<stem>.00001<suffixes>", "<stem>.00002...".
+    """
+
+    def __init__(self, file_path, max_bytes: Optional[int] = None,
+                 max_recipes: Optional[int] = None, fsync: bool = False):
+        self.file_path = Path(file_path)
+        self.max_bytes = max_bytes
+        self.max_recipes = max_recipes
+        self.fsync = fsync
+        self.count = 0
+        self.shards: List[Path] = []
+        self._writer = None
+
+    def _shard_path(self, index: int) -> Path:
+        base_path, compression = split_compression(self.file_path)
+        name = f"{base_path.stem}.{index:05d}{base_path.suffix}{compression or ''}"
+        return self.file_path.with_name(name)
+
+    def _open_shard(self, path: Path):
+        self._writer = open_export_writer(path, fsync=self.fsync)
+        self.shards.append(path)
+
+    def _rotate(self):
+        self._writer.close()
+        if len(self.shards) == 1:
+            first = self._shard_path(1)
+            os.replace(self.shards[0], first)
+            self.shards[0] = first
+        self._open_shard(self._shard_path(len(self.shards) + 1))
+
+    def _shard_full(self) -> bool:
+        if self.max_recipes and self._writer.count >= self.max_recipes:
+            return True
+        return bool(self.max_bytes and self._writer.bytes_written >= self.max_bytes)
+
+    def write(self, recipe):
+        """Append a recipe, starting a new shard when the current one is full"""
+        if self._writer is None:
+            self._open_shard(self.file_path)
+        elif self._shard_full():
+            self._rotate()
+        self._writer.write(recipe)
+        self.count += 1
+
+    def write_all(self, recipes: Iterable) -> int:
+        """Append every recipe from an iterable, returns the number written"""
+        for recipe in recipes:
+            self.write(recipe)
+        return self.count
+
+    def close(self):
+        """Close the current shard (an empty export still produces one file)"""
+        if self._writer is None:
+            self._open_shard(self.file_path)
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,132 @@
+"""
+Fake Backend Module
+Deterministic stand-in for call_gemini_api, used to exercise the pipeline on localhost
+without an API key or network access
+"""
+
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import MODEL_TIERS, PLACEHOLDER_IMAGE_URL
+from gemini_service import build_prompt, extract_video_id, recipe_id_for_video
+from transcripts import estimate_tokens
+
+# Simulated model latency range in seconds (scaled by the video ID hash)
+FAKE_LATENCY_MIN = 0.05
+FAKE_LATENCY_MAX = 0.25
+
+# Share of requests that randomly take FAKE_STRAGGLER_FACTOR times longer (off by default,
+# used to exercise request hedging)
+FAKE_STRAGGLER_RATE = 0.0
+FAKE_STRAGGLER_FACTOR = 4
+
+# Simulated quota: calls beyond this many in flight fail with a 429 error, and latency
+# grows with load above FAKE_CAPACITY / 2 (None = unlimited, used to exercise adaptive concurrency)
+FAKE_CAPACITY = None
+
+# Requests with a transcript are faster than video analysis by this factor
+FAKE_TRANSCRIPT_SPEEDUP = 4
+
+# Preferred tags, one per required tag family (meal, difficulty, time)
+_REQUIRED_TAGS = ["cină", "începător", "rapid"]
+
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def fake_call_gemini_api(video_url: str, available_tags: list, api_key: str,
+                         transcript: Optional[str] = None, usage: Optional[Dict] = None,
+                         model_name: Optional[str] = None, generation_config: Optional[Dict] = None) -> Dict:
+    """
+    Return a valid, deterministic recipe for a YouTube URL
+
+    Args:
+        video_url: YouTube video URL
+        available_tags: List of allowed tags
+        api_key: Ignored
+        transcript: Cleaned transcript text (shortens the simulated latency)
+        usage: Optional dict filled with estimated prompt_tokens / output_tokens
+        model_name: Cascade model; later tiers are slower, the first tier
+            returns a too-short recipe for about one video in four
+        generation_config: Ignored
+
+    Returns:
+        dict: Recipe JSON object (same shape as call_gemini_api)
+
+    Raises:
+        RuntimeError: 429 error when more than FAKE_CAPACITY calls are in flight
+    """
+    digest = hashlib.sha256(video_url.encode("utf-8")).digest()
+    tier = next((i for i, t in enumerate(MODEL_TIERS) if t["model"] == model_name), len(MODEL_TIERS) - 1)
+    latency = (FAKE_LATENCY_MIN + (FAKE_LATENCY_MAX - FAKE_LATENCY_MIN) * digest[0] / 255) * (1 + tier)
+    if FAKE_STRAGGLER_RATE and random.random() < FAKE_STRAGGLER_RATE:
+        latency *= FAKE_STRAGGLER_FACTOR
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight += 1
+        load = _in_flight
+    try:
+        if FAKE_CAPACITY:
+            if load > FAKE_CAPACITY:
+                time.sleep(FAKE_LATENCY_MIN)
+                raise RuntimeError("429 Resource has been exhausted (fake backend capacity)")
+            latency *= 1 + max(0.0, load - FAKE_CAPACITY / 2) / (FAKE_CAPACITY / 2)
+        time.sleep(latency / FAKE_TRANSCRIPT_SPEEDUP if transcript else latency)
+    finally:
+        with _in_flight_lock:
+            _in_flight -= 1
+
+    if usage is not None:
+        usage["prompt_tokens"] = estimate_tokens(build_prompt(video_url, available_tags, transcript))
+        usage["output_tokens"] = 600
+
+    tags = [tag for tag in _REQUIRED_TAGS if tag in available_tags]
+    tags += [tag for tag in available_tags if tag not in tags][:max(0, 3 - len(tags))]
+
+    prep_time = 5 + digest[1] % 30
+    cook_time = 5 + digest[2] % 60
+
+    recipe = {
+        "recipeId": recipe_id_for_video(extract_video_id(video_url)),
+        "title": f"Rețetă de test {digest.hex()[:6]}",
+        "description": "Rețetă generată local de backend-ul de test, fără apel către Gemini.",
+        "imageUrl": PLACEHOLDER_IMAGE_URL,
+        "prepTime": prep_time,
+        "cookTime": cook_time,
+        "totalTime": prep_time + cook_time,
+        "servings": 1 + digest[3] % 6,
+        "difficulty": "beginner",
+        "ingredients": [
+            {"name": "făină", "quantity": 250.0, "unit": "g"},
+            {"name": "ouă", "quantity": 2.0, "unit": "buc"},
+            {"name": "sare", "quantity": 1.0, "unit": "la gust"}
+        ],
+        "instructions": [
+            "Amestecați făina cu ouăle într-un bol încăpător.",
+            "Adăugați sare după gust și frământați până obțineți un aluat omogen.",
+            "Gătiți la foc mediu până devine auriu."
+        ],
+        "nutrition": {
+            "calories": 350.0,
+            "protein": 12.0,
+            "carbs": 45.0,
+            "fats": 10.0,
+            "healthScore": 60
+        },
+        "tags": tags,
+        "category": "dinner",
+        "cuisine": "romanian",
+        "createdBy": "youtube_import",
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+        "isFavorite": False,
+        # Roughly one video in eight pretends to have no transcript
+        "no_transcript_warning": not transcript and digest[4] % 8 == 0
+    }
+
+    if tier == 0 and digest[5] % 4 == 0:
+        recipe["instructions"] = recipe["instructions"][:2]
+    return recipe
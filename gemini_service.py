@@ -4,16 +4,46 @@ Handles communication with Google Gemini API for recipe extraction
 """
 
 import json
+import re
+import uuid
 from datetime import datetime
-from typing import Dict
-import google.generativeai as genai
+from typing import Dict, Optional
 
 from config import (
     GEMINI_MODEL,
     GENERATION_CONFIG,
     SAFETY_SETTINGS,
-    PLACEHOLDER_IMAGE_URL
+    PLACEHOLDER_IMAGE_URL,
+    PROMPT_STYLE,
+    NUTRITION_SOURCE
 )
+from prompt_compiler import compile_prompt, decode_tags, PROMPT_STYLE_COMPACT
+from nutrition import NUTRITION_SOURCE_MODEL
+
+# Single pass over watch?v=, youtu.be/, embed/ and v/ URLs; group 1 is the video ID
+YOUTUBE_VIDEO_ID_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?v=|embed/|v/)|youtu\.be/)([a-zA-Z0-9_-]{11})'
+)
+
+# Namespace of the deterministic recipe IDs (one per video, stable across re-extractions)
+RECIPE_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://www.youtube.com/")
+
+
+class InvalidResponseError(Exception):
+    """The model answered, but not with a JSON recipe object (a stronger model may do better)"""
+
+
+# Source section of the prompt: the video link alone, or the link plus a local transcript
+VIDEO_SOURCE_SECTION = """# LINK VIDEO
+{youtube_url}"""
+
+TRANSCRIPT_SOURCE_SECTION = """# LINK VIDEO
+{youtube_url}
+
+# TRANSCRIERE
+Transcrierea completă a videoclipului este inclusă mai jos. Folosește-o ca sursă principală pentru ingrediente, cantități și pași; nu este necesară analiza videoclipului. Setează no_transcript_warning la false.
+
+{transcript}"""
 
 # Comprehensive Recipe Extraction Prompt
 RECIPE_EXTRACTION_PROMPT = """
@@ -22,8 +52,7 @@ Tu ești un expert în extragerea și structurarea rețetelor culinare din video
 # MISIUNE
 Analizează videoclipul YouTube de la link-ul furnizat și extrage o rețetă de gătit structurată în format JSON, gata pentru import direct într-o aplicație de management rețete.
 
-# LINK VIDEO
-{youtube_url}
+{video_source}
 
 # INSTRUCȚIUNI CRITICE
 
@@ -307,7 +336,37 @@ Returnează DOAR obiectul JSON, fără text suplimentar, fără markdown code bl
 Asigură-te că JSON-ul este valid și poate fi parsat direct.
 """
 
-def call_gemini_api(video_url: str, available_tags: list, api_key: str) -> Dict:
+def build_prompt(video_url: str, available_tags: list, transcript: Optional[str] = None,
+                 prompt_style: str = PROMPT_STYLE) -> str:
+    """
+    Build the extraction prompt for a video
+
+    Args:
+        video_url: YouTube video URL
+        available_tags: List of allowed tags
+        transcript: Cleaned transcript text, included instead of asking for video analysis
+        prompt_style: "compact" (compiled prompt, numbered tags) or "full" (RECIPE_EXTRACTION_PROMPT)
+
+    Returns:
+        str: Prompt text
+    """
+    if transcript:
+        video_source = TRANSCRIPT_SOURCE_SECTION.format(youtube_url=video_url, transcript=transcript)
+    else:
+        video_source = VIDEO_SOURCE_SECTION.format(youtube_url=video_url)
+
+    if prompt_style == PROMPT_STYLE_COMPACT:
+        # Nutrition computed locally is not asked for (saves output tokens)
+        return compile_prompt(video_source, available_tags, include_nutrition=NUTRITION_SOURCE == NUTRITION_SOURCE_MODEL)
+    return RECIPE_EXTRACTION_PROMPT.format(
+        video_source=video_source,
+        available_tags=", ".join(available_tags)
+    )
+
+def call_gemini_api(video_url: str, available_tags: list, api_key: str,
+                    transcript: Optional[str] = None, usage: Optional[Dict] = None,
+                    model_name: str = GEMINI_MODEL, generation_config: Optional[Dict] = None,
+                    prompt_style: str = PROMPT_STYLE) -> Dict:
     """
     Calls Gemini API to extract recipe from YouTube video
 
@@ -315,36 +374,43 @@ def call_gemini_api(video_url: str, available_tags: list, api_key: str) -> Dict:
         video_url: YouTube video URL
         available_tags: List of allowed tags
         api_key: Google Gemini API key
+        transcript: Cleaned transcript text; sent instead of asking for video analysis
+        usage: Optional dict filled with prompt_tokens / output_tokens of the request
+        model_name: Gemini model (one of the MODEL_TIERS models)
+        generation_config: Generation settings of that model (default: GENERATION_CONFIG)
+        prompt_style: "compact" or "full" prompt (see build_prompt)
 
     Returns:
         dict: Recipe JSON object
 
     Raises:
-        Exception: If API call fails or response is invalid
+        InvalidResponseError: If the response is not a JSON object
+        Exception: If the API call fails
     """
     # Configure Gemini
+    # Imported on first use: the SDK and its grpc/protobuf stack take about a second to load
+    import google.generativeai as genai
+
     genai.configure(api_key=api_key)
 
     # Create model instance
     model = genai.GenerativeModel(
-        model_name=GEMINI_MODEL,
-        generation_config=GENERATION_CONFIG,
+        model_name=model_name,
+        generation_config=generation_config or GENERATION_CONFIG,
         safety_settings=SAFETY_SETTINGS
     )
 
-    # Format available tags as comma-separated string
-    tags_str = ", ".join(available_tags)
-
     # Build prompt
-    prompt = RECIPE_EXTRACTION_PROMPT.format(
-        youtube_url=video_url,
-        available_tags=tags_str
-    )
+    prompt = build_prompt(video_url, available_tags, transcript, prompt_style)
 
     try:
         # Send request
         response = model.generate_content(prompt)
 
+        if usage is not None and getattr(response, "usage_metadata", None):
+            usage["prompt_tokens"] = response.usage_metadata.prompt_token_count
+            usage["output_tokens"] = response.usage_metadata.candidates_token_count
+
         # Extract text from response
         response_text = response.text.strip()
 
@@ -360,6 +426,16 @@ def call_gemini_api(video_url: str, available_tags: list, api_key: str) -> Dict:
 
         # Parse JSON response
         recipe_json = json.loads(response_text)
+        if not isinstance(recipe_json, dict):
+            raise InvalidResponseError(f"Invalid JSON response from Gemini: expected an object, "
+                                       f"got {type(recipe_json).__name__}")
+
+        # The compact prompt asks for tag numbers and leaves out the fixed fields
+        recipe_json['tags'] = decode_tags(recipe_json.get('tags'), available_tags)
+        # Derived from the video, not generated: re-extracting a video must update its recipe
+        recipe_json['recipeId'] = recipe_id_for_video(extract_video_id(video_url))
+        if not recipe_json.get('createdBy'):
+            recipe_json['createdBy'] = "youtube_import"
 
         # Add current timestamp if missing
         if not recipe_json.get('createdAt'):
@@ -373,42 +449,65 @@ def call_gemini_api(video_url: str, available_tags: list, api_key: str) -> Dict:
         if 'isFavorite' not in recipe_json:
             recipe_json['isFavorite'] = False
 
+        # The transcript was in the prompt, whatever the model claims
+        if transcript:
+            recipe_json['no_transcript_warning'] = False
+
         return recipe_json
 
+    except InvalidResponseError:
+        raise
     except json.JSONDecodeError as e:
-        raise Exception(f"Invalid JSON response from Gemini: {str(e)}")
+        raise InvalidResponseError(f"Invalid JSON response from Gemini: {str(e)}")
     except Exception as e:
         raise Exception(f"Gemini API error: {str(e)}")
 
-def sanitize_youtube_url(url: str) -> str:
+def extract_video_id(url: str) -> str:
     """
-    Extract clean YouTube video URL
+    Extract the 11-character YouTube video ID from a URL
 
     Args:
         url: Raw YouTube URL
 
     Returns:
-        str: Clean YouTube URL
+        str: Video ID
 
     Raises:
         ValueError: If URL is not a valid YouTube URL
     """
-    import re
+    match = YOUTUBE_VIDEO_ID_RE.search(url)
+    if match:
+        return match.group(1)
 
-    # Extract video ID
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/embed\/([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/v\/([a-zA-Z0-9_-]{11})'
-    ]
+    raise ValueError(f"Invalid YouTube URL: {url}")
 
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            video_id = match.group(1)
-            return f"https://www.youtube.com/watch?v={video_id}"
+def recipe_id_for_video(video_id: str) -> str:
+    """
+    Deterministic recipeId of a video's recipe
 
-    raise ValueError(f"Invalid YouTube URL: {url}")
+    Args:
+        video_id: 11-character YouTube video ID
+
+    Returns:
+        str: UUID (version 5) derived from the video ID
+    """
+    return str(uuid.uuid5(RECIPE_ID_NAMESPACE, video_id))
+
+def sanitize_youtube_url(url: str) -> str:
+    """
+    Extract clean YouTube video URL
+
+    Args:
+        url: Raw YouTube URL
+
+    Returns:
+        str: Clean YouTube URL
+
+    Raises:
+        ValueError: If URL is not a valid YouTube URL
+    """
+    video_id = extract_video_id(url)
+    return f"https://www.youtube.com/watch?v={video_id}"
 
 def is_valid_youtube_url(url: str) -> bool:
     """
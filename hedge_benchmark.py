@@ -0,0 +1,67 @@
+"""
+Hedging Benchmark
+Runs the same batch against the fake backend with and without request hedging and
+reports per-call p50/p99 latency and batch makespan
+
+Usage:
+    python hedge_benchmark.py
+    python hedge_benchmark.py --count 500 --concurrency 16 --straggler-rate 0.08
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+import fake_backend
+from config import AVAILABLE_TAGS, MODEL_TIERS, HEDGE_PERCENTILE, HEDGE_BUDGET
+from hedging import HedgedExtractor, percentile
+from recipe_pipeline import process_url
+
+
+def run_batch(extract_fn: Callable, urls: list, concurrency: int) -> Dict:
+    """Process every URL on a single model tier and time the batch"""
+    tiers = [MODEL_TIERS[0]]
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(
+            lambda url: process_url(url, AVAILABLE_TAGS, "fake", extract_fn, tiers=tiers), urls
+        ))
+    latencies = [result.elapsed for result in results]
+    return {
+        "makespan": time.monotonic() - start,
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99)
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Request hedging benchmark (fake backend)")
+    parser.add_argument("--count", type=int, default=300, help="URLs per run (default: 300)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel extractions (default: 8)")
+    parser.add_argument("--straggler-rate", type=float, default=0.05,
+                        help="Share of requests that are slowed down (default: 0.05)")
+    parser.add_argument("--percentile", type=float, default=HEDGE_PERCENTILE,
+                        help=f"Hedge trigger percentile (default: {HEDGE_PERCENTILE})")
+    parser.add_argument("--budget", type=float, default=HEDGE_BUDGET,
+                        help=f"Hedge budget (default: {HEDGE_BUDGET})")
+    args = parser.parse_args(argv)
+
+    fake_backend.FAKE_STRAGGLER_RATE = args.straggler_rate
+    urls = [f"https://www.youtube.com/watch?v=bench{i:06d}" for i in range(args.count)]
+
+    plain = run_batch(fake_backend.fake_call_gemini_api, urls, args.concurrency)
+    hedger = HedgedExtractor(fake_backend.fake_call_gemini_api, q=args.percentile, budget=args.budget)
+    hedged = run_batch(hedger, urls, args.concurrency)
+
+    print(f"{'':<16}{'p50':>8}{'p99':>8}{'makespan':>10}")
+    for name, stats in (("without hedging", plain), ("with hedging", hedged)):
+        print(f"{name:<16}{stats['p50']:>7.2f}s{stats['p99']:>7.2f}s{stats['makespan']:>9.2f}s")
+    for line in hedger.report():
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Hedging Module
+Hedged extraction requests: a duplicate call is sent when the first one is slower than
+a recent latency percentile, and the first answer wins
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional
+
+from config import HEDGE_PERCENTILE, HEDGE_BUDGET, HEDGE_MIN_SAMPLES, HEDGE_WINDOW
+from concurrency import THROTTLE_PATTERN
+
+# Usage counters summed over every request a hedged call sent
+USAGE_TOKEN_KEYS = ("prompt_tokens", "output_tokens")
+
+# Latencies kept for the p50/p99 report (the most recent calls)
+REPORT_SAMPLES = 10000
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q between 0 and 1) of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies"""
+
+    def __init__(self, window: int = HEDGE_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def threshold(self, q: float) -> Optional[float]:
+        """Latency percentile, or None until enough calls were observed"""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            return percentile(list(self.samples), q)
+
+
+def _run_in_thread(fn: Callable, *args, **kwargs) -> Future:
+    """
+    Run fn on its own daemon thread
+
+    A losing request cannot be interrupted mid-flight; daemon threads let
+    the process exit without waiting for abandoned calls.
+    """
+    future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+class HedgedExtractor:
+    """
+    Wraps an extraction backend (call_gemini_api signature) with hedging.
+
+    Latencies are tracked per model. When a call is still running after
+    the tracked percentile (p90 by default) and the hedge budget allows
+    it, an identical request is sent and whichever succeeds first is
+    returned; the other one is cancelled if it has not started, otherwise
+    its answer is discarded. The budget caps hedges to a fraction of all
+    calls, which bounds the extra spend. The reported token usage is the
+    sum over every request sent, a request still in flight being counted
+    like the winning one.
+
+    The latency of every primary request is kept as well, which gives the
+    latency the same calls would have had without hedging.
+
+    With an AdaptiveLimiter (the runner's), a hedge is a call in flight
+    like any other: it is only sent when the limiter has a free slot and
+    releases that slot when it finishes, so hedges never push the calls
+    in flight above the limit during a 429 storm. A primary request that
+    is still running when the hedge wins takes over a slot until it
+    finishes, since the runner frees its own slot as soon as we return.
+    """
+
+    def __init__(self, extract_fn: Callable, q: float = HEDGE_PERCENTILE, budget: float = HEDGE_BUDGET,
+                 limiter=None):
+        self.extract_fn = extract_fn
+        self.q = q
+        self.budget = budget
+        self.limiter = limiter
+        self.hedges_skipped = 0
+        self.calls = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self.latencies: deque = deque(maxlen=REPORT_SAMPLES)
+        self.primary_latencies: deque = deque(maxlen=REPORT_SAMPLES)
+        self._primary_started: Dict[Future, float] = {}
+        self._trackers: Dict[Optional[str], LatencyTracker] = {}
+        self._lock = threading.Lock()
+
+    def _tracker(self, model_name: Optional[str]) -> LatencyTracker:
+        with self._lock:
+            return self._trackers.setdefault(model_name, LatencyTracker())
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def _launch_hedge(self, tracker: LatencyTracker, args: tuple, kwargs: Dict,
+                      usage: Optional[Dict]) -> Optional[Future]:
+        """Send the duplicate request, or return None when the limiter has no free slot"""
+        if self.limiter is None:
+            return self._launch(tracker, args, kwargs, usage)
+
+        token = self.limiter.try_acquire()
+        if token is None:
+            with self._lock:
+                self.hedges -= 1
+                self.hedges_skipped += 1
+            return None
+
+        start = time.monotonic()
+        hedge = self._launch(tracker, args, kwargs, usage)
+
+        def release(future: Future):
+            error = None if future.cancelled() else future.exception()
+            throttled = error is not None and THROTTLE_PATTERN.search(str(error)) is not None
+            self.limiter.release(token, time.monotonic() - start, throttled=throttled,
+                                 error=error is not None and not throttled)
+
+        hedge.add_done_callback(release)
+        return hedge
+
+    def _launch(self, tracker: LatencyTracker, args: tuple, kwargs: Dict, usage: Optional[Dict]) -> Future:
+        def timed_call():
+            start = time.monotonic()
+            try:
+                return self.extract_fn(*args, **kwargs, usage=usage)
+            finally:
+                tracker.record(time.monotonic() - start)
+
+        return _run_in_thread(timed_call)
+
+    def _primary_done(self, future: Future):
+        with self._lock:
+            started = self._primary_started.pop(future, None)
+            if started is not None:
+                self.primary_latencies.append(time.monotonic() - started)
+
+    def __call__(self, video_url: str, available_tags: list, api_key: str, **kwargs) -> Dict:
+        usage = kwargs.pop("usage", None)
+        tracker = self._tracker(kwargs.get("model_name"))
+        delay = tracker.threshold(self.q)
+        args = (video_url, available_tags, api_key)
+        start = time.monotonic()
+
+        with self._lock:
+            self.calls += 1
+        usages = {}
+
+        primary_usage = dict(usage) if usage is not None else None
+        primary = self._launch(tracker, args, kwargs, primary_usage)
+        usages[primary] = primary_usage
+        with self._lock:
+            self._primary_started[primary] = start
+        primary.add_done_callback(self._primary_done)
+
+        pending = {primary}
+        if delay is not None:
+            done, _ = wait(pending, timeout=delay)
+            if not done and self._take_hedge():
+                hedge_usage = dict(usage) if usage is not None else None
+                hedge = self._launch_hedge(tracker, args, kwargs, hedge_usage)
+                if hedge is not None:
+                    usages[hedge] = hedge_usage
+                    pending.add(hedge)
+
+        winner, error = None, None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    winner = future
+                    break
+                error = future.exception()
+
+        for future in pending:
+            future.cancel()
+        if primary in pending and not primary.cancelled() and self.limiter is not None:
+            # Still holds an HTTP call open after we return
+            token = self.limiter.acquire()
+            primary.add_done_callback(lambda _: self.limiter.cancel(token))
+
+        with self._lock:
+            self.latencies.append(time.monotonic() - start)
+            if winner is not None and winner is not primary:
+                self.hedges_won += 1
+
+        if winner is None:
+            raise error
+
+        if usage is not None:
+            usage.update(usages[winner])
+            for key in USAGE_TOKEN_KEYS:
+                if key in usage:
+                    usage[key] = sum(self._call_usage(future, call_usage, usages[winner]).get(key, 0)
+                                     for future, call_usage in usages.items())
+        return winner.result()
+
+    @staticmethod
+    def _call_usage(future: Future, call_usage: Dict, winner_usage: Dict) -> Dict:
+        """Tokens of one sent request: its own once finished, the winner's while it still runs"""
+        if future.cancelled():
+            return {}
+        return call_usage if future.done() else winner_usage
+
+    def report(self) -> List[str]:
+        """Hedge counts and p50/p99 with hedging vs the primary requests alone"""
+        with self._lock:
+            hedged = list(self.latencies)
+            now = time.monotonic()
+            # Abandoned primaries still in flight count with their elapsed time (a lower bound)
+            unhedged = list(self.primary_latencies) + [now - started for started in self._primary_started.values()]
+            lines = [f"Hedging: {self.hedges} hedges for {self.calls} calls "
+                     f"({self.hedges / self.calls if self.calls else 0:.1%}, budget {self.budget:.0%}), "
+                     f"{self.hedges_won} won by the hedge"
+                     + (f", {self.hedges_skipped} skipped at the concurrency limit" if self.hedges_skipped else "")]
+
+        if hedged and unhedged:
+            lines.append(
+                f"Latency p50/p99: {percentile(hedged, 0.5):.2f}s/{percentile(hedged, 0.99):.2f}s hedged, "
+                f"{percentile(unhedged, 0.5):.2f}s/{percentile(unhedged, 0.99):.2f}s without hedging"
+            )
+        return lines
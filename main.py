@@ -6,7 +6,10 @@ Desktop GUI application for extracting recipes from YouTube videos
 import tkinter as tk
 from tkinter import scrolledtext, messagebox, filedialog, ttk
 import threading
-import json
+import itertools
+import queue
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from pathlib import Path
 
@@ -14,11 +17,81 @@ from config import (
     GUI_TEXT,
     AVAILABLE_TAGS,
     OUTPUT_DIR,
+    JOURNAL_DIR,
+    RECIPE_STORE_FILE,
+    TRANSCRIPT_DIR,
+    EXPORT_MANIFEST_FILE,
+    EXPORT_SHARD_MAX_BYTES,
+    EXPORT_SHARD_MAX_RECIPES,
+    LOG_MAX_LINES,
+    LOG_FLUSH_INTERVAL_MS,
+    LOG_MAX_EVENTS_PER_FLUSH,
+    CONCURRENCY_THROTTLE_RETRIES,
+    NUTRITION_SOURCE,
+    ensure_dirs,
     load_api_key,
     save_api_key as save_api_key_to_file
 )
-from gemini_service import call_gemini_api, is_valid_youtube_url
-from recipe_validator import validate_recipe
+from gemini_service import extract_video_id
+from recipe_pipeline import process_url, CascadeStats, RESULT_ERROR, RESULT_INVALID, RESULT_NEEDS_REVIEW
+from export_writer import JsonlExportWriter, ShardedExportWriter
+from export_manifest import ExportManifest
+from columnar_export import ColumnarExportWriter, FORMAT_ARROW, FORMAT_PARQUET
+from recipe_store import RecipeStore
+from url_ingest import UrlIngestor, open_url_file
+from transcripts import SavingsTracker, SOURCE_TRANSCRIPT
+from recipe_preview import RecipePreviewWindow, format_recipe_details
+from recipe_model import Recipe
+from scheduler import JobScheduler, CostEstimator, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BULK
+from concurrency import AdaptiveLimiter, should_retry
+from nutrition import get_calculator, NUTRITION_SOURCE_LOCAL
+from batch_journal import (
+    BatchJournal,
+    batch_journal_path,
+    latest_batch_journal,
+    FINAL_STATUSES,
+    STATUS_PENDING,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_REJECTED,
+    STATUS_DEFERRED
+)
+
+
+class BatchOutput:
+    """
+    Where the accepted recipes of one batch go: its store batch, its
+    checkpoint journal and its autosave JSONL file.
+
+    Reviews of a batch may be resolved after the next batch has started,
+    so each pending review keeps the BatchOutput it came from. The
+    autosave file is created with the first accepted recipe and closed
+    once the batch has finished and none of its reviews are pending.
+    """
+
+    def __init__(self, batch_id: str, journal: BatchJournal):
+        self.batch_id = batch_id
+        self.journal = journal
+        self.autosave_path = OUTPUT_DIR / f"recipes_autosave_{batch_id}.jsonl"
+        self.running = True
+        self._autosave = None
+        self._lock = threading.Lock()
+
+    def autosave(self, recipe_json: dict) -> bool:
+        """Append an accepted recipe to the autosave file; True when this created the file"""
+        with self._lock:
+            created = self._autosave is None
+            if created:
+                self._autosave = JsonlExportWriter(self.autosave_path)
+            self._autosave.write(recipe_json)
+            return created
+
+    def close(self):
+        with self._lock:
+            if self._autosave is not None:
+                self._autosave.close()
+                self._autosave = None
+
 
 class YouTubeRecipeGeneratorApp:
     def __init__(self, root):
@@ -27,11 +100,34 @@ class YouTubeRecipeGeneratorApp:
         self.root.geometry("800x900")
         self.root.resizable(True, True)
 
-        self.recipes = []
+        # Generated recipes live in the local store, scoped by batch
+        self.store = RecipeStore(RECIPE_STORE_FILE)
+        self.batch_id = None
+        self.journal = None
         self.processing = False
 
+        # Jobs of the running batch; links typed while it runs jump ahead of imported ones
+        self.scheduler = None
+        self.estimator = None
+        self.started_ids = set()
+        self.schedule_lock = threading.Lock()
+
+        # URLs loaded from a text/CSV file (kept out of the text box)
+        self.imported_urls = []
+
+        # Recipes without transcript waiting for a decision: video_id -> (url, Recipe, BatchOutput);
+        # kept as compact Recipe objects since a large batch can defer thousands of them
+        self.pending_reviews = OrderedDict()
+        self.review_order = []
+        self.review_window = None
+
+        # Worker threads never touch widgets: they push log lines and UI
+        # callbacks here and the Tk main loop drains the queue periodically
+        self.ui_events = queue.Queue()
+
         self.setup_ui()
         self.load_saved_api_key()
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self.drain_ui_events)
 
     def setup_ui(self):
         """Create all GUI components"""
@@ -78,9 +174,18 @@ class YouTubeRecipeGeneratorApp:
         current_row += 1
 
         # === URLs Section ===
-        ttk.Label(main_frame, text=GUI_TEXT["urls_label"], font=("Arial", 10, "bold")).grid(
-            row=current_row, column=0, sticky=tk.W, pady=(0, 5)
+        urls_header = ttk.Frame(main_frame)
+        urls_header.grid(row=current_row, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        urls_header.columnconfigure(1, weight=1)
+
+        ttk.Label(urls_header, text=GUI_TEXT["urls_label"], font=("Arial", 10, "bold")).grid(
+            row=0, column=0, sticky=tk.W
         )
+        self.import_label = ttk.Label(urls_header, text="", font=("Arial", 9))
+        self.import_label.grid(row=0, column=1, sticky=tk.E, padx=(10, 10))
+        self.import_button = ttk.Button(urls_header, text=GUI_TEXT["import_button"],
+                                        command=self.import_urls_file)
+        self.import_button.grid(row=0, column=2)
         current_row += 1
 
         self.urls_text = scrolledtext.ScrolledText(main_frame, height=10, font=("Arial", 10), wrap=tk.WORD)
@@ -91,12 +196,19 @@ class YouTubeRecipeGeneratorApp:
         current_row += 1
 
         # === Generate Button ===
+        generate_frame = ttk.Frame(main_frame)
+        generate_frame.grid(row=current_row, column=0, pady=(0, 15))
+
         self.generate_button = ttk.Button(
-            main_frame,
+            generate_frame,
             text=GUI_TEXT["generate_button"],
             command=self.generate_recipes
         )
-        self.generate_button.grid(row=current_row, column=0, pady=(0, 15))
+        self.generate_button.grid(row=0, column=0, padx=(0, 10))
+
+        self.resume_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(generate_frame, text=GUI_TEXT["resume_checkbox"],
+                        variable=self.resume_var).grid(row=0, column=1)
 
         current_row += 1
 
@@ -127,7 +239,15 @@ class YouTubeRecipeGeneratorApp:
 
         self.export_button = ttk.Button(button_frame, text=GUI_TEXT["export_button"],
                                        command=self.export_recipes, state=tk.DISABLED)
-        self.export_button.grid(row=0, column=1)
+        self.export_button.grid(row=0, column=1, padx=(0, 10))
+
+        self.delta_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(button_frame, text=GUI_TEXT["export_delta_checkbox"],
+                        variable=self.delta_var).grid(row=0, column=2, padx=(0, 10))
+
+        self.review_button = ttk.Button(button_frame, text=GUI_TEXT["review_button"].format(count=0),
+                                        command=self.show_review_panel, state=tk.DISABLED)
+        self.review_button.grid(row=0, column=3)
 
         # Configure row weights for resizing
         for i in range(current_row + 1):
@@ -155,17 +275,71 @@ class YouTubeRecipeGeneratorApp:
             messagebox.showwarning("Atenție", "Vă rugăm să introduceți o cheie API validă.")
 
     def log_progress(self, message: str, tag: str = ""):
-        """Add message to progress log"""
+        """Add message to progress log (safe to call from any thread)"""
+        self.ui_events.put((message, tag))
+
+    def run_on_ui(self, callback):
+        """Schedule a callback on the Tk main loop (safe to call from any thread)"""
+        self.ui_events.put(callback)
+
+    def drain_ui_events(self):
+        """Flush pending log lines and UI callbacks in queue order (main thread only)"""
+        chunks = []
+
+        try:
+            for _ in range(LOG_MAX_EVENTS_PER_FLUSH):
+                try:
+                    event = self.ui_events.get_nowait()
+                except queue.Empty:
+                    break
+
+                if callable(event):
+                    # Lines queued before the callback are shown before it runs
+                    self.write_log(chunks)
+                    chunks = []
+                    try:
+                        event()
+                    except Exception as e:
+                        chunks.append(([GUI_TEXT["error_ui_callback"].format(error=str(e))], "error"))
+                    continue
+
+                # Merge consecutive lines with the same tag into one insert
+                message, tag = event
+                if chunks and chunks[-1][1] == tag:
+                    chunks[-1][0].append(message)
+                else:
+                    chunks.append(([message], tag))
+
+            self.write_log(chunks)
+        finally:
+            # Come back immediately if the queue still holds a backlog
+            delay = 1 if not self.ui_events.empty() else LOG_FLUSH_INTERVAL_MS
+            self.root.after(delay, self.drain_ui_events)
+
+    def write_log(self, chunks):
+        """Append (lines, tag) chunks to the progress log, keeping the last LOG_MAX_LINES lines"""
+        if not chunks:
+            return
+
         self.progress_text.config(state=tk.NORMAL)
-        if tag:
-            self.progress_text.insert(tk.END, message + "\n", tag)
-        else:
-            self.progress_text.insert(tk.END, message + "\n")
+        for messages, tag in chunks:
+            self.progress_text.insert(tk.END, "\n".join(messages) + "\n", tag or ())
+
+        line_count = int(self.progress_text.index("end-1c").split(".")[0])
+        if line_count > LOG_MAX_LINES:
+            self.progress_text.delete("1.0", f"{line_count - LOG_MAX_LINES + 1}.0")
+
         self.progress_text.see(tk.END)
         self.progress_text.config(state=tk.DISABLED)
-        self.root.update_idletasks()
 
-    def validate_inputs(self):
+    def typed_video_ids(self) -> dict:
+        """Video IDs typed or pasted in the text box, mapped to their URL"""
+        urls_text = self.urls_text.get("1.0", tk.END).strip()
+        if urls_text == GUI_TEXT["urls_placeholder"].strip():
+            return {}
+        return dict(UrlIngestor(urls_text.splitlines()))
+
+    def validate_inputs(self, allow_empty_urls: bool = False):
         """Validate user inputs"""
         # Check API key
         api_key = self.api_key_entry.get().strip()
@@ -174,31 +348,76 @@ class YouTubeRecipeGeneratorApp:
 
         # Get and validate URLs
         urls_text = self.urls_text.get("1.0", tk.END).strip()
-        if not urls_text or urls_text == GUI_TEXT["urls_placeholder"].strip():
+        if urls_text == GUI_TEXT["urls_placeholder"].strip():
+            urls_text = ""
+        if not urls_text and not self.imported_urls:
+            if allow_empty_urls:
+                return True, api_key, []
             return False, GUI_TEXT["error_no_urls"], []
 
-        urls = [line.strip() for line in urls_text.split("\n") if line.strip()]
+        # Text box and imported file go through one pass (deduplicated by video ID)
+        reject_path = OUTPUT_DIR / f"rejected_urls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        ingestor = UrlIngestor(itertools.chain(urls_text.splitlines(), self.imported_urls), reject_path)
+        valid_urls = [url for _, url in ingestor]
 
-        # Validate YouTube URLs
-        valid_urls = []
-        for url in urls:
-            if is_valid_youtube_url(url):
-                valid_urls.append(url)
-            else:
-                self.log_progress(GUI_TEXT["error_invalid_url"].format(url=url), "error")
+        if ingestor.rejected or ingestor.duplicates:
+            self.log_progress(GUI_TEXT["urls_ingest_summary"].format(
+                accepted=ingestor.accepted, duplicates=ingestor.duplicates, rejected=ingestor.rejected
+            ), "warning")
+        if ingestor.rejected:
+            self.log_progress(GUI_TEXT["urls_rejected_file"].format(path=reject_path), "warning")
 
         if not valid_urls:
             return False, "Nu s-au găsit URL-uri YouTube valide.", []
 
         return True, api_key, valid_urls
 
+    def import_urls_file(self):
+        """Load URLs from a text or CSV file in the background"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[
+                ("Text / CSV", "*.txt *.csv"),
+                ("All files", "*.*")
+            ]
+        )
+        if not file_path:
+            return
+
+        self.import_button.config(state=tk.DISABLED)
+        reject_path = OUTPUT_DIR / f"rejected_urls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+
+        def ingest():
+            try:
+                ingestor = UrlIngestor(open_url_file(file_path), reject_path)
+                urls = [url for _, url in ingestor]
+            except (OSError, UnicodeDecodeError) as e:
+                self.log_progress(GUI_TEXT["error_processing"].format(error=str(e)), "error")
+                self.run_on_ui(lambda: self.import_button.config(state=tk.NORMAL))
+                return
+            self.run_on_ui(lambda: self.finish_import(Path(file_path).name, urls, ingestor, reject_path))
+
+        threading.Thread(target=ingest, daemon=True).start()
+
+    def finish_import(self, file_name: str, urls: list, ingestor: UrlIngestor, reject_path: Path):
+        """Keep the imported URLs and report the ingestion counters (main thread)"""
+        self.imported_urls = urls
+        self.import_button.config(state=tk.NORMAL)
+        self.import_label.config(text=GUI_TEXT["import_summary"].format(count=len(urls), name=file_name))
+        self.log_progress(GUI_TEXT["urls_ingest_summary"].format(
+            accepted=ingestor.accepted, duplicates=ingestor.duplicates, rejected=ingestor.rejected
+        ))
+        if ingestor.rejected:
+            self.log_progress(GUI_TEXT["urls_rejected_file"].format(path=reject_path), "warning")
+
     def generate_recipes(self):
         """Start recipe generation process"""
         if self.processing:
+            self.add_interactive_urls()
             return
 
-        # Validate inputs
-        is_valid, result, urls = self.validate_inputs()
+        # Validate inputs (a resumed batch may take its URLs from the journal)
+        resume = self.resume_var.get()
+        is_valid, result, urls = self.validate_inputs(allow_empty_urls=resume)
         if not is_valid:
             messagebox.showerror("Eroare", result)
             return
@@ -209,147 +428,392 @@ class YouTubeRecipeGeneratorApp:
         tags_text = self.tags_text.get("1.0", tk.END).strip()
         available_tags = [tag.strip() for tag in tags_text.split(",") if tag.strip()]
 
-        # Clear previous results
-        self.recipes = []
+        # Every batch has its own checkpoint journal, so reviews of an earlier
+        # batch resolved later never write into this one; a resume continues
+        # the journal of the most recent batch
+        self.batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        journal_path = (resume and latest_batch_journal(JOURNAL_DIR)) or batch_journal_path(JOURNAL_DIR, self.batch_id)
+        if self.journal is not None and self.journal.path == journal_path:
+            # Reviews still pending from that batch share its journal object
+            journal = self.journal
+        else:
+            journal = BatchJournal(journal_path)
+        journal.start(urls, [extract_video_id(url) for url in urls], resume=resume)
+        self.journal = journal
+
+        # Start a new batch in the store (completed items survive a resume)
+        batch = BatchOutput(self.batch_id, journal)
+        if resume:
+            self.store.add_many(journal.completed_recipes(), batch_id=self.batch_id)
+            for video_id, url, recipe_json in journal.deferred_entries():
+                self.queue_for_review(video_id, url, recipe_json, batch)
+        urls = journal.unfinished_urls()
         self.progress_text.config(state=tk.NORMAL)
         self.progress_text.delete("1.0", tk.END)
         self.progress_text.config(state=tk.DISABLED)
 
-        # Start processing in background thread
+        if resume:
+            self.log_progress(GUI_TEXT["resume_summary"].format(done=self.store.count(self.batch_id), remaining=len(urls)))
+
+        # Typed links first, then the resumed leftovers, imported files last
+        typed_ids = self.typed_video_ids()
+        imported_ids = {extract_video_id(url) for url in self.imported_urls}
+        jobs = []
+        for url in urls:
+            video_id = extract_video_id(url)
+            if video_id in typed_ids:
+                priority = PRIORITY_INTERACTIVE
+            else:
+                priority = PRIORITY_BULK if video_id in imported_ids else PRIORITY_NORMAL
+            jobs.append((video_id, url, priority))
+
+        self.scheduler = JobScheduler()
+        self.estimator = CostEstimator(TRANSCRIPT_DIR if TRANSCRIPT_DIR.is_dir() else None)
+        self.started_ids = set()
+
+        # Start processing in background thread (the button stays enabled to add links)
         self.processing = True
-        self.generate_button.config(state=tk.DISABLED)
 
         thread = threading.Thread(
             target=self.process_urls,
-            args=(urls, api_key, available_tags),
+            args=(jobs, api_key, available_tags, batch),
             daemon=True
         )
         thread.start()
 
-    def process_urls(self, urls: list, api_key: str, available_tags: list):
+    def add_interactive_urls(self):
+        """Queue the links of the text box ahead of the running batch (main thread)"""
+        with self.schedule_lock:
+            if self.scheduler is None:
+                messagebox.showinfo("Info", GUI_TEXT["scheduler_finishing"])
+                return
+
+            added = 0
+            for video_id, url in self.typed_video_ids().items():
+                status = self.journal.status(video_id)
+                if video_id in self.started_ids or status in FINAL_STATUSES:
+                    continue
+                if status is None:
+                    self.journal.record(video_id, url, STATUS_PENDING)
+                # A copy already queued as bulk is skipped once this one has started
+                self.scheduler.submit((video_id, url, PRIORITY_INTERACTIVE), PRIORITY_INTERACTIVE,
+                                      self.estimator.estimate(video_id))
+                added += 1
+
+        self.log_progress(GUI_TEXT["scheduler_added"].format(count=added) if added
+                          else GUI_TEXT["scheduler_nothing_new"])
+
+    def next_job(self, idle: bool = True):
+        """
+        Pop the next job to extract, or None when nothing is queued (worker thread)
+
+        Args:
+            idle: No extraction is in flight; an empty queue then ends the batch
+        """
+        with self.schedule_lock:
+            while True:
+                job = self.scheduler.pop()
+                if job is None:
+                    if idle:
+                        # From here on new links start a new batch
+                        self.scheduler = None
+                    return None
+                if job[0] not in self.started_ids:
+                    self.started_ids.add(job[0])
+                    return job
+
+    def requeue_job(self, job: tuple, cost: float) -> bool:
+        """Put a throttled job back into the running batch's queue (worker thread)"""
+        with self.schedule_lock:
+            if self.scheduler is None:
+                return False
+            self.started_ids.discard(job[0])
+            self.scheduler.submit(job, job[2], cost)
+            return True
+
+    def process_urls(self, jobs: list, api_key: str, available_tags: list, batch: BatchOutput):
         """Process YouTube URLs (runs in background thread)"""
+        journal = batch.journal
+
         try:
             self.log_progress("Se inițializează Gemini API...")
 
-            for i, url in enumerate(urls, 1):
-                self.log_progress(f"\nSe procesează video {i}/{len(urls)}: {url}")
-
-                try:
-                    # Call Gemini API
-                    recipe_json = call_gemini_api(url, available_tags, api_key)
-
-                    # Validate recipe
-                    is_valid, error_msg = validate_recipe(recipe_json, available_tags)
-
-                    if not is_valid:
-                        self.log_progress(f"✗ Validare eșuată: {error_msg}", "error")
-                        continue
-
-                    # Check if confirmation needed
-                    if recipe_json.get('no_transcript_warning', False):
-                        # Schedule confirmation dialog on main thread
-                        result = {"accepted": False, "processed": False}
-                        self.root.after(0, lambda r=recipe_json, res=result: self.show_confirmation_dialog(r, res))
-
-                        # Wait for dialog to be processed
-                        import time
-                        while not result["processed"]:
-                            time.sleep(0.1)
-
-                        if result["accepted"]:
-                            self.recipes.append(recipe_json)
-                            self.log_progress(f"✓ Rețetă acceptată: {recipe_json['title']}", "success")
-                        else:
-                            self.log_progress(f"✗ Rețetă respinsă de utilizator", "warning")
-                    else:
-                        self.recipes.append(recipe_json)
-                        self.log_progress(f"✓ Rețetă generată: {recipe_json['title']}", "success")
-
-                except Exception as e:
-                    self.log_progress(GUI_TEXT["error_processing"].format(error=str(e)), "error")
-                    continue
+            # Local subtitles replace video analysis whenever they exist
+            transcript_dir = TRANSCRIPT_DIR if TRANSCRIPT_DIR.is_dir() else None
+            savings = SavingsTracker()
+            cascade = CascadeStats()
+            # Ingredients missing from the nutrient table are reported per batch
+            unmatched_before = (Counter(get_calculator().unmatched)
+                                if NUTRITION_SOURCE == NUTRITION_SOURCE_LOCAL else None)
+
+            # Shortest expected job first within each priority (costs read transcripts, so off the UI thread)
+            scheduler, estimator = self.scheduler, self.estimator
+            for video_id, url, priority in jobs:
+                scheduler.submit((video_id, url, priority), priority, estimator.estimate(video_id))
+
+            def handle(result, url):
+                """Journal, store and log one finished extraction (this thread)"""
+                recipe_json = result.recipe
+                cascade.record(result)
+
+                for attempt, next_attempt in zip(result.attempts, result.attempts[1:]):
+                    self.log_progress(GUI_TEXT["cascade_escalated"].format(
+                        from_tier=attempt["tier"], to_tier=next_attempt["tier"], reason=attempt["reason"]
+                    ), "warning")
+
+                if result.status == RESULT_ERROR:
+                    journal.record(result.video_id, url, STATUS_FAILED, error=result.message)
+                    self.log_progress(GUI_TEXT["error_processing"].format(error=result.message), "error")
+                    return
+
+                savings.record(result.source, result.elapsed, result.usage)
+                if result.source == SOURCE_TRANSCRIPT:
+                    self.log_progress(GUI_TEXT["transcript_used"].format(
+                        tokens=result.usage["transcript_tokens"],
+                        saved=max(0, result.usage["estimated_video_tokens"] - result.usage["transcript_tokens"]),
+                        elapsed=result.elapsed
+                    ))
+
+                if result.status == RESULT_INVALID:
+                    journal.record(result.video_id, url, STATUS_FAILED, error=result.message)
+                    self.log_progress(f"✗ Validare eșuată: {result.message}", "error")
+                    return
+
+                # Recipes without transcript wait in the review queue;
+                # extraction of the remaining videos continues meanwhile
+                if result.status == RESULT_NEEDS_REVIEW:
+                    journal.record(result.video_id, url, STATUS_DEFERRED, recipe=recipe_json)
+                    self.run_on_ui(lambda r=result: self.queue_for_review(r.video_id, r.url, r.recipe, batch))
+                    self.log_progress(GUI_TEXT["review_queued"].format(title=recipe_json['title']), "warning")
+                    return
+
+                self.store.add(recipe_json, video_id=result.video_id, batch_id=batch.batch_id)
+                self.autosave_recipe(batch, recipe_json)
+                journal.record(result.video_id, url, STATUS_DONE, recipe=recipe_json)
+                self.log_progress(f"✓ Rețetă generată ({result.tier}): {recipe_json['title']}", "success")
+                if result.issues:
+                    self.log_progress(GUI_TEXT["quality_issues"].format(issues="; ".join(result.issues)), "warning")
+
+            def log_limit(old, new, reason):
+                self.log_progress(GUI_TEXT["concurrency_changed"].format(
+                    old=old, new=new, reason=GUI_TEXT[f"concurrency_reason_{reason}"]
+                ))
+
+            # Adaptive number of extractions in flight; results are handled on this thread
+            limiter = AdaptiveLimiter(on_change=log_limit)
+            throttle_retries = Counter()
+            started = 0
+            with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+                # future -> ((video_id, url, priority), limiter token, expected seconds)
+                in_flight = {}
+                while True:
+                    while limiter.available():
+                        job = self.next_job(idle=not in_flight)
+                        if job is None:
+                            break
+                        video_id, url, priority = job
+                        started += 1
+                        self.log_progress(f"\nSe procesează video {started}/{started + len(scheduler)}: {url}")
+                        token = limiter.acquire()
+                        future = executor.submit(process_url, url, available_tags, api_key, transcript_dir=transcript_dir)
+                        in_flight[future] = (job, token, estimator.estimate(video_id))
+                    if not in_flight:
+                        break
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job, token, expected = in_flight.pop(future)
+                        video_id, url, priority = job
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            limiter.release(token, 0.0, error=True)
+                            journal.record(video_id, url, STATUS_FAILED, error=str(e))
+                            self.log_progress(GUI_TEXT["error_processing"].format(error=str(e)), "error")
+                            continue
+                        limiter.release_result(token, result, expected)
+                        if should_retry(result, throttle_retries[video_id]) and self.requeue_job(job, expected):
+                            # Rate limited, not broken: try again once the limiter has backed off
+                            throttle_retries[video_id] += 1
+                            started -= 1
+                            cascade.record(result)
+                            self.log_progress(GUI_TEXT["concurrency_requeued"].format(
+                                attempt=throttle_retries[video_id], max=CONCURRENCY_THROTTLE_RETRIES, url=url
+                            ), "warning")
+                            continue
+                        estimator.observe(video_id, result.elapsed)
+                        try:
+                            handle(result, url)
+                        except Exception as e:
+                            journal.record(video_id, url, STATUS_FAILED, error=str(e))
+                            self.log_progress(GUI_TEXT["error_processing"].format(error=str(e)), "error")
 
             # Finished
-            self.log_progress(f"\n{GUI_TEXT['success_message'].format(count=len(self.recipes))}", "success")
+            if savings.transcript_count:
+                self.log_progress(GUI_TEXT["transcript_summary"].format(
+                    count=savings.transcript_count,
+                    saved=savings.tokens_saved,
+                    transcript_avg=savings.transcript_seconds / savings.transcript_count,
+                    video_avg=savings.video_seconds / savings.video_count if savings.video_count else 0
+                ))
+
+            for row in cascade.rows():
+                self.log_progress(GUI_TEXT["cascade_tier_stats"].format(**row))
+
+            snapshot = limiter.snapshot()
+            self.log_progress(GUI_TEXT["concurrency_summary"].format(
+                limit=snapshot["limit"], low=snapshot["min"], high=snapshot["max"],
+                increases=snapshot["increases"], decreases=sum(snapshot["decreases"].values())
+            ))
+
+            if unmatched_before is not None:
+                unmatched = get_calculator().unmatched_summary(since=unmatched_before)
+                if unmatched:
+                    self.log_progress(GUI_TEXT["nutrition_unmatched"].format(names=unmatched), "warning")
+
+            recipe_count = self.store.count(batch.batch_id)
+            self.log_progress(f"\n{GUI_TEXT['success_message'].format(count=recipe_count)}", "success")
 
             # Enable export buttons
-            if self.recipes:
-                self.root.after(0, self.enable_export_buttons)
+            if recipe_count:
+                self.run_on_ui(self.enable_export_buttons)
 
         finally:
+            # Still-pending reviews keep the autosave file open until they are resolved
+            self.run_on_ui(lambda: self.finish_batch(batch))
+            with self.schedule_lock:
+                self.scheduler = None
             self.processing = False
-            self.root.after(0, lambda: self.generate_button.config(state=tk.NORMAL))
-
-    def show_confirmation_dialog(self, recipe_json: dict, result: dict):
-        """Show confirmation dialog for recipes without transcript"""
-        # Create dialog window
-        dialog = tk.Toplevel(self.root)
-        dialog.title(GUI_TEXT["confirmation_title"])
-        dialog.geometry("600x500")
-        dialog.transient(self.root)
-        dialog.grab_set()
-
-        # Warning message
-        warning_label = ttk.Label(dialog, text=GUI_TEXT["confirmation_warning"],
-                                 font=("Arial", 10), foreground="orange")
-        warning_label.pack(pady=10)
-
-        # Recipe preview
-        preview_frame = ttk.Frame(dialog)
-        preview_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-        preview_text = scrolledtext.ScrolledText(preview_frame, wrap=tk.WORD, font=("Arial", 9))
-        preview_text.pack(fill=tk.BOTH, expand=True)
-
-        # Format recipe preview
-        preview_content = f"""
-Titlu: {recipe_json['title']}
-Descriere: {recipe_json['description']}
-
-Ingrediente: {len(recipe_json['ingredients'])}
-Pași: {len(recipe_json['instructions'])}
-Timp total: {recipe_json['totalTime']} minute
-Dificultate: {recipe_json['difficulty']}
-Etichete: {', '.join(recipe_json['tags'])}
-
-Ingrediente detaliate:
-"""
-        for ing in recipe_json['ingredients']:
-            preview_content += f"  - {ing['name']}: {ing['quantity']} {ing['unit']}\n"
 
-        preview_content += "\nInstrucțiuni:\n"
-        for i, step in enumerate(recipe_json['instructions'], 1):
-            preview_content += f"  {i}. {step}\n"
+    def autosave_recipe(self, batch: BatchOutput, recipe_json: dict):
+        """Append an accepted recipe to its batch's autosave file (any thread)"""
+        if batch.autosave(recipe_json):
+            self.log_progress(GUI_TEXT["autosave_started"].format(path=batch.autosave_path))
+
+    def finish_batch(self, batch: BatchOutput):
+        """Mark a batch as finished and close its autosave file when no review is left (main thread)"""
+        batch.running = False
+        if not any(entry[2] is batch for entry in self.pending_reviews.values()):
+            batch.close()
+
+    def queue_for_review(self, video_id: str, url: str, recipe_json: dict, batch: BatchOutput):
+        """Add a recipe generated without transcript to the review queue (main thread)"""
+        self.pending_reviews[video_id] = (url, Recipe.from_dict(recipe_json), batch)
+        self.update_review_button()
+        self.refresh_review_panel()
+
+    def update_review_button(self):
+        """Show the number of recipes waiting for review"""
+        count = len(self.pending_reviews)
+        self.review_button.config(text=GUI_TEXT["review_button"].format(count=count),
+                                  state=tk.NORMAL if count else tk.DISABLED)
+
+    def show_review_panel(self):
+        """Open (or raise) the panel for reviewing recipes without transcript"""
+        if self.review_window is not None and self.review_window.winfo_exists():
+            self.review_window.lift()
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title(GUI_TEXT["confirmation_title"])
+        window.geometry("850x550")
+        self.review_window = window
+
+        ttk.Label(window, text=GUI_TEXT["confirmation_warning"],
+                  font=("Arial", 10), foreground="orange").pack(pady=10)
 
-        preview_text.insert("1.0", preview_content)
-        preview_text.config(state=tk.DISABLED)
+        panes = ttk.PanedWindow(window, orient=tk.HORIZONTAL)
+        panes.pack(fill=tk.BOTH, expand=True, padx=10)
 
-        # Action buttons
-        button_frame = ttk.Frame(dialog)
+        list_frame = ttk.Frame(panes)
+        self.review_listbox = tk.Listbox(list_frame, selectmode=tk.EXTENDED, font=("Arial", 9),
+                                         exportselection=False)
+        list_scroll = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.review_listbox.yview)
+        self.review_listbox.config(yscrollcommand=list_scroll.set)
+        self.review_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        list_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        panes.add(list_frame, weight=1)
+
+        self.review_details = scrolledtext.ScrolledText(panes, wrap=tk.WORD, font=("Arial", 9),
+                                                        state=tk.DISABLED)
+        panes.add(self.review_details, weight=2)
+
+        self.review_listbox.bind("<<ListboxSelect>>", self.show_review_details)
+
+        button_frame = ttk.Frame(window)
         button_frame.pack(pady=10)
 
-        def accept():
-            result["accepted"] = True
-            result["processed"] = True
-            dialog.destroy()
+        actions = [
+            ("review_accept_selected", True, True),
+            ("review_reject_selected", False, True),
+            ("review_accept_all", True, False),
+            ("review_reject_all", False, False)
+        ]
+        for text_key, accept, selected_only in actions:
+            ttk.Button(button_frame, text=GUI_TEXT[text_key],
+                       command=lambda a=accept, s=selected_only: self.resolve_reviews(a, s)
+                       ).pack(side=tk.LEFT, padx=5)
+
+        self.refresh_review_panel()
+
+    def refresh_review_panel(self):
+        """Re-fill the review list from the pending queue"""
+        if self.review_window is None or not self.review_window.winfo_exists():
+            return
 
-        def reject():
-            result["accepted"] = False
-            result["processed"] = True
-            dialog.destroy()
+        self.review_order = list(self.pending_reviews)
+        self.review_listbox.delete(0, tk.END)
+        self.review_listbox.insert(tk.END, *[self.pending_reviews[video_id][1].title
+                                             for video_id in self.review_order])
+
+    def show_review_details(self, event=None):
+        """Render the first selected recipe in the details pane"""
+        selection = self.review_listbox.curselection()
+        content = ""
+        if selection:
+            _, recipe, _ = self.pending_reviews[self.review_order[selection[0]]]
+            content = format_recipe_details(recipe.to_dict())
+
+        self.review_details.config(state=tk.NORMAL)
+        self.review_details.delete("1.0", tk.END)
+        self.review_details.insert("1.0", content)
+        self.review_details.config(state=tk.DISABLED)
+
+    def resolve_reviews(self, accept: bool, selected_only: bool):
+        """Accept or reject the selected (or all) recipes waiting for review"""
+        if selected_only:
+            video_ids = [self.review_order[i] for i in self.review_listbox.curselection()]
+        else:
+            video_ids = list(self.pending_reviews)
+
+        if not video_ids:
+            return
+
+        batches = set()
+        for video_id in video_ids:
+            url, recipe, batch = self.pending_reviews.pop(video_id)
+            recipe_json = recipe.to_dict()
+            batches.add(batch)
+            if accept:
+                # Stored, journaled and autosaved with the batch the recipe came from
+                self.store.add(recipe_json, video_id=video_id, batch_id=batch.batch_id)
+                self.autosave_recipe(batch, recipe_json)
+                batch.journal.record(video_id, url, STATUS_DONE, recipe=recipe_json)
+                self.log_progress(f"✓ Rețetă acceptată: {recipe_json['title']}", "success")
+            else:
+                batch.journal.record(video_id, url, STATUS_REJECTED)
+                self.log_progress(f"✗ Rețetă respinsă de utilizator: {recipe_json['title']}", "warning")
 
-        ttk.Button(button_frame, text=GUI_TEXT["confirmation_accept"],
-                  command=accept).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text=GUI_TEXT["confirmation_reject"],
-                  command=reject).pack(side=tk.LEFT, padx=5)
+        for batch in batches:
+            if not batch.running:
+                self.finish_batch(batch)
 
-        # Handle window close
-        def on_closing():
-            result["accepted"] = False
-            result["processed"] = True
-            dialog.destroy()
+        if accept:
+            self.enable_export_buttons()
 
-        dialog.protocol("WM_DELETE_WINDOW", on_closing)
+        self.update_review_button()
+        self.refresh_review_panel()
+        self.show_review_details()
 
     def enable_export_buttons(self):
         """Enable preview and export buttons"""
@@ -358,44 +822,34 @@ Ingrediente detaliate:
 
     def preview_recipes(self):
         """Show preview of generated recipes"""
-        if not self.recipes:
+        recipe_count = self.store.count(self.batch_id) if self.batch_id else 0
+        if not recipe_count:
             messagebox.showinfo("Info", "Nu există rețete de previzualizat.")
             return
 
-        # Create preview window
-        preview_window = tk.Toplevel(self.root)
-        preview_window.title("Previzualizare Rețete")
-        preview_window.geometry("700x600")
-
-        preview_text = scrolledtext.ScrolledText(preview_window, wrap=tk.WORD, font=("Arial", 9))
-        preview_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-        # Format all recipes
-        preview_content = f"Total rețete: {len(self.recipes)}\n\n"
-        preview_content += "=" * 70 + "\n\n"
-
-        for i, recipe in enumerate(self.recipes, 1):
-            preview_content += f"REȚETA #{i}\n"
-            preview_content += f"Titlu: {recipe['title']}\n"
-            preview_content += f"Categorie: {recipe['category']} | Bucătărie: {recipe['cuisine']}\n"
-            preview_content += f"Timp: {recipe['totalTime']} min | Porții: {recipe['servings']}\n"
-            preview_content += f"Dificultate: {recipe['difficulty']}\n"
-            preview_content += f"Etichete: {', '.join(recipe['tags'])}\n"
-            preview_content += "\n" + "=" * 70 + "\n\n"
-
-        preview_text.insert("1.0", preview_content)
-        preview_text.config(state=tk.DISABLED)
+        RecipePreviewWindow(self.root, self.store, self.batch_id)
 
     def export_recipes(self):
         """Export recipes to JSON file"""
-        if not self.recipes:
+        # Delta exports cover the whole store, regular exports the current batch
+        delta = self.delta_var.get()
+        batch_id = None if delta else self.batch_id
+        if (not delta and not self.batch_id) or not self.store.count(batch_id):
             messagebox.showinfo("Info", "Nu există rețete de exportat.")
             return
 
         # Ask for save location
         file_path = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[
+                ("JSON files", "*.json"),
+                ("JSON Lines files", "*.jsonl"),
+                ("JSON gzip", "*.gz"),
+                ("JSON zstd", "*.zst"),
+                ("Parquet (analiză)", "*.parquet"),
+                ("Arrow (analiză)", "*.arrow"),
+                ("All files", "*.*")
+            ],
             initialdir=OUTPUT_DIR,
             initialfile=f"recipes_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         )
@@ -403,30 +857,48 @@ Ingrediente detaliate:
         if not file_path:
             return
 
-        # Create export structure
-        export_data = {
-            "metadata": {
-                "exportDate": datetime.utcnow().isoformat() + "Z",
-                "totalRecipes": len(self.recipes),
-                "source": "youtube_recipe_generator_v1.0",
-                "targetApp": "mealee"
-            },
-            "recipes": self.recipes
-        }
-
-        # Write to file
-        try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+        # Stream recipes to file (framed JSON, JSONL for .jsonl paths, or a
+        # directory of columnar tables for .parquet/.arrow paths)
+        suffix = Path(file_path).suffix.lower().lstrip(".")
+        columnar = suffix in (FORMAT_PARQUET, FORMAT_ARROW)
+        if delta and columnar:
+            # The manifest tracks JSON shards; a columnar "delta" would be the whole store
+            messagebox.showinfo("Info", GUI_TEXT["export_delta_columnar"])
+            return
 
-            self.log_progress(GUI_TEXT["export_success"].format(path=file_path), "success")
-            messagebox.showinfo("Succes", f"Rețete exportate cu succes!\n\nFișier: {file_path}")
+        recipes = self.store.iter_recipes(batch_id)
+        manifest = None
+        try:
+            if columnar:
+                file_path = str(Path(file_path).with_suffix(""))
+                writer = ColumnarExportWriter(file_path, suffix)
+            else:
+                writer = ShardedExportWriter(file_path, max_bytes=EXPORT_SHARD_MAX_BYTES,
+                                             max_recipes=EXPORT_SHARD_MAX_RECIPES)
+                if delta:
+                    manifest = ExportManifest(EXPORT_MANIFEST_FILE)
+                    recipes = manifest.changed(recipes)
+
+            with writer:
+                writer.write_all(recipes)
+
+            if manifest:
+                manifest.save(writer.shards)
+                self.log_progress(GUI_TEXT["export_delta_summary"].format(
+                    written=writer.count, unchanged=manifest.unchanged, shards=len(writer.shards)
+                ))
+
+            # After a rotation the shards are "<stem>.00001...", not the chosen path
+            paths = [file_path] if columnar else [str(shard) for shard in writer.shards]
+            self.log_progress(GUI_TEXT["export_success"].format(path=", ".join(paths)), "success")
+            messagebox.showinfo("Succes", "Rețete exportate cu succes!\n\nFișier: " + "\n".join(paths))
 
         except Exception as e:
             self.log_progress(f"✗ Eroare la export: {str(e)}", "error")
             messagebox.showerror("Eroare", f"Eroare la exportul fișierului:\n{str(e)}")
 
 def main():
+    ensure_dirs()
     root = tk.Tk()
     app = YouTubeRecipeGeneratorApp(root)
     root.mainloop()
@@ -0,0 +1,347 @@
+"""
+Mealee Client Module
+Pushes recipes to the Mealee bulk import endpoint in gzip-compressed chunks over a pooled
+keep-alive session, a few chunks in parallel, retrying each chunk idempotently
+
+Usage:
+    python mealee_client.py --url https://mealee.example/api/recipes/import --token TOKEN
+    python mealee_client.py --input recipes.jsonl --chunk-size 500 --parallel 8
+    python mealee_client.py --stub --stub-fail-rate 0.1 --input recipes.jsonl
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from config import (MEALEE_IMPORT_URL, MEALEE_CHUNK_SIZE, MEALEE_PARALLEL_CHUNKS, MEALEE_MAX_RETRIES,
+                    MEALEE_TIMEOUT_SECONDS, MEALEE_GZIP_LEVEL, RECIPE_STORE_FILE)
+from export_writer import build_export_metadata, dump_compact, open_export_reader, split_compression
+from recipe_model import Recipe
+
+# Answers worth retrying; any other non-2xx answer fails the chunk at once
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Exponential backoff between attempts (with jitter), unless the server sends Retry-After
+RETRY_BACKOFF_SECONDS = 0.5
+RETRY_BACKOFF_MAX = 30.0
+
+
+class MealeeUploadError(Exception):
+    """A chunk was rejected or still failed after all retries"""
+
+    def __init__(self, message: str, recipe_ids: List[str]):
+        super().__init__(message)
+        self.recipe_ids = recipe_ids
+
+
+def _requests():
+    """Import requests lazily so the app starts without loading it"""
+    try:
+        import requests
+        return requests
+    except ImportError:
+        raise ImportError("Mealee upload requires requests. Install it with: pip install requests")
+
+
+def idempotency_key(body: bytes) -> str:
+    """
+    Key of a chunk: the hash of its request body
+
+    Retries send the same body and so the same key, while an upload of
+    edited recipes with the same recipeIds gets a new key and is not
+    answered from the server's replay cache.
+    """
+    return hashlib.sha256(body).hexdigest()
+
+
+class UploadReport:
+    """Counters of one upload run"""
+
+    def __init__(self):
+        self.recipes = 0
+        self.chunks = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.sent_bytes = 0
+        self.retries = 0
+        self.skipped = 0
+        self.failed: List[MealeeUploadError] = []
+        self.elapsed = 0.0
+
+    def summary(self) -> str:
+        elapsed = self.elapsed or 1e-9
+        ratio = self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+        lines = [
+            f"{self.recipes} recipes in {self.chunks} chunks, {self.elapsed:.2f}s: "
+            f"{self.recipes / elapsed:.0f} recipes/s, {self.sent_bytes / elapsed / 1e6:.2f} MB/s sent "
+            f"({self.raw_bytes / 1e6:.2f} MB JSON, gzip {ratio:.1f}x), {self.retries} retries"
+        ]
+        if self.skipped:
+            lines.append(f"Skipped {self.skipped} recipes without recipeId")
+        for error in self.failed:
+            lines.append(f"FAILED chunk ({len(error.recipe_ids)} recipes, first {error.recipe_ids[0]}): {error}")
+        return "\n".join(lines)
+
+
+class MealeeClient:
+    """
+    Bulk import client for Mealee.
+
+    Every chunk is one POST of the export format ({"metadata", "recipes"})
+    as gzip-compressed JSON. The body is built once per chunk and sent
+    unchanged on every attempt, with an Idempotency-Key derived from that
+    body; the server upserts by recipeId, so a chunk retried after a lost
+    answer does not create duplicates. One session keeps up to `parallel`
+    connections alive for all chunks.
+    """
+
+    def __init__(self, url: str = MEALEE_IMPORT_URL, token: Optional[str] = None,
+                 chunk_size: int = MEALEE_CHUNK_SIZE, parallel: int = MEALEE_PARALLEL_CHUNKS,
+                 max_retries: int = MEALEE_MAX_RETRIES, timeout: float = MEALEE_TIMEOUT_SECONDS,
+                 gzip_level: int = MEALEE_GZIP_LEVEL):
+        if not url:
+            raise ValueError("No Mealee import URL (set MEALEE_IMPORT_URL or pass --url)")
+        if chunk_size < 1 or parallel < 1:
+            raise ValueError("chunk_size and parallel must be at least 1")
+
+        requests = _requests()
+        self.url = url
+        self.chunk_size = chunk_size
+        self.parallel = parallel
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.gzip_level = gzip_level
+
+        self.session = requests.Session()
+        # Retries are done per chunk below; the adapter only pools connections
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=parallel, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json", "Content-Encoding": "gzip",
+                                     "Accept-Encoding": "gzip"})
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self._report_lock = threading.Lock()
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), RETRY_BACKOFF_MAX)
+            except ValueError:
+                pass
+        return min(RETRY_BACKOFF_SECONDS * 2 ** attempt, RETRY_BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+    def upload_chunk(self, recipes: List[Dict], report: Optional[UploadReport] = None) -> Dict:
+        """
+        Upload one chunk, retrying request errors (connection, timeout, broken answer)
+        and 408/425/429/5xx answers
+
+        Args:
+            recipes: Recipe dicts, each with a recipeId
+            report: Counters to update (bytes, retries)
+
+        Returns:
+            dict: JSON answer of the server
+
+        Raises:
+            MealeeUploadError: Rejected, or still failing after max_retries retries
+        """
+        requests = _requests()
+        recipe_ids = [recipe["recipeId"] for recipe in recipes]
+        raw = dump_compact({"metadata": build_export_metadata(len(recipes)), "recipes": recipes})
+        body = gzip.compress(raw, compresslevel=self.gzip_level)
+        headers = {"Idempotency-Key": idempotency_key(body)}
+        if report is not None:
+            with self._report_lock:
+                report.raw_bytes += len(raw)
+                report.compressed_bytes += len(body)
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+            except requests.RequestException as e:
+                # Malformed URLs (InvalidURL, MissingSchema, ...) are ValueErrors and never succeed
+                if isinstance(e, ValueError):
+                    raise MealeeUploadError(str(e), recipe_ids)
+                # Connection errors, timeouts, broken or undecodable answers: retry the chunk
+                error = str(e)
+                response = None
+
+            if report is not None:
+                with self._report_lock:
+                    report.sent_bytes += len(body)
+            if response is not None and response.ok:
+                try:
+                    return response.json()
+                except ValueError:
+                    return {}
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                raise MealeeUploadError(error, recipe_ids)
+            if attempt == self.max_retries:
+                break
+            if report is not None:
+                with self._report_lock:
+                    report.retries += 1
+            time.sleep(self._backoff(attempt, response))
+
+        raise MealeeUploadError(f"{error} (after {self.max_retries} retries)", recipe_ids)
+
+    def _chunks(self, recipes: Iterable, report: UploadReport) -> Iterator[List[Dict]]:
+        def with_ids():
+            for recipe in recipes:
+                if isinstance(recipe, Recipe):
+                    recipe = recipe.to_dict()
+                if not recipe.get("recipeId"):
+                    report.skipped += 1
+                    continue
+                yield recipe
+
+        iterator = with_ids()
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def upload(self, recipes: Iterable, progress=None) -> UploadReport:
+        """
+        Upload recipes in chunks, `parallel` chunks at a time
+
+        Recipes are read lazily, so a store or a JSONL file is streamed
+        without being loaded at once. A failed chunk does not stop the
+        others; it is listed in the report.
+
+        Args:
+            recipes: Recipe dicts (or Recipe objects)
+            progress: Optional callback(report) after every finished chunk
+
+        Returns:
+            UploadReport: Throughput and failures
+        """
+        report = UploadReport()
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.parallel, thread_name_prefix="mealee") as executor:
+            pending = {}
+            chunks = self._chunks(recipes, report)
+
+            def finish(done):
+                for future in done:
+                    size = pending.pop(future)
+                    try:
+                        future.result()
+                        report.recipes += size
+                    except MealeeUploadError as e:
+                        report.failed.append(e)
+                    report.chunks += 1
+                    if progress is not None:
+                        report.elapsed = time.monotonic() - start
+                        progress(report)
+
+            for chunk in chunks:
+                # Keep at most two chunks per connection built in memory
+                if len(pending) >= self.parallel * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    finish(done)
+                pending[executor.submit(self.upload_chunk, chunk, report)] = len(chunk)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                finish(done)
+
+        report.elapsed = time.monotonic() - start
+        return report
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _read_recipes(path: str) -> Iterator[Dict]:
+    """Recipes of a JSONL file (streamed) or of a JSON export, optionally .gz / .zst"""
+    with open_export_reader(path) as f:
+        if split_compression(path)[0].suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            data = json.load(f)
+            yield from data.get("recipes", []) if isinstance(data, dict) else data
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Upload recipes to the Mealee bulk import endpoint")
+    parser.add_argument("--url", default=MEALEE_IMPORT_URL, help="Import endpoint (default: MEALEE_IMPORT_URL)")
+    parser.add_argument("--token", default=os.getenv("MEALEE_TOKEN"), help="Bearer token (default: MEALEE_TOKEN)")
+    parser.add_argument("--input", default=None,
+                        help="JSONL or JSON export to upload, optionally .gz/.zst (default: the recipe store)")
+    parser.add_argument("--store", default=str(RECIPE_STORE_FILE), help="Recipe store to upload from")
+    parser.add_argument("--batch", default=None, help="Only upload this batch of the store")
+    parser.add_argument("--chunk-size", type=int, default=MEALEE_CHUNK_SIZE,
+                        help=f"Recipes per request (default: {MEALEE_CHUNK_SIZE})")
+    parser.add_argument("--parallel", type=int, default=MEALEE_PARALLEL_CHUNKS,
+                        help=f"Chunks in flight (default: {MEALEE_PARALLEL_CHUNKS})")
+    parser.add_argument("--retries", type=int, default=MEALEE_MAX_RETRIES,
+                        help=f"Retries per chunk (default: {MEALEE_MAX_RETRIES})")
+    parser.add_argument("--stub", action="store_true", help="Upload to a local stub server instead (mealee_stub.py)")
+    parser.add_argument("--stub-fail-rate", type=float, default=0.0, help="Share of stub answers that are 503")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds the stub waits per request")
+    args = parser.parse_args(argv)
+
+    server = stub = None
+    if args.stub:
+        from mealee_stub import run_stub, IMPORT_PATH
+        server, stub = run_stub(fail_rate=args.stub_fail_rate, latency=args.stub_latency)
+        args.url = f"http://127.0.0.1:{server.server_port}{IMPORT_PATH}"
+
+    store = None
+    if args.input:
+        recipes = _read_recipes(args.input)
+    else:
+        if not os.path.exists(args.store):
+            print(f"Error: recipe store not found: {args.store}", file=sys.stderr)
+            return 1
+        from recipe_store import RecipeStore
+        store = RecipeStore(args.store)
+        recipes = store.iter_recipes(args.batch)
+
+    try:
+        with MealeeClient(args.url, args.token, args.chunk_size, args.parallel, args.retries) as client:
+            report = client.upload(recipes, progress=lambda r: print(
+                f"\r{r.recipes} recipes uploaded, {r.retries} retries", end="", file=sys.stderr, flush=True))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if store is not None:
+            store.close()
+        if server is not None:
+            server.shutdown()
+
+    print(file=sys.stderr)
+    print(report.summary())
+    if stub is not None:
+        stats = stub.snapshot()
+        print(f"Stub: {stats['recipes']} recipes stored, {stats['requests']} requests over "
+              f"{stats['connections']} connections, {stats['injected_failures']} injected failures, "
+              f"{stats['replayed']} replayed")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Mealee Stub Server
+Local stand-in for the Mealee bulk import endpoint, used to exercise mealee_client.py
+on localhost: keeps recipes in memory by recipeId, replays answers for repeated
+Idempotency-Keys and can inject failures, lost answers and latency
+
+Usage:
+    python mealee_stub.py --port 8765
+    python mealee_stub.py --port 8765 --fail-rate 0.1 --latency 0.05
+    python mealee_stub.py --port 8765 --drop-rate 0.1
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# Path of the bulk import endpoint (POST) and of the counters (GET)
+IMPORT_PATH = "/api/recipes/import"
+STATS_PATH = "/api/recipes/stats"
+
+# Answers kept per Idempotency-Key
+IDEMPOTENCY_CACHE_SIZE = 10000
+
+
+class MealeeStub:
+    """In-memory import state shared by the request handlers"""
+
+    def __init__(self, fail_rate: float = 0.0, latency: float = 0.0, drop_rate: float = 0.0):
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.recipes: Dict[str, Dict] = {}
+        self.answers: Dict[str, Tuple[int, Dict]] = {}
+        self.stats = {"requests": 0, "imports": 0, "replayed": 0, "injected_failures": 0,
+                      "dropped_answers": 0, "bytes_received": 0, "connections": 0}
+        self._lock = threading.Lock()
+
+    def import_chunk(self, body: bytes, encoding: str, key: Optional[str]) -> Tuple[int, Optional[Dict]]:
+        """
+        Upsert one chunk
+
+        Returns:
+            tuple: (HTTP status, JSON answer); the answer is None when the chunk
+                was imported but its answer is to be lost (connection closed)
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_received"] += len(body)
+            if key and key in self.answers:
+                self.stats["replayed"] += 1
+                return self.answers[key]
+
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            with self._lock:
+                self.stats["injected_failures"] += 1
+            return 503, {"error": "Injected failure"}
+
+        try:
+            if encoding == "gzip":
+                body = gzip.decompress(body)
+            recipes = json.loads(body.decode("utf-8"))["recipes"]
+            ids = [recipe["recipeId"] for recipe in recipes]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"Invalid import body: {e}"}
+        invalid = [recipe_id for recipe_id in ids if not isinstance(recipe_id, str)]
+        if invalid:
+            return 422, {"error": f"recipeId must be a string: {invalid[:5]}"}
+
+        with self._lock:
+            created = sum(1 for recipe_id in ids if recipe_id not in self.recipes)
+            for recipe_id, recipe in zip(ids, recipes):
+                self.recipes[recipe_id] = recipe
+            answer = (200, {"received": len(ids), "created": created, "updated": len(ids) - created})
+            self.stats["imports"] += 1
+            if key:
+                if len(self.answers) >= IDEMPOTENCY_CACHE_SIZE:
+                    self.answers.pop(next(iter(self.answers)))
+                self.answers[key] = answer
+            if self.drop_rate and random.random() < self.drop_rate:
+                self.stats["dropped_answers"] += 1
+                return 200, None
+        return answer
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {**self.stats, "recipes": len(self.recipes)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so the client's pooled connections are reused
+    protocol_version = "HTTP/1.1"
+    stub: MealeeStub = None
+
+    def setup(self):
+        super().setup()
+        with self.stub._lock:
+            self.stub.stats["connections"] += 1
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 503:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == STATS_PATH:
+            self._send_json(200, self.stub.snapshot())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path != IMPORT_PATH:
+            self._send_json(404, {"error": "Not found"})
+            return
+        status, payload = self.stub.import_chunk(body, self.headers.get("Content-Encoding", ""),
+                                                 self.headers.get("Idempotency-Key"))
+        if payload is None:
+            # Imported, but the client never hears back
+            self.close_connection = True
+            return
+        self._send_json(status, payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_stub(port: int = 0, fail_rate: float = 0.0, latency: float = 0.0,
+             drop_rate: float = 0.0) -> Tuple[ThreadingHTTPServer, MealeeStub]:
+    """
+    Start the stub server on a background thread
+
+    Args:
+        port: Port on 127.0.0.1 (0 = any free port)
+        fail_rate: Share of import requests answered with 503
+        latency: Seconds added to every import request
+        drop_rate: Share of imports whose answer is lost (connection closed after the upsert)
+
+    Returns:
+        tuple: (server, state); the import URL is
+            f"http://127.0.0.1:{server.server_port}{IMPORT_PATH}", stop with server.shutdown()
+    """
+    stub = MealeeStub(fail_rate, latency, drop_rate)
+    handler = type("MealeeStubHandler", (_Handler,), {"stub": stub})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stub
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Mealee bulk import endpoint")
+    parser.add_argument("--port", type=int, default=8765, help="Port on 127.0.0.1 (default: 8765)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of imports answered with 503")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every import")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="Share of imports whose answer is lost after the upsert")
+    args = parser.parse_args(argv)
+
+    server, stub = run_stub(args.port, args.fail_rate, args.latency, args.drop_rate)
+    print(f"Mealee stub listening on http://127.0.0.1:{server.server_port}{IMPORT_PATH}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(json.dumps(stub.snapshot()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
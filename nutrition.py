@@ -0,0 +1,311 @@
+"""
+Nutrition Module
+Local per-serving nutrition (calories, macros, health score) computed from the ingredient list
+with a bundled nutrient table and NumPy matrix math
+
+Usage:
+    python nutrition.py recipes.jsonl --output recipes_local_nutrition.jsonl
+"""
+
+import argparse
+import csv
+import json
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from config import NUTRIENT_TABLE_FILE, NUTRITION_MIN_MATCHED_SHARE
+
+# Where the nutrition block of a recipe comes from (config.NUTRITION_SOURCE)
+NUTRITION_SOURCE_LOCAL = "local"
+NUTRITION_SOURCE_MODEL = "model"
+
+# Nutrient columns of the table, per 100 g
+NUTRIENTS = ("kcal", "protein", "carbs", "fat", "fiber", "sugar", "sat_fat", "sodium_mg")
+
+# Grams per unit; volume units are converted with the ingredient density, piece units
+# with its piece weight, and "to taste" units count as nothing
+MASS_UNITS = {"g": 1.0, "kg": 1000.0}
+VOLUME_UNITS_ML = {"ml": 1.0, "l": 1000.0, "linguriță": 5.0, "lingură": 15.0, "cană": 240.0}
+PIECE_UNITS = {"buc", "bucată", "fire", "cățel", "frunze"}
+FIXED_UNITS = {"legătură": 50.0, "plic": 10.0, "conservă": 400.0}
+WEIGHED_UNITS = set(MASS_UNITS) | set(VOLUME_UNITS_ML) | PIECE_UNITS | set(FIXED_UNITS)
+
+# Nutri-Score style point thresholds per 100 g (points = thresholds exceeded)
+ENERGY_KJ_POINTS = (335, 670, 1005, 1340, 1675, 2010, 2345, 2680, 3015, 3350)
+SUGAR_POINTS = (4.5, 9, 13.5, 18, 22.5, 27, 31, 36, 40, 45)
+SAT_FAT_POINTS = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+SODIUM_POINTS = (90, 180, 270, 360, 450, 540, 630, 720, 810, 900)
+FIBER_POINTS = (0.9, 1.9, 2.8, 3.7, 4.7)
+PROTEIN_POINTS = (1.6, 3.2, 4.8, 6.4, 8.0)
+
+# Recipes per gram matrix (chunk x table rows), keeps memory flat for huge batches
+COMPUTE_CHUNK = 4096
+
+# Score range of the points above, mapped linearly onto healthScore 100..0
+SCORE_BEST = -15
+SCORE_WORST = 40
+
+
+def _numpy():
+    """Import NumPy lazily so the app starts without loading it"""
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        raise ImportError("Local nutrition requires numpy. Install it with: pip install numpy")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip diacritics (ș/ş, ț/ţ alike) and collapse whitespace"""
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    return " ".join("".join(ch for ch in decomposed if not unicodedata.combining(ch)).split())
+
+
+class NutritionCalculator:
+    """
+    Per-serving nutrition of whole recipe batches.
+
+    Every ingredient of every recipe becomes one row of a sparse entry
+    list (recipe index, table row, grams); the entries are summed into a
+    recipes x ingredients gram matrix and multiplied by the ingredients x
+    nutrients matrix of the table, so a batch costs one matrix product.
+    Names are matched to the table by the longest alias phrase they
+    contain; unmatched ingredients contribute nothing and are counted in
+    `unmatched` so the table can be extended. A recipe whose weighed
+    ingredients are mostly unmatched gets no nutrition (None) rather than
+    values computed from the few that matched.
+    """
+
+    def __init__(self, table_path=NUTRIENT_TABLE_FILE):
+        np = _numpy()
+        self.names: List[str] = []
+        self.aliases: Dict[str, int] = {}
+        rows = []
+
+        with open(table_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                index = len(self.names)
+                self.names.append(row["name"])
+                for alias in [row["name"]] + [a for a in row["aliases"].split("|") if a]:
+                    self.aliases.setdefault(normalize_name(alias), index)
+                rows.append([float(row[column]) for column in NUTRIENTS]
+                            + [float(row["density"]), float(row["piece_g"]), float(row["fvl"])])
+
+        table = np.array(rows, dtype=np.float64)
+        self.per_gram = table[:, :len(NUTRIENTS)] / 100.0
+        self.density = table[:, len(NUTRIENTS)]
+        self.piece_g = table[:, len(NUTRIENTS) + 1]
+        self.fvl = table[:, len(NUTRIENTS) + 2]
+        self.max_words = max(len(alias.split()) for alias in self.aliases)
+        self.unmatched = Counter()
+        self._lock = threading.Lock()
+
+        self.match = lru_cache(maxsize=4096)(self._match)
+
+    def _match(self, name: str) -> Optional[int]:
+        """Table row of an ingredient name (longest alias phrase, leftmost first), or None"""
+        words = normalize_name(name).split()
+        for size in range(min(len(words), self.max_words), 0, -1):
+            for start in range(len(words) - size + 1):
+                index = self.aliases.get(" ".join(words[start:start + size]))
+                if index is not None:
+                    return index
+        return None
+
+    def compute(self, recipes: List[Dict], min_share: float = NUTRITION_MIN_MATCHED_SHARE) -> List[Optional[Dict]]:
+        """
+        Per-serving nutrition of each recipe
+
+        Args:
+            recipes: Recipe dicts with ingredients (name, quantity, unit) and servings
+            min_share: Share of the weighed ingredients (positive quantity in a unit
+                with a weight) that must be in the table; 0 always computes
+
+        Returns:
+            list: One nutrition dict (calories, protein, carbs, fats, healthScore) per
+                recipe, or None when too few of its ingredients are known
+        """
+        results = []
+        for start in range(0, len(recipes), COMPUTE_CHUNK):
+            results.extend(self._compute_chunk(recipes[start:start + COMPUTE_CHUNK], min_share))
+        return results
+
+    def _compute_chunk(self, recipes: List[Dict], min_share: float) -> List[Optional[Dict]]:
+        np = _numpy()
+        recipe_rows, table_rows, quantities, unit_grams, unit_ml, unit_pieces = [], [], [], [], [], []
+        servings = np.ones(len(recipes))
+        weighed = np.zeros(len(recipes))
+        matched = np.zeros(len(recipes))
+        unmatched = []
+
+        for position, recipe in enumerate(recipes):
+            count = recipe.get("servings")
+            if isinstance(count, (int, float)) and count > 0:
+                servings[position] = count
+            for ingredient in recipe.get("ingredients") or []:
+                if not isinstance(ingredient, dict) or not isinstance(ingredient.get("name"), str):
+                    continue
+                index = self.match(ingredient["name"])
+                if index is None:
+                    unmatched.append(ingredient["name"])
+                quantity = ingredient.get("quantity")
+                unit = ingredient.get("unit")
+                if not isinstance(quantity, (int, float)) or quantity <= 0 or unit not in WEIGHED_UNITS:
+                    continue
+                weighed[position] += 1
+                if index is None:
+                    continue
+                matched[position] += 1
+                recipe_rows.append(position)
+                table_rows.append(index)
+                quantities.append(quantity)
+                unit_grams.append(MASS_UNITS.get(unit, FIXED_UNITS.get(unit, 0.0)))
+                unit_ml.append(VOLUME_UNITS_ML.get(unit, 0.0))
+                unit_pieces.append(unit in PIECE_UNITS)
+
+        if unmatched:
+            with self._lock:
+                self.unmatched.update(unmatched)
+
+        # Quantities to grams (mass, volume x density or pieces x piece weight), summed into a
+        # recipes x ingredients matrix, then one product with the ingredients x nutrients table
+        table_rows = np.array(table_rows, dtype=np.intp)
+        grams = np.array(quantities, dtype=np.float64) * (
+            np.array(unit_grams) + np.array(unit_ml) * self.density[table_rows]
+            + np.array(unit_pieces, dtype=np.float64) * self.piece_g[table_rows]
+        )
+        weights = np.zeros((len(recipes), len(self.names)))
+        np.add.at(weights, (np.array(recipe_rows, dtype=np.intp), table_rows), grams)
+        totals = weights @ self.per_gram
+        total_grams = weights.sum(axis=1)
+        fvl_grams = weights @ self.fvl
+
+        per_serving = totals / servings[:, None]
+        health = self._health_scores(totals, total_grams, fvl_grams)
+
+        # Recipes without weighed ingredients count as unknown too
+        known = (matched >= weighed * min_share) & ((total_grams > 0) | (min_share <= 0))
+
+        columns = {name: per_serving[:, NUTRIENTS.index(name)].round(1) for name in ("kcal", "protein", "carbs", "fat")}
+        return [
+            {
+                "calories": float(columns["kcal"][i]),
+                "protein": float(columns["protein"][i]),
+                "carbs": float(columns["carbs"][i]),
+                "fats": float(columns["fat"][i]),
+                "healthScore": int(health[i])
+            } if known[i] else None
+            for i in range(len(recipes))
+        ]
+
+    def unmatched_summary(self, limit: int = 10, since: Optional[Counter] = None) -> str:
+        """
+        Most frequent ingredient names missing from the table, e.g. "seitan (3), yuzu (1)"
+
+        Args:
+            limit: Number of names listed
+            since: Earlier copy of `unmatched`; only names counted after it are listed
+        """
+        with self._lock:
+            counts = self.unmatched - since if since is not None else Counter(self.unmatched)
+        return ", ".join(f"{name} ({count})" for name, count in counts.most_common(limit))
+
+    def _health_scores(self, totals, total_grams, fvl_grams):
+        """0-100 health score from Nutri-Score style points of the whole dish per 100 g"""
+        np = _numpy()
+        per_100g = totals * (100.0 / np.maximum(total_grams, 1.0))[:, None]
+
+        def points(column: str, thresholds, scale: float = 1.0) -> "np.ndarray":
+            values = per_100g[:, NUTRIENTS.index(column)] * scale
+            return (values[:, None] > np.array(thresholds)[None, :]).sum(axis=1)
+
+        negative = (points("kcal", ENERGY_KJ_POINTS, scale=4.184) + points("sugar", SUGAR_POINTS)
+                    + points("sat_fat", SAT_FAT_POINTS) + points("sodium_mg", SODIUM_POINTS))
+
+        share = fvl_grams / np.maximum(total_grams, 1.0)
+        fvl_points = np.select([share > 0.8, share > 0.6, share > 0.4], [5, 2, 1], 0)
+        protein = points("protein", PROTEIN_POINTS)
+        # As in Nutri-Score, protein only counts for less unhealthy dishes or mostly fruit/vegetables
+        protein = np.where((negative >= 11) & (fvl_points < 5), 0, protein)
+
+        score = negative - points("fiber", FIBER_POINTS) - protein - fvl_points
+        health = (SCORE_WORST - score) * 100.0 / (SCORE_WORST - SCORE_BEST)
+        # Recipes without any known ingredient get no score
+        return np.where(total_grams > 0, np.clip(np.round(health), 0, 100), 0)
+
+
+_calculator: Optional[NutritionCalculator] = None
+_calculator_lock = threading.Lock()
+
+
+def get_calculator() -> NutritionCalculator:
+    """Shared calculator, loaded on first use"""
+    global _calculator
+    with _calculator_lock:
+        if _calculator is None:
+            _calculator = NutritionCalculator()
+        return _calculator
+
+
+def apply_nutrition(recipes: List[Dict], min_share: float = NUTRITION_MIN_MATCHED_SHARE) -> List[Dict]:
+    """
+    Replace the nutrition block of every recipe with the locally computed one (in place)
+
+    Args:
+        recipes: Recipe dicts
+        min_share: See NutritionCalculator.compute
+
+    Returns:
+        list: Recipes left unchanged because too few of their ingredients are in the table
+    """
+    unknown = []
+    for recipe, nutrition in zip(recipes, get_calculator().compute(recipes, min_share)):
+        if nutrition is None:
+            unknown.append(recipe)
+        else:
+            recipe["nutrition"] = nutrition
+    return unknown
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute recipe nutrition locally for a JSON/JSONL file")
+    parser.add_argument("input", help="JSONL file (one recipe per line) or JSON export")
+    parser.add_argument("--output", "-o", default=None, help="JSONL output (default: stdout)")
+    args = parser.parse_args(argv)
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        if args.input.endswith(".jsonl"):
+            recipes = [json.loads(line) for line in f if line.strip()]
+        else:
+            data = json.load(f)
+            recipes = data.get("recipes", []) if isinstance(data, dict) else data
+
+    start = time.perf_counter()
+    unknown = apply_nutrition(recipes)
+    elapsed = time.perf_counter() - start
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for recipe in recipes:
+            out.write(json.dumps(recipe, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"{len(recipes)} recipes in {elapsed:.3f}s", file=sys.stderr)
+    if unknown:
+        print(f"{len(unknown)} recipes kept their nutrition: too few ingredients in the nutrient table",
+              file=sys.stderr)
+    common = get_calculator().unmatched_summary()
+    if common:
+        print(f"Ingredients not in the nutrient table: {common}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
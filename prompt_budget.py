@@ -0,0 +1,146 @@
+"""
+Prompt Budget Check
+Measures the instruction tokens of the extraction prompt and fails when the compact prompt
+grows beyond its budget; optionally compares extraction quality of both prompt styles
+
+Usage:
+    python prompt_budget.py                              # exit code 1 over budget
+    python prompt_budget.py --api-key KEY                # count with the model's token counter
+    python prompt_budget.py --eval urls.txt --api-key KEY
+    python prompt_budget.py --recorded output/prompt_eval_<ts>.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+from config import AVAILABLE_TAGS, OUTPUT_DIR, NUTRITION_SOURCE, ensure_dirs
+from gemini_service import build_prompt, call_gemini_api
+from prompt_compiler import count_prompt_tokens, PROMPT_STYLES, PROMPT_STYLE_COMPACT, PROMPT_STYLE_FULL
+from recipe_validator import validate_recipe, check_recipe_quality
+from nutrition import apply_nutrition, NUTRITION_SOURCE_LOCAL
+from url_ingest import UrlIngestor, open_url_file
+
+# Tokens of the compact prompt for a video link and the default tag list
+PROMPT_TOKEN_BUDGET = 850
+
+SAMPLE_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def measure_prompts(api_key=None) -> Dict[str, int]:
+    """Token count of each prompt style for SAMPLE_URL (without transcript)"""
+    counts = {}
+    for style in PROMPT_STYLES:
+        counts[style], exact = count_prompt_tokens(build_prompt(SAMPLE_URL, AVAILABLE_TAGS, prompt_style=style),
+                                                   api_key)
+    counts["exact"] = exact
+    return counts
+
+
+def record_eval(urls_file: str, api_key: str, record_path) -> List[Dict]:
+    """Extract every URL with both prompt styles and record the answers as JSONL"""
+    records = []
+    with open(record_path, "w", encoding="utf-8") as out:
+        for video_id, url in UrlIngestor(open_url_file(urls_file)):
+            for style in PROMPT_STYLES:
+                usage = {}
+                record = {"videoId": video_id, "style": style}
+                try:
+                    record["recipe"] = call_gemini_api(url, AVAILABLE_TAGS, api_key, usage=usage, prompt_style=style)
+                except Exception as e:
+                    record["error"] = str(e)
+                record["usage"] = usage
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                records.append(record)
+            print(f"{video_id}: recorded", file=sys.stderr, flush=True)
+    return records
+
+
+def score(records: List[Dict]) -> Dict[str, Dict]:
+    """Validation and quality rates per style, and tag/category agreement between the styles"""
+    scores = {style: {"count": 0, "valid": 0, "complete": 0, "prompt_tokens": 0, "output_tokens": 0}
+              for style in PROMPT_STYLES}
+    by_video: Dict[str, Dict] = {}
+    local_nutrition = NUTRITION_SOURCE == NUTRITION_SOURCE_LOCAL
+    if local_nutrition:
+        # Same as the pipeline: the whole recording in one batch
+        apply_nutrition([record["recipe"] for record in records if isinstance(record.get("recipe"), dict)])
+
+    for record in records:
+        stats = scores[record["style"]]
+        stats["count"] += 1
+        stats["prompt_tokens"] += record.get("usage", {}).get("prompt_tokens", 0)
+        stats["output_tokens"] += record.get("usage", {}).get("output_tokens", 0)
+        recipe = record.get("recipe")
+        if recipe is None or not validate_recipe(recipe, AVAILABLE_TAGS)[0]:
+            continue
+        stats["valid"] += 1
+        if not check_recipe_quality(recipe, check_nutrition=not local_nutrition):
+            stats["complete"] += 1
+        by_video.setdefault(record["videoId"], {})[record["style"]] = recipe
+
+    pairs = [videos for videos in by_video.values() if len(videos) == len(PROMPT_STYLES)]
+    agreement = {"pairs": len(pairs), "tags": 0.0, "category": 0}
+    for videos in pairs:
+        compact, full = set(videos[PROMPT_STYLE_COMPACT]["tags"]), set(videos[PROMPT_STYLE_FULL]["tags"])
+        agreement["tags"] += len(compact & full) / len(compact | full) if compact | full else 1.0
+        agreement["category"] += videos[PROMPT_STYLE_COMPACT]["category"] == videos[PROMPT_STYLE_FULL]["category"]
+    scores["agreement"] = agreement
+    return scores
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prompt token budget and prompt quality comparison")
+    parser.add_argument("--api-key", default=None,
+                        help="Gemini API key for exact token counts and --eval (default: GEMINI_API_KEY)")
+    parser.add_argument("--budget", type=int, default=PROMPT_TOKEN_BUDGET,
+                        help=f"Token budget of the compact prompt (default: {PROMPT_TOKEN_BUDGET})")
+    parser.add_argument("--eval", default=None, help="URL file to extract with both prompt styles")
+    parser.add_argument("--recorded", default=None, help="Re-score a recording made by --eval")
+    args = parser.parse_args(argv)
+    api_key = args.api_key or os.getenv("GEMINI_API_KEY")
+
+    counts = measure_prompts(api_key)
+    method = "model token counter" if counts["exact"] else "estimate, ~4 characters/token"
+    over_budget = counts[PROMPT_STYLE_COMPACT] > args.budget
+    print(f"Prompt tokens ({method}): compact {counts[PROMPT_STYLE_COMPACT]} (budget {args.budget}) "
+          f"{'FAIL' if over_budget else 'ok'}, full {counts[PROMPT_STYLE_FULL]}")
+
+    records = None
+    if args.recorded:
+        with open(args.recorded, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    elif args.eval:
+        if not api_key:
+            print("Error: --eval needs an API key (use --api-key or GEMINI_API_KEY)", file=sys.stderr)
+            return 1
+        ensure_dirs()
+        record_path = OUTPUT_DIR / f"prompt_eval_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+        records = record_eval(args.eval, api_key, record_path)
+        print(f"Recorded answers: {record_path}")
+
+    quality_drop = False
+    if records is not None:
+        scores = score(records)
+        for style in PROMPT_STYLES:
+            stats = scores[style]
+            count = stats["count"] or 1
+            print(f"{style:<8} {stats['valid']}/{stats['count']} valid, {stats['complete']} pass quality checks, "
+                  f"avg {stats['prompt_tokens'] / count:.0f} prompt + {stats['output_tokens'] / count:.0f} output tokens")
+        agreement = scores["agreement"]
+        if agreement["pairs"]:
+            print(f"Agreement on {agreement['pairs']} videos: tags {agreement['tags'] / agreement['pairs']:.0%} "
+                  f"(Jaccard), category {agreement['category'] / agreement['pairs']:.0%}")
+        compact, full = scores[PROMPT_STYLE_COMPACT], scores[PROMPT_STYLE_FULL]
+        quality_drop = compact["valid"] < full["valid"] or compact["complete"] < full["complete"]
+        if quality_drop:
+            print("FAIL: the compact prompt produces fewer valid or complete recipes")
+
+    return 1 if over_budget or quality_drop else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Prompt Compiler Module
+Builds the compact extraction prompt from the recipe schema and a numbered tag list,
+and maps the tag numbers of the answer back to tag names
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from config import GEMINI_MODEL
+from recipe_validator import RECIPE_SCHEMA, MEAL_TAGS, DIFFICULTY_TAGS, TIME_TAGS
+from transcripts import estimate_tokens
+
+# Prompt variants understood by call_gemini_api
+PROMPT_STYLE_COMPACT = "compact"
+PROMPT_STYLE_FULL = "full"
+PROMPT_STYLES = (PROMPT_STYLE_COMPACT, PROMPT_STYLE_FULL)
+
+# Fields with fixed or generated values, filled in after parsing instead of being asked for
+FILLED_FIELDS = {"recipeId", "imageUrl", "createdBy", "createdAt", "isFavorite"}
+
+# Short Romanian guidance per field; types, ranges and allowed values come from RECIPE_SCHEMA
+FIELD_HINTS = {
+    "title": "specific, 10-100 caractere, fără emoji",
+    "description": "1-2 propoziții apetisante, cu ingredientele principale",
+    "prepTime": "minute de pregătire înainte de gătit",
+    "cookTime": "minute de gătit (0 = fără gătit)",
+    "totalTime": "≥ prepTime + cookTime, include odihna/dospirea",
+    "servings": "porții realiste",
+    "difficulty": "beginner: <5 ingrediente, <30 min; advanced: >15 ingrediente, >90 min",
+    "instructions": "minim 3 pași la imperativ, cu temperaturi, timpi și tehnici",
+    "category": "cea mai potrivită"
+}
+
+INGREDIENT_HINTS = {
+    "name": "lowercase, specific, fără cantitate",
+    "quantity": "\"2-3\" → 2.5; 0 pentru \"la gust\""
+}
+
+NUTRITION_HINT = "per porție; calories 100-1200 kcal, protein/carbs/fats în grame; healthScore: 80+ foarte sănătos, <20 foarte indulgent"
+
+HEADER = """Extrage rețeta din videoclipul YouTube de mai jos. Răspunde DOAR cu un obiect JSON valid, fără markdown.
+Textele sunt în limba română; cheile JSON rămân în engleză. Dacă lipsesc informații, estimează după rețete similare.
+
+"""
+
+
+def _bounds(schema: Dict, low: str, high: str) -> str:
+    lower, upper = schema.get(low), schema.get(high)
+    if lower is not None and upper is not None:
+        return f" {lower}-{upper}"
+    if lower is not None:
+        return f" ≥{lower}"
+    return ""
+
+
+def _field_spec(schema: Dict) -> str:
+    """Compact type description of one schema property"""
+    if "enum" in schema:
+        return "|".join(schema["enum"])
+    kind = {"integer": "int", "number": "număr", "string": "text", "boolean": "bool"}.get(schema["type"], schema["type"])
+    return kind + _bounds(schema, "minimum", "maximum")
+
+
+def _tag_family(available_tags: List[str], family: set) -> str:
+    return ",".join(str(number) for number, tag in enumerate(available_tags, 1) if tag in family)
+
+
+@lru_cache(maxsize=8)
+def _compiled_sections(available_tags: Tuple[str, ...], include_nutrition: bool) -> str:
+    """Field and tag sections of the compact prompt (cached per tag list)"""
+    properties = RECIPE_SCHEMA["properties"]
+    lines = ["# CÂMPURI"]
+
+    for name in RECIPE_SCHEMA["required"] + ["no_transcript_warning"]:
+        if name in FILLED_FIELDS or (name == "nutrition" and not include_nutrition):
+            continue
+        if name == "no_transcript_warning":
+            lines.append("no_transcript_warning: bool, true doar dacă videoclipul nu are transcriere")
+            continue
+
+        schema = properties[name]
+        if name == "ingredients":
+            item = schema["items"]["properties"]
+            parts = [f"{key}: {_field_spec(item[key])}" + (f" ({INGREDIENT_HINTS[key]})" if key in INGREDIENT_HINTS else "")
+                     for key in schema["items"]["required"]]
+            lines.append(f"ingredients:{_bounds(schema, 'minItems', 'maxItems')} × {{{'; '.join(parts)}}}")
+        elif name == "nutrition":
+            keys = ", ".join(schema["properties"])
+            lines.append(f"nutrition: {{{keys}}}, {NUTRITION_HINT}")
+        elif name == "tags":
+            lines.append(
+                f"tags:{_bounds(schema, 'minItems', 'maxItems')} NUMERE din ETICHETE; obligatoriu câte unul pentru "
+                f"masă ({_tag_family(available_tags, MEAL_TAGS)}), "
+                f"dificultate ({_tag_family(available_tags, DIFFICULTY_TAGS)}) și "
+                f"timp ({_tag_family(available_tags, TIME_TAGS)})"
+            )
+        elif schema["type"] == "array":
+            lines.append(f"{name}: listă{_bounds(schema, 'minItems', 'maxItems')}"
+                         + (f", {FIELD_HINTS[name]}" if name in FIELD_HINTS else ""))
+        else:
+            lines.append(f"{name}: {_field_spec(schema)}"
+                         + (f", {FIELD_HINTS[name]}" if name in FIELD_HINTS else ""))
+
+    lines.append("")
+    lines.append("# ETICHETE")
+    lines.append(", ".join(f"{number} {tag}" for number, tag in enumerate(available_tags, 1)))
+    return "\n".join(lines)
+
+
+def compile_prompt(video_source: str, available_tags: List[str], include_nutrition: bool = True) -> str:
+    """
+    Build the compact extraction prompt
+
+    Args:
+        video_source: Video link section (optionally with the transcript)
+        available_tags: Allowed tags; the model answers with their 1-based numbers
+        include_nutrition: Ask for the nutrition block (left out when it is computed locally)
+
+    Returns:
+        str: Prompt text
+    """
+    return HEADER + video_source + "\n\n" + _compiled_sections(tuple(available_tags), include_nutrition)
+
+
+def decode_tags(tags: list, available_tags: List[str]) -> list:
+    """
+    Map tag numbers of a compact-prompt answer back to tag names
+
+    Tag names are kept as they are; numbers outside the list are kept as
+    text so validation reports them as invalid tags.
+    """
+    decoded = []
+    for tag in tags or []:
+        if isinstance(tag, str) and tag.strip().isdigit():
+            tag = int(tag)
+        if isinstance(tag, int) and not isinstance(tag, bool):
+            tag = available_tags[tag - 1] if 1 <= tag <= len(available_tags) else str(tag)
+        decoded.append(tag)
+    return decoded
+
+
+def count_prompt_tokens(prompt: str, api_key: Optional[str] = None,
+                        model_name: str = GEMINI_MODEL) -> Tuple[int, bool]:
+    """
+    Count the tokens of a prompt
+
+    Uses the model's token counter when an API key is given, otherwise the
+    four-characters-per-token estimate.
+
+    Returns:
+        tuple: (token count, True when counted by the model)
+    """
+    if not api_key:
+        return estimate_tokens(prompt), False
+
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name).count_tokens(prompt).total_tokens, True
@@ -0,0 +1,296 @@
+"""
+Recipe Model Module
+Compact slotted Recipe, Ingredient and Nutrition classes with interned enum values
+"""
+
+import sys
+from typing import Dict, Optional, Tuple
+
+from config import (
+    VALID_UNITS,
+    VALID_DIFFICULTIES,
+    VALID_CATEGORIES,
+    VALID_CUISINES,
+    AVAILABLE_TAGS,
+    PLACEHOLDER_IMAGE_URL
+)
+
+# Canonical string objects for every known enum value (plus the fixed imageUrl and
+# createdBy values filled in by gemini_service), so thousands of recipes share a
+# single copy of each. The set is fixed: other values are never added to it.
+_CANONICAL = {value: sys.intern(value) for value in
+              VALID_UNITS + VALID_DIFFICULTIES + VALID_CATEGORIES + VALID_CUISINES + AVAILABLE_TAGS
+              + [PLACEHOLDER_IMAGE_URL, "youtube_import"]}
+
+# Distinct source key orders shared between recipes (bounded; further orders are not shared)
+KEY_ORDER_CACHE_SIZE = 256
+_KEY_ORDERS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+# Mealee JSON keys handled by Recipe, in export order
+RECIPE_KEYS = (
+    "recipeId", "title", "description", "imageUrl",
+    "prepTime", "cookTime", "totalTime", "servings",
+    "difficulty", "ingredients", "instructions", "nutrition",
+    "tags", "category", "cuisine", "createdBy", "createdAt",
+    "isFavorite", "no_transcript_warning"
+)
+
+
+# Keys handled by Ingredient and Nutrition, in export order
+INGREDIENT_KEYS = ("name", "quantity", "unit")
+NUTRITION_KEYS = ("calories", "protein", "carbs", "fats", "healthScore")
+
+
+def intern_value(value):
+    """Return the shared instance of a known enum-like string; other values pass through unchanged"""
+    if value is None:
+        return None
+    return _CANONICAL.get(value, value)
+
+
+def _key_order(keys) -> Tuple[str, ...]:
+    """Shared tuple of a recipe's keys in source order"""
+    order = tuple(keys)
+    shared = _KEY_ORDERS.get(order)
+    if shared is None:
+        if len(_KEY_ORDERS) >= KEY_ORDER_CACHE_SIZE:
+            return order
+        shared = _KEY_ORDERS[order] = order
+    return shared
+
+
+class Ingredient:
+    """Single recipe ingredient (unknown keys in ``extra``, source key order in ``key_order``)"""
+
+    __slots__ = ("name", "quantity", "unit", "extra", "key_order")
+
+    def __init__(self, name: str, quantity: float, unit: str, extra: Optional[Dict] = None,
+                 key_order: Optional[Tuple[str, ...]] = None):
+        self.name = name
+        self.quantity = quantity
+        self.unit = intern_value(unit)
+        self.extra = extra
+        # None: INGREDIENT_KEYS order
+        self.key_order = key_order
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Ingredient":
+        extra = {key: value for key, value in data.items() if key not in INGREDIENT_KEYS}
+        return cls(data.get("name"), data.get("quantity"), data.get("unit"), extra or None, _key_order(data))
+
+    def to_dict(self) -> Dict:
+        return _ordered(INGREDIENT_KEYS, (self.name, self.quantity, self.unit), self.extra, self.key_order)
+
+
+class Nutrition:
+    """Nutrition values per serving (unknown keys in ``extra``, source key order in ``key_order``)"""
+
+    __slots__ = ("calories", "protein", "carbs", "fats", "health_score", "extra", "key_order")
+
+    def __init__(self, calories: float, protein: float, carbs: float, fats: float,
+                 health_score: Optional[int] = None, extra: Optional[Dict] = None,
+                 key_order: Optional[Tuple[str, ...]] = None):
+        self.calories = calories
+        self.protein = protein
+        self.carbs = carbs
+        self.fats = fats
+        self.health_score = health_score
+        self.extra = extra
+        # None: NUTRITION_KEYS order, healthScore left out when None
+        self.key_order = key_order
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Nutrition":
+        extra = {key: value for key, value in data.items() if key not in NUTRITION_KEYS}
+        return cls(data.get("calories"), data.get("protein"), data.get("carbs"), data.get("fats"),
+                   data.get("healthScore"), extra or None, _key_order(data))
+
+    def to_dict(self) -> Dict:
+        values = (self.calories, self.protein, self.carbs, self.fats, self.health_score)
+        if self.key_order is None and self.health_score is None:
+            return _ordered(NUTRITION_KEYS[:-1], values[:-1], self.extra, None)
+        return _ordered(NUTRITION_KEYS, values, self.extra, self.key_order)
+
+
+def _ordered(keys: Tuple[str, ...], values: tuple, extra: Optional[Dict],
+             key_order: Optional[Tuple[str, ...]]) -> Dict:
+    """Rebuild a dict from schema values and extra keys, in source order when it is known"""
+    known = dict(zip(keys, values))
+    if key_order is None:
+        if extra:
+            known.update(extra)
+        return known
+    extra = extra or {}
+    return {key: known[key] if key in known else extra[key] for key in key_order}
+
+
+class Recipe:
+    """
+    Typed recipe in the Mealee format.
+
+    Lists become tuples, known enum-like strings are interned and keys
+    the model does not know about are kept in ``extra``. The source key
+    order (a tuple shared between recipes) is kept as well, so to_dict()
+    returns the original keys in their original order, explicit nulls
+    included. Ingredient and nutrition objects do the same, so
+    Recipe.from_dict(data).to_dict() == data.
+    """
+
+    __slots__ = (
+        "recipe_id", "title", "description", "image_url",
+        "prep_time", "cook_time", "total_time", "servings",
+        "difficulty", "ingredients", "instructions", "nutrition",
+        "tags", "category", "cuisine", "created_by", "created_at",
+        "is_favorite", "no_transcript_warning", "extra", "key_order"
+    )
+
+    def __init__(self, recipe_id: str, title: str, description: str, image_url: str,
+                 prep_time: int, cook_time: int, total_time: int, servings: int,
+                 difficulty: str, ingredients: Tuple[Ingredient, ...], instructions: Tuple[str, ...],
+                 nutrition: Optional[Nutrition], tags: Tuple[str, ...], category: str, cuisine: str,
+                 created_by: str, created_at: str, is_favorite: Optional[bool] = None,
+                 no_transcript_warning: Optional[bool] = None, extra: Optional[Dict] = None,
+                 key_order: Optional[Tuple[str, ...]] = None):
+        self.recipe_id = recipe_id
+        self.title = title
+        self.description = description
+        self.image_url = intern_value(image_url)
+        self.prep_time = prep_time
+        self.cook_time = cook_time
+        self.total_time = total_time
+        self.servings = servings
+        self.difficulty = intern_value(difficulty)
+        self.ingredients = ingredients
+        self.instructions = instructions
+        self.nutrition = nutrition
+        self.tags = tuple(intern_value(tag) for tag in tags)
+        self.category = intern_value(category)
+        self.cuisine = intern_value(cuisine)
+        self.created_by = intern_value(created_by)
+        self.created_at = created_at
+        self.is_favorite = is_favorite
+        self.no_transcript_warning = no_transcript_warning
+        self.extra = extra
+        # None: RECIPE_KEYS order, keys whose value is None left out
+        self.key_order = key_order
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Recipe":
+        """
+        Build a Recipe from a Mealee recipe dictionary
+
+        Args:
+            data: Recipe JSON object (as returned by call_gemini_api)
+
+        Returns:
+            Recipe: Compact recipe instance
+        """
+        extra = {key: value for key, value in data.items() if key not in RECIPE_KEYS}
+        nutrition = data.get("nutrition")
+
+        return cls(
+            recipe_id=data["recipeId"],
+            title=data["title"],
+            description=data.get("description"),
+            image_url=data.get("imageUrl"),
+            prep_time=data.get("prepTime"),
+            cook_time=data.get("cookTime"),
+            total_time=data.get("totalTime"),
+            servings=data.get("servings"),
+            difficulty=data.get("difficulty"),
+            ingredients=tuple(Ingredient.from_dict(ing) for ing in data.get("ingredients", ())),
+            instructions=tuple(data.get("instructions", ())),
+            nutrition=Nutrition.from_dict(nutrition) if nutrition is not None else None,
+            tags=data.get("tags", ()),
+            category=data.get("category"),
+            cuisine=data.get("cuisine"),
+            created_by=data.get("createdBy"),
+            created_at=data.get("createdAt"),
+            is_favorite=data.get("isFavorite"),
+            no_transcript_warning=data.get("no_transcript_warning"),
+            extra=extra or None,
+            key_order=_key_order(data)
+        )
+
+    def to_dict(self) -> Dict:
+        """
+        Convert back to a Mealee recipe dictionary
+
+        Returns:
+            dict: Recipe JSON object with keys in source order (export order
+                for recipes not built by from_dict)
+        """
+        values = (
+            self.recipe_id, self.title, self.description, self.image_url,
+            self.prep_time, self.cook_time, self.total_time, self.servings,
+            self.difficulty, [ing.to_dict() for ing in self.ingredients], list(self.instructions),
+            self.nutrition.to_dict() if self.nutrition is not None else None,
+            list(self.tags), self.category, self.cuisine, self.created_by, self.created_at,
+            self.is_favorite, self.no_transcript_warning
+        )
+        if self.key_order is None:
+            data = {key: value for key, value in zip(RECIPE_KEYS, values) if value is not None}
+            if self.extra:
+                data.update(self.extra)
+            return data
+
+        known = dict(zip(RECIPE_KEYS, values))
+        extra = self.extra or {}
+        return {key: known[key] if key in known else extra[key] for key in self.key_order}
+
+
+def measure_memory(count: int = 100_000) -> Dict:
+    """
+    Compare the memory held by dict recipes and Recipe objects
+
+    Args:
+        count: Number of synthetic recipes in the corpus
+
+    Returns:
+        dict: Bytes held by each representation and the saving ratio
+    """
+    import json
+    import tracemalloc
+
+    sample = json.dumps({
+        "recipeId": "00000000-0000-4000-8000-000000000000",
+        "title": "Ciorbă de perișoare cu smântână",
+        "description": "Ciorbă tradițională românească cu perișoare fragede și smântână.",
+        "imageUrl": "https://example.com/placeholder.jpg",
+        "prepTime": 30, "cookTime": 45, "totalTime": 75, "servings": 6,
+        "difficulty": "intermediate",
+        "ingredients": [{"name": f"ingredient {i}", "quantity": 250.0, "unit": VALID_UNITS[i % len(VALID_UNITS)]}
+                        for i in range(10)],
+        "instructions": [f"Pasul {i} detaliat în limba română." for i in range(6)],
+        "nutrition": {"calories": 350.0, "protein": 25.0, "carbs": 40.0, "fats": 12.0, "healthScore": 65},
+        "tags": ["cină", "tradițional", "intermediar", "moderat", "românesc"],
+        "category": "lunch", "cuisine": "romanian",
+        "createdBy": "youtube_import", "createdAt": "2025-11-19T10:30:00Z",
+        "isFavorite": False, "no_transcript_warning": False
+    }, ensure_ascii=False)
+
+    def held_bytes(build):
+        tracemalloc.start()
+        corpus = [build(json.loads(sample)) for _ in range(count)]
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del corpus
+        return held
+
+    dict_bytes = held_bytes(lambda data: data)
+    model_bytes = held_bytes(Recipe.from_dict)
+
+    return {
+        "recipes": count,
+        "dict_bytes": dict_bytes,
+        "model_bytes": model_bytes,
+        "saving_ratio": 1 - model_bytes / dict_bytes
+    }
+
+
+if __name__ == "__main__":
+    result = measure_memory()
+    print(f"Recipes:        {result['recipes']}")
+    print(f"dict corpus:    {result['dict_bytes'] / 1024 / 1024:.1f} MiB")
+    print(f"Recipe corpus:  {result['model_bytes'] / 1024 / 1024:.1f} MiB")
+    print(f"Saving:         {result['saving_ratio']:.0%}")
@@ -0,0 +1,219 @@
+"""
+Recipe Pipeline Module
+Extraction and validation of a single video, shared by the GUI and headless runners
+"""
+
+import time
+from typing import Callable, Dict, List, Optional
+
+from config import MODEL_TIERS, NUTRITION_SOURCE, NUTRITION_MIN_MATCHED_SHARE
+from gemini_service import call_gemini_api, extract_video_id, InvalidResponseError
+from nutrition import get_calculator, apply_nutrition, NUTRITION_SOURCE_LOCAL
+from recipe_validator import validate_recipe, check_recipe_quality
+from transcripts import load_transcript, estimate_tokens, SOURCE_TRANSCRIPT, SOURCE_VIDEO
+
+# Outcome of processing one URL
+RESULT_ACCEPTED = "accepted"
+RESULT_NEEDS_REVIEW = "needs_review"
+RESULT_INVALID = "invalid"
+RESULT_ERROR = "error"
+
+# What to do with recipes generated without a transcript
+POLICY_ACCEPT = "accept"
+POLICY_REJECT = "reject"
+POLICY_DEFER = "defer"
+NO_TRANSCRIPT_POLICIES = (POLICY_ACCEPT, POLICY_REJECT, POLICY_DEFER)
+
+# Outcome of one model tier within the cascade
+OUTCOME_ACCEPTED = "accepted"
+OUTCOME_ESCALATED = "escalated"
+OUTCOME_FAILED = "failed"
+
+
+class ExtractionResult:
+    """Result of running one URL through extraction and validation"""
+
+    __slots__ = ("url", "video_id", "status", "recipe", "message", "elapsed", "source", "usage",
+                 "tier", "attempts", "issues")
+
+    def __init__(self, url: str, video_id: str, status: str, recipe: Optional[Dict] = None,
+                 message: str = "", elapsed: float = 0.0, source: str = SOURCE_VIDEO,
+                 usage: Optional[Dict] = None, tier: Optional[str] = None,
+                 attempts: Optional[List[Dict]] = None, issues: Optional[List[str]] = None):
+        self.url = url
+        self.video_id = video_id
+        self.status = status
+        self.recipe = recipe
+        self.message = message
+        self.elapsed = elapsed
+        self.source = source
+        self.usage = usage or {}
+        self.tier = tier
+        self.attempts = attempts or []
+        # Quality issues of a kept recipe (the last tier keeps its answer despite them)
+        self.issues = issues or []
+
+
+def process_url(url: str, available_tags: list, api_key: str,
+                extract_fn: Callable = call_gemini_api, transcript_dir=None,
+                tiers: Optional[List[Dict]] = None) -> ExtractionResult:
+    """
+    Extract and validate the recipe of one YouTube video
+
+    When transcript_dir holds a subtitle file for the video, its cleaned
+    text is sent instead of asking the model to analyse the video. The
+    model tiers are tried in order: a tier's answer is kept when it passes
+    validate_recipe and check_recipe_quality, otherwise the next tier is
+    asked. The last tier's answer is kept as is. A malformed answer
+    (InvalidResponseError: truncated or non-object JSON) escalates like an
+    invalid recipe. Any other API error (throttling, network, bad URL)
+    ends the cascade with an error result instead of escalating, so a 429
+    is never repeated against the pricier tiers.
+    With NUTRITION_SOURCE = "local" the nutrition block is computed from
+    the ingredients before validation instead of trusting the model. When
+    too few ingredients are in the nutrient table, the model's own block
+    is kept if it gave one; otherwise the answer fails like a quality
+    check, so it escalates and is never stored with zero nutrition.
+
+    Args:
+        url: YouTube video URL
+        available_tags: List of allowed tags
+        api_key: Google Gemini API key
+        extract_fn: Extraction backend with the call_gemini_api signature
+        transcript_dir: Directory with local <video_id>.vtt / .srt / .txt transcripts
+        tiers: Model cascade (default: MODEL_TIERS)
+
+    Returns:
+        ExtractionResult: accepted, needs_review (no transcript), invalid or error
+    """
+    tiers = tiers or MODEL_TIERS
+    video_id = extract_video_id(url)
+    start = time.monotonic()
+
+    local_nutrition = NUTRITION_SOURCE == NUTRITION_SOURCE_LOCAL
+    if local_nutrition:
+        # Fails here (not once per tier) when numpy is missing
+        get_calculator()
+
+    transcript = load_transcript(video_id, transcript_dir) if transcript_dir else None
+    source = SOURCE_TRANSCRIPT if transcript else SOURCE_VIDEO
+    transcript_usage = {}
+    if transcript:
+        transcript_usage["transcript_tokens"] = estimate_tokens(transcript.text)
+        transcript_usage["raw_transcript_tokens"] = (transcript.raw_chars + 3) // 4
+        transcript_usage["estimated_video_tokens"] = transcript.estimated_video_tokens
+
+    attempts = []
+    for level, tier in enumerate(tiers):
+        last_tier = level == len(tiers) - 1
+        usage = dict(transcript_usage)
+        attempt_start = time.monotonic()
+        recipe_json = None
+        issues = []
+
+        try:
+            recipe_json = extract_fn(url, available_tags, api_key,
+                                     transcript=transcript.text if transcript else None, usage=usage,
+                                     model_name=tier["model"], generation_config=tier["generation_config"])
+        except InvalidResponseError as e:
+            status, message = RESULT_INVALID, str(e)
+        except Exception as e:
+            status, message = RESULT_ERROR, str(e)
+        else:
+            # Too few known ingredients: only the model's own nutrition block can stand in
+            unknown_nutrition = local_nutrition and isinstance(recipe_json, dict) and bool(apply_nutrition([recipe_json]))
+            if unknown_nutrition and not isinstance(recipe_json.get("nutrition"), dict):
+                is_valid, message = False, _unknown_nutrition_message(recipe_json)
+            else:
+                is_valid, message = validate_recipe(recipe_json, available_tags)
+            issues = check_recipe_quality(
+                recipe_json, check_nutrition=unknown_nutrition or not local_nutrition
+            ) if is_valid else []
+            if not is_valid:
+                status = RESULT_INVALID
+            elif issues and not last_tier:
+                status, message = RESULT_INVALID, f"Quality check failed: {'; '.join(issues)}"
+            else:
+                if issues:
+                    message = f"Valid with quality issues: {'; '.join(issues)}"
+                status = RESULT_NEEDS_REVIEW if recipe_json.get('no_transcript_warning', False) else RESULT_ACCEPTED
+
+        kept = status in (RESULT_ACCEPTED, RESULT_NEEDS_REVIEW)
+        final = kept or last_tier or status == RESULT_ERROR
+        attempts.append({
+            "tier": tier["name"],
+            "outcome": OUTCOME_ACCEPTED if kept else (OUTCOME_FAILED if final else OUTCOME_ESCALATED),
+            "reason": "" if kept else message,
+            "elapsed": time.monotonic() - attempt_start,
+            "usage": usage
+        })
+
+        if final:
+            return ExtractionResult(url, video_id, status, recipe_json, message,
+                                    time.monotonic() - start, source, usage, tier["name"], attempts,
+                                    issues if kept else None)
+
+
+def _unknown_nutrition_message(recipe_json: Dict) -> str:
+    calculator = get_calculator()
+    names = [ingredient.get("name") for ingredient in recipe_json.get("ingredients") or []
+             if isinstance(ingredient, dict) and isinstance(ingredient.get("name"), str)
+             and calculator.match(ingredient["name"]) is None]
+    return (f"Nutrition unknown: less than {NUTRITION_MIN_MATCHED_SHARE:.0%} of the ingredients are in the "
+            f"nutrient table (missing: {', '.join(names) or 'quantities'})")
+
+
+class CascadeStats:
+    """
+    Per-tier calls, success rate, latency, tokens and cost of the model cascade
+
+    Results are recorded from a single thread (the runner's result loop).
+    """
+
+    def __init__(self, tiers: Optional[List[Dict]] = None):
+        self.tiers = tiers or MODEL_TIERS
+        self.stats = {tier["name"]: self._empty() for tier in self.tiers}
+
+    @staticmethod
+    def _empty() -> Dict:
+        return {"calls": 0, OUTCOME_ACCEPTED: 0, OUTCOME_ESCALATED: 0, OUTCOME_FAILED: 0, "seconds": 0.0,
+                "prompt_tokens": 0, "output_tokens": 0}
+
+    def record(self, result: ExtractionResult):
+        for attempt in result.attempts:
+            stats = self.stats.setdefault(attempt["tier"], self._empty())
+            stats["calls"] += 1
+            stats[attempt["outcome"]] += 1
+            stats["seconds"] += attempt["elapsed"]
+            stats["prompt_tokens"] += attempt["usage"].get("prompt_tokens", 0)
+            stats["output_tokens"] += attempt["usage"].get("output_tokens", 0)
+
+    def rows(self) -> List[Dict]:
+        """One summary per tier that was called: name, calls, success rate, avg latency, tokens, cost"""
+        prices = {tier["name"]: tier.get("price_per_million", (0.0, 0.0)) for tier in self.tiers}
+        rows = []
+        for name, stats in self.stats.items():
+            if not stats["calls"]:
+                continue
+            input_price, output_price = prices.get(name, (0.0, 0.0))
+            rows.append({
+                "tier": name,
+                "calls": stats["calls"],
+                "accepted": stats["accepted"],
+                "escalated": stats["escalated"],
+                "failed": stats["failed"],
+                "success_rate": stats["accepted"] / stats["calls"],
+                "avg_seconds": stats["seconds"] / stats["calls"],
+                "tokens": stats["prompt_tokens"] + stats["output_tokens"],
+                "cost": (stats["prompt_tokens"] * input_price + stats["output_tokens"] * output_price) / 1_000_000
+            })
+        return rows
+
+    def report(self) -> List[str]:
+        """Human-readable lines, one per tier"""
+        return [
+            f"Tier {row['tier']}: {row['calls']} calls, {row['success_rate']:.0%} accepted, "
+            f"{row['escalated']} escalated, {row['failed']} failed, avg {row['avg_seconds']:.1f}s, "
+            f"{row['tokens']} tokens, ~${row['cost']:.4f}"
+            for row in self.rows()
+        ]
@@ -0,0 +1,319 @@
+"""
+Recipe Preview Module
+Virtualized table preview of stored recipes with lazy details, sorting and filtering
+"""
+
+import heapq
+import tkinter as tk
+from tkinter import scrolledtext, ttk
+from typing import Dict, List, Optional, Tuple
+
+from recipe_store import RecipeStore
+
+# Columns shown in the table: (row field index, heading, width)
+PREVIEW_COLUMNS = [
+    (1, "Titlu", 260),
+    (2, "Categorie", 90),
+    (3, "Bucătărie", 90),
+    (4, "Timp (min)", 80),
+    (5, "Etichete", 220)
+]
+
+# Rows pulled from the store per event-loop tick while the table loads
+LOAD_PAGE_SIZE = 2000
+
+# Delay before a filter is applied, so typing does not re-filter on every key
+FILTER_DELAY_MS = 200
+
+# Fallback row height (pixels) when the theme does not define one
+DEFAULT_ROW_HEIGHT = 20
+
+
+def format_recipe_details(recipe_json: dict) -> str:
+    """Format a recipe for the detail views"""
+    lines = [
+        f"Titlu: {recipe_json['title']}",
+        f"Descriere: {recipe_json['description']}",
+        "",
+        f"Categorie: {recipe_json['category']} | Bucătărie: {recipe_json['cuisine']}",
+        f"Ingrediente: {len(recipe_json['ingredients'])}",
+        f"Pași: {len(recipe_json['instructions'])}",
+        f"Timp total: {recipe_json['totalTime']} minute | Porții: {recipe_json['servings']}",
+        f"Dificultate: {recipe_json['difficulty']}",
+        f"Etichete: {', '.join(recipe_json['tags'])}",
+        "",
+        "Ingrediente detaliate:"
+    ]
+    lines += [f"  - {ing['name']}: {ing['quantity']} {ing['unit']}" for ing in recipe_json['ingredients']]
+    lines += ["", "Instrucțiuni:"]
+    lines += [f"  {i}. {step}" for i, step in enumerate(recipe_json['instructions'], 1)]
+    return "\n".join(lines) + "\n"
+
+
+class RecipePreviewWindow:
+    """
+    Preview window whose table only ever holds the visible rows.
+
+    Lightweight rows (recipeId, title, category, cuisine, time, tags) come
+    from the store's indexed columns and are loaded page by page from the
+    event loop, so the window appears immediately. The Treeview keeps one
+    item per visible line; scrolling moves an offset into the sorted and
+    filtered index list and re-fills those items. Full recipes are read
+    from the store only when a row is selected. While a sort or filter is
+    active, each loaded page is filtered and sorted on its own and merged
+    into the already sorted view, using sort keys computed once per row.
+    Keyboard navigation finds the selected row through a row -> position
+    map, so an arrow key costs the same for 100 rows as for 100k.
+    """
+
+    def __init__(self, root: tk.Misc, store: RecipeStore, batch_id: Optional[str]):
+        self.store = store
+        self.batch_id = batch_id
+
+        self.rows: List[Tuple] = []
+        self.view: List[int] = []
+        # Row index -> position in view; None after a merge moved rows (rebuilt on first use)
+        self.positions: Optional[Dict[int, int]] = {}
+        self.sort_keys: List = []
+        self.offset = 0
+        self.visible_rows = 1
+        self.selected: Optional[int] = None
+        self.sort_column: Optional[int] = None
+        self.sort_reverse = False
+        self.filter_job = None
+        self.loader = store.iter_summaries(batch_id, page_size=LOAD_PAGE_SIZE)
+        self.total = store.count(batch_id)
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Previzualizare Rețete")
+        self.window.geometry("900x650")
+
+        top_frame = ttk.Frame(self.window)
+        top_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
+
+        ttk.Label(top_frame, text="Filtru:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *_: self.schedule_filter())
+        ttk.Entry(top_frame, textvariable=self.filter_var, width=40).pack(side=tk.LEFT, padx=5)
+
+        self.status_label = ttk.Label(top_frame, text="")
+        self.status_label.pack(side=tk.RIGHT)
+
+        panes = ttk.PanedWindow(self.window, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        table_frame = ttk.Frame(panes)
+        self.tree = ttk.Treeview(table_frame, columns=[str(field) for field, _, _ in PREVIEW_COLUMNS],
+                                 show="headings", selectmode="browse")
+        for field, heading, width in PREVIEW_COLUMNS:
+            self.tree.heading(str(field), text=heading, command=lambda f=field: self.sort_by(f))
+            self.tree.column(str(field), width=width, anchor=tk.E if field == 4 else tk.W)
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        panes.add(table_frame, weight=3)
+
+        self.details = scrolledtext.ScrolledText(panes, wrap=tk.WORD, font=("Arial", 9),
+                                                 height=12, state=tk.DISABLED)
+        panes.add(self.details, weight=2)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.tree.bind("<Up>", lambda e: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self.move_selection(-self.visible_rows))
+        self.tree.bind("<Next>", lambda e: self.move_selection(self.visible_rows))
+
+        self.update_status()
+        self.window.after_idle(self.load_next_page)
+
+    # Loading
+
+    def load_next_page(self):
+        """Pull one page of rows from the store, then yield back to the event loop"""
+        if not self.window.winfo_exists():
+            return
+
+        page = next(self.loader, None)
+        if page is None:
+            self.loader = None
+            self.update_status()
+            return
+
+        start = len(self.rows)
+        self.rows.extend(page)
+        self.merge_rows(start)
+
+        self.render()
+        self.window.after(1, self.load_next_page)
+
+    def update_status(self):
+        text = f"Total rețete: {self.total}"
+        if self.filter_var.get().strip():
+            text += f" | Afișate: {len(self.view)}"
+        if self.loader is not None:
+            text += f" | Se încarcă... {len(self.rows)}"
+        self.status_label.config(text=text)
+
+    # Sorting and filtering
+
+    def sort_by(self, field: int):
+        """Sort by a column; clicking the same heading again reverses the order"""
+        if self.sort_column == field:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = field, False
+
+        for column, heading, _ in PREVIEW_COLUMNS:
+            arrow = (" ▼" if self.sort_reverse else " ▲") if column == field else ""
+            self.tree.heading(str(column), text=heading + arrow)
+
+        self.rebuild_view()
+        self.offset = 0
+        self.render()
+
+    def schedule_filter(self):
+        if self.filter_job is not None:
+            self.window.after_cancel(self.filter_job)
+        self.filter_job = self.window.after(FILTER_DELAY_MS, self.apply_filter)
+
+    def apply_filter(self):
+        self.filter_job = None
+        self.rebuild_view()
+        self.offset = 0
+        self.render()
+
+    def rebuild_view(self):
+        """Recompute the visible index list from all loaded rows"""
+        self.view = []
+        self.positions = {}
+        self.sort_keys = []
+        self.merge_rows(0)
+
+    def merge_rows(self, start: int):
+        """Filter the rows from `start` on and merge them into the sorted view"""
+        rows = self.rows
+        needle = self.filter_var.get().strip().casefold()
+
+        if needle:
+            new = [i for i in range(start, len(rows))
+                   if needle in f"{rows[i][1]}\t{rows[i][2]}\t{rows[i][3]}\t{rows[i][5]}".casefold()]
+        else:
+            new = range(start, len(rows))
+
+        if self.sort_column is None:
+            if self.positions is not None:
+                self.positions.update((index, position) for position, index in enumerate(new, len(self.view)))
+            self.view.extend(new)
+        else:
+            field = self.sort_column
+            if field == 4:
+                self.sort_keys.extend(row[field] or 0 for row in rows[start:])
+            else:
+                self.sort_keys.extend((row[field] or "").casefold() for row in rows[start:])
+            # Only the page is sorted; one linear merge places it into the sorted view
+            key = self.sort_keys.__getitem__
+            page = sorted(new, key=key, reverse=self.sort_reverse)
+            if page:
+                self.view = list(heapq.merge(self.view, page, key=key, reverse=self.sort_reverse))
+                self.positions = None
+
+        self.update_status()
+
+    def position_of(self, index: int) -> Optional[int]:
+        """Position of a row in the view, or None when it is filtered out"""
+        if self.positions is None:
+            self.positions = {row: position for position, row in enumerate(self.view)}
+        return self.positions.get(index)
+
+    # Virtual scrolling
+
+    def on_resize(self, event):
+        style = ttk.Style(self.tree)
+        row_height = int(style.lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT)
+        # The heading takes roughly one row
+        visible_rows = max(1, event.height // row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == tk.MOVETO:
+            self.set_offset(int(float(amount) * len(self.view)))
+        else:
+            self.scroll(int(amount), unit)
+
+    def scroll(self, amount: int, unit: str):
+        step = self.visible_rows if unit == tk.PAGES else 3
+        self.set_offset(self.offset + amount * step)
+        return "break"
+
+    def set_offset(self, offset: int):
+        offset = max(0, min(offset, len(self.view) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self):
+        """Fill the Treeview with the rows between offset and offset + visible_rows"""
+        self.offset = max(0, min(self.offset, len(self.view) - self.visible_rows))
+        window = self.view[self.offset:self.offset + self.visible_rows]
+
+        self.tree.delete(*self.tree.get_children())
+        for index in window:
+            row = self.rows[index]
+            self.tree.insert("", tk.END, iid=str(index),
+                             values=[row[field] for field, _, _ in PREVIEW_COLUMNS])
+
+        if self.selected is not None and self.tree.exists(str(self.selected)):
+            self.tree.selection_set(str(self.selected))
+
+        total = len(self.view)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(window)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def move_selection(self, delta: int):
+        """Keyboard navigation across the whole view, not only the rendered rows"""
+        if not self.view:
+            return "break"
+
+        current = self.position_of(self.selected) if self.selected is not None else None
+        position = current + delta if current is not None else 0
+        position = max(0, min(position, len(self.view) - 1))
+
+        if position < self.offset:
+            self.offset = position
+        elif position >= self.offset + self.visible_rows:
+            self.offset = position - self.visible_rows + 1
+
+        self.selected = self.view[position]
+        self.render()
+        self.show_details()
+        return "break"
+
+    # Details
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        index = int(selection[0])
+        if index != self.selected:
+            self.selected = index
+            self.show_details()
+
+    def show_details(self):
+        """Read the full recipe from the store only for the selected row"""
+        recipe = self.store.get(self.rows[self.selected][0]) if self.selected is not None else None
+        content = format_recipe_details(recipe) if recipe else ""
+
+        self.details.config(state=tk.NORMAL)
+        self.details.delete("1.0", tk.END)
+        self.details.insert("1.0", content)
+        self.details.config(state=tk.DISABLED)
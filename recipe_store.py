@@ -0,0 +1,306 @@
+"""
+Recipe Store Module
+Indexed local recipe store backed by SQLite with FTS5 full-text search
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Rows fetched per round-trip when streaming recipes out of the store
+ITER_PAGE_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id INTEGER PRIMARY KEY,
+    recipe_id TEXT NOT NULL UNIQUE,
+    video_id TEXT,
+    batch_id TEXT,
+    title TEXT NOT NULL,
+    category TEXT,
+    cuisine TEXT,
+    difficulty TEXT,
+    total_time INTEGER,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_recipes_category ON recipes (category, total_time);
+CREATE INDEX IF NOT EXISTS idx_recipes_cuisine ON recipes (cuisine, total_time);
+CREATE INDEX IF NOT EXISTS idx_recipes_difficulty ON recipes (difficulty, total_time);
+CREATE INDEX IF NOT EXISTS idx_recipes_total_time ON recipes (total_time);
+CREATE INDEX IF NOT EXISTS idx_recipes_batch ON recipes (batch_id, id);
+
+CREATE TABLE IF NOT EXISTS recipe_tags (
+    tag TEXT NOT NULL,
+    recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, recipe_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_recipe_tags_recipe ON recipe_tags (recipe_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5 (
+    title, description, ingredients, instructions
+);
+"""
+
+# One recipe per video; created after older duplicate rows have been merged
+VIDEO_INDEX = """
+DROP INDEX IF EXISTS idx_recipes_video;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_recipes_video_unique ON recipes (video_id) WHERE video_id IS NOT NULL;
+"""
+
+
+class RecipeStore:
+    """
+    Persistent recipe store.
+
+    Full recipes are kept as compact JSON next to indexed columns for
+    category, cuisine, difficulty and totalTime, a tag join table and an
+    FTS5 index over title, description, ingredients and instructions.
+    Each video has at most one recipe: re-processing a video updates its
+    row (and its tags and full-text entry) instead of adding another.
+    The connection is shared between the GUI and worker threads, so every
+    operation is serialized through a lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        with self._conn:
+            self._drop_duplicate_videos()
+        self._conn.executescript(VIDEO_INDEX)
+
+    def _drop_duplicate_videos(self):
+        """Keep only the newest row per video (stores written before video_id was unique)"""
+        stale = [row[0] for row in self._conn.execute(
+            """SELECT id FROM recipes r WHERE video_id IS NOT NULL
+               AND id < (SELECT MAX(id) FROM recipes d WHERE d.video_id = r.video_id)"""
+        )]
+        self._delete_rows(stale)
+
+    def _delete_rows(self, row_ids: List[int]):
+        # recipe_tags rows go with ON DELETE CASCADE; the FTS table has no foreign key
+        self._conn.executemany("DELETE FROM recipes_fts WHERE rowid = ?", [(row_id,) for row_id in row_ids])
+        self._conn.executemany("DELETE FROM recipes WHERE id = ?", [(row_id,) for row_id in row_ids])
+
+    def add(self, recipe: Dict, video_id: Optional[str] = None, batch_id: Optional[str] = None):
+        """
+        Insert or replace a single recipe (keyed by video_id, else by recipeId)
+
+        Args:
+            recipe: Validated recipe dictionary
+            video_id: YouTube video ID the recipe was extracted from
+            batch_id: Identifier of the batch that produced the recipe
+        """
+        self.add_many([recipe], video_id=video_id, batch_id=batch_id)
+
+    def add_many(self, recipes: Iterable[Dict], video_id: Optional[str] = None,
+                 batch_id: Optional[str] = None) -> int:
+        """
+        Insert or replace recipes in a single transaction
+
+        Args:
+            recipes: Validated recipe dictionaries
+            video_id: YouTube video ID (only meaningful for single recipes)
+            batch_id: Identifier of the batch that produced the recipes
+
+        Returns:
+            int: Number of recipes written
+        """
+        written = 0
+        with self._lock, self._conn:
+            for recipe in recipes:
+                self._upsert(recipe, video_id, batch_id)
+                written += 1
+        return written
+
+    def _upsert(self, recipe: Dict, video_id: Optional[str], batch_id: Optional[str]):
+        data = json.dumps(recipe, ensure_ascii=False, separators=(",", ":"))
+        columns = (
+            video_id, batch_id, recipe["title"], recipe.get("category"),
+            recipe.get("cuisine"), recipe.get("difficulty"),
+            recipe.get("totalTime"), recipe.get("createdAt"), data
+        )
+
+        # The video's row first, then a row stored under the same recipeId without a video ID
+        row_ids = [row[0] for row in self._conn.execute(
+            "SELECT id FROM recipes WHERE video_id = ? OR recipe_id = ? ORDER BY video_id IS NULL, id",
+            (video_id, recipe["recipeId"])
+        )]
+
+        if row_ids:
+            row_id = row_ids[0]
+            self._delete_rows(row_ids[1:])
+            self._conn.execute(
+                """UPDATE recipes SET video_id = COALESCE(?, video_id), batch_id = ?, title = ?,
+                   category = ?, cuisine = ?, difficulty = ?, total_time = ?, created_at = ?, data = ?,
+                   recipe_id = ? WHERE id = ?""",
+                columns + (recipe["recipeId"], row_id)
+            )
+            self._conn.execute("DELETE FROM recipe_tags WHERE recipe_id = ?", (row_id,))
+            self._conn.execute("DELETE FROM recipes_fts WHERE rowid = ?", (row_id,))
+        else:
+            row_id = self._conn.execute(
+                """INSERT INTO recipes (video_id, batch_id, title, category, cuisine, difficulty,
+                   total_time, created_at, data, recipe_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                columns + (recipe["recipeId"],)
+            ).lastrowid
+
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO recipe_tags (tag, recipe_id) VALUES (?, ?)",
+            [(tag, row_id) for tag in recipe.get("tags", [])]
+        )
+        self._conn.execute(
+            "INSERT INTO recipes_fts (rowid, title, description, ingredients, instructions) VALUES (?, ?, ?, ?, ?)",
+            (
+                row_id,
+                recipe["title"],
+                recipe.get("description", ""),
+                " ".join(ing.get("name", "") for ing in recipe.get("ingredients", [])),
+                "\n".join(recipe.get("instructions", []))
+            )
+        )
+
+    def get(self, recipe_id: str) -> Optional[Dict]:
+        """Return a recipe by its recipeId, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM recipes WHERE recipe_id = ?", (recipe_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, batch_id: Optional[str] = None) -> int:
+        """Return the number of stored recipes, optionally for one batch"""
+        with self._lock:
+            if batch_id is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM recipes").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM recipes WHERE batch_id = ?", (batch_id,)
+                ).fetchone()
+        return row[0]
+
+    def iter_recipes(self, batch_id: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream recipes in insertion order without loading them all at once
+
+        Args:
+            batch_id: Only yield recipes from this batch
+
+        Yields:
+            dict: Recipe JSON object
+        """
+        last_id = 0
+        while True:
+            with self._lock:
+                if batch_id is None:
+                    rows = self._conn.execute(
+                        "SELECT id, data FROM recipes WHERE id > ? ORDER BY id LIMIT ?",
+                        (last_id, ITER_PAGE_SIZE)
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        "SELECT id, data FROM recipes WHERE batch_id = ? AND id > ? ORDER BY id LIMIT ?",
+                        (batch_id, last_id, ITER_PAGE_SIZE)
+                    ).fetchall()
+
+            for row_id, data in rows:
+                yield json.loads(data)
+
+            if len(rows) < ITER_PAGE_SIZE:
+                return
+            last_id = rows[-1][0]
+
+    def iter_summaries(self, batch_id: Optional[str] = None,
+                       page_size: int = ITER_PAGE_SIZE) -> Iterator[List[Tuple]]:
+        """
+        Stream table rows page by page from the indexed columns (recipe JSON is not decoded)
+
+        Args:
+            batch_id: Only yield recipes from this batch
+            page_size: Rows per page
+
+        Yields:
+            list: (recipe_id, title, category, cuisine, total_time, tags) tuples,
+            tags joined with ', '
+        """
+        query = """SELECT r.id, r.recipe_id, r.title, r.category, r.cuisine, r.total_time,
+                          (SELECT group_concat(t.tag, ', ') FROM recipe_tags t WHERE t.recipe_id = r.id)
+                   FROM recipes r WHERE {batch}r.id > ? ORDER BY r.id LIMIT ?"""
+        last_id = 0
+        while True:
+            with self._lock:
+                if batch_id is None:
+                    rows = self._conn.execute(query.format(batch=""), (last_id, page_size)).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        query.format(batch="r.batch_id = ? AND "), (batch_id, last_id, page_size)
+                    ).fetchall()
+
+            if rows:
+                yield [(row[1], row[2], row[3], row[4], row[5], row[6] or "") for row in rows]
+
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+
+    def search(self, text: Optional[str] = None, tags: Optional[List[str]] = None,
+               category: Optional[str] = None, cuisine: Optional[str] = None,
+               difficulty: Optional[str] = None, max_total_time: Optional[int] = None,
+               limit: int = 100) -> List[Dict]:
+        """
+        Query recipes using the indexed columns, tags and full-text index
+
+        Args:
+            text: FTS5 query over title, description, ingredients and instructions
+            tags: Recipes must carry every one of these tags
+            category: Exact category
+            cuisine: Exact cuisine
+            difficulty: Exact difficulty
+            max_total_time: Upper bound for totalTime (minutes)
+            limit: Maximum number of recipes returned
+
+        Returns:
+            list: Matching recipe dictionaries
+        """
+        clauses = []
+        params = []
+
+        for column, value in (("category", category), ("cuisine", cuisine), ("difficulty", difficulty)):
+            if value is not None:
+                clauses.append(f"r.{column} = ?")
+                params.append(value)
+
+        if max_total_time is not None:
+            clauses.append("r.total_time <= ?")
+            params.append(max_total_time)
+
+        for tag in tags or []:
+            clauses.append("r.id IN (SELECT recipe_id FROM recipe_tags WHERE tag = ?)")
+            params.append(tag)
+
+        if text:
+            clauses.append("r.id IN (SELECT rowid FROM recipes_fts WHERE recipes_fts MATCH ?)")
+            params.append(text)
+
+        query = "SELECT r.data FROM recipes r"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY r.id LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -3,8 +3,17 @@ Recipe Validator Module
 Validates recipe JSON against schema and business rules
 """
 
-import jsonschema
-from typing import Tuple
+from typing import List, Tuple
+
+from config import QUALITY_MIN_STEPS, QUALITY_MIN_INGREDIENTS
+
+# Units for which a zero quantity is expected
+UNQUANTIFIED_UNITS = {"la gust", "după preferință"}
+
+# Tag families every recipe should have one tag from (warning only)
+MEAL_TAGS = {'mic dejun', 'prânz', 'cină', 'gustare', 'desert'}
+DIFFICULTY_TAGS = {'începător', 'intermediar', 'avansat'}
+TIME_TAGS = {'rapid', 'moderat', 'îndelungat'}
 
 # Recipe JSON Schema
 RECIPE_SCHEMA = {
@@ -85,6 +94,20 @@ RECIPE_SCHEMA = {
     }
 }
 
+_schema_validator = None
+
+
+def _get_schema_validator():
+    """Import jsonschema and compile RECIPE_SCHEMA on first use"""
+    global _schema_validator
+    if _schema_validator is None:
+        import jsonschema
+
+        validator_class = jsonschema.validators.validator_for(RECIPE_SCHEMA)
+        _schema_validator = validator_class(RECIPE_SCHEMA)
+    return _schema_validator
+
+
 def validate_recipe(recipe_json: dict, available_tags: list) -> Tuple[bool, str]:
     """
     Validates recipe JSON against schema and business rules
@@ -97,10 +120,11 @@ def validate_recipe(recipe_json: dict, available_tags: list) -> Tuple[bool, str]
         Tuple of (is_valid: bool, error_message: str)
     """
     # Schema validation
-    try:
-        jsonschema.validate(instance=recipe_json, schema=RECIPE_SCHEMA)
-    except jsonschema.ValidationError as e:
-        return False, f"Schema validation error: {e.message}"
+    from jsonschema.exceptions import best_match
+
+    error = best_match(_get_schema_validator().iter_errors(recipe_json))
+    if error is not None:
+        return False, f"Schema validation error: {error.message}"
 
     # Tag validation
     recipe_tags = recipe_json.get('tags', [])
@@ -116,21 +140,17 @@ def validate_recipe(recipe_json: dict, available_tags: list) -> Tuple[bool, str]
     if total_time < (prep_time + cook_time):
         return False, f"totalTime ({total_time}) must be >= prepTime ({prep_time}) + cookTime ({cook_time})"
 
-    # Required tag categories (relaxed - not strictly enforced)
-    meal_tags = {'mic dejun', 'prânz', 'cină', 'gustare', 'desert'}
-    difficulty_tags = {'începător', 'intermediar', 'avansat'}
-    time_tags = {'rapid', 'moderat', 'îndelungat'}
-
-    # Check if at least one tag from each category is present (warning only)
+    # Required tag categories (relaxed - not strictly enforced):
+    # check if at least one tag from each category is present (warning only)
     warnings = []
 
-    if not any(tag in meal_tags for tag in recipe_tags):
+    if not any(tag in MEAL_TAGS for tag in recipe_tags):
         warnings.append("No meal type tag found")
 
-    if not any(tag in difficulty_tags for tag in recipe_tags):
+    if not any(tag in DIFFICULTY_TAGS for tag in recipe_tags):
         warnings.append("No difficulty tag found")
 
-    if not any(tag in time_tags for tag in recipe_tags):
+    if not any(tag in TIME_TAGS for tag in recipe_tags):
         warnings.append("No time duration tag found")
 
     # Return success (warnings are informational only)
@@ -139,6 +159,38 @@ def validate_recipe(recipe_json: dict, available_tags: list) -> Tuple[bool, str]
 
     return True, "Valid"
 
+def check_recipe_quality(recipe_json: dict, check_nutrition: bool = True) -> List[str]:
+    """
+    Heuristics for valid but suspiciously thin recipes
+
+    Args:
+        recipe_json: Recipe that already passed validate_recipe
+        check_nutrition: Flag missing nutrition (off when it is computed locally,
+            since another model tier would not change it)
+
+    Returns:
+        list: Human-readable issues (empty when the recipe looks complete)
+    """
+    issues = []
+
+    steps = len(recipe_json.get('instructions', []))
+    if steps < QUALITY_MIN_STEPS:
+        issues.append(f"only {steps} instruction steps")
+
+    ingredients = recipe_json.get('ingredients', [])
+    if len(ingredients) < QUALITY_MIN_INGREDIENTS:
+        issues.append(f"only {len(ingredients)} ingredients")
+
+    missing = [ing['name'] for ing in ingredients
+               if not ing.get('quantity') and ing.get('unit') not in UNQUANTIFIED_UNITS]
+    if missing:
+        issues.append(f"no quantity for {', '.join(missing)}")
+
+    if check_nutrition and not recipe_json.get('nutrition', {}).get('calories'):
+        issues.append("missing nutrition")
+
+    return issues
+
 def validate_batch(recipes: list, available_tags: list) -> Tuple[list, list]:
     """
     Validate multiple recipes
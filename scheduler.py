@@ -0,0 +1,161 @@
+"""
+Scheduler Module
+Priority + shortest-job-first ordering of extraction jobs, with aging against starvation
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import SCHEDULER_AGING_SECONDS, SCHEDULER_DEFAULT_COST, SCHEDULER_COST_PER_VIDEO_MINUTE
+from transcripts import find_transcript, probe_duration
+
+# Priority classes (lower is served first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 2
+PRIORITY_BULK = 3
+
+PRIORITY_NAMES = {
+    "interactive": PRIORITY_INTERACTIVE,
+    "high": PRIORITY_HIGH,
+    "normal": PRIORITY_NORMAL,
+    "bulk": PRIORITY_BULK
+}
+
+# Upper bounds (seconds) of the video length buckets used for latency history
+LENGTH_BUCKETS = (300, 900, 1800)
+
+
+class _Entry:
+    __slots__ = ("item", "priority", "cost", "seq", "enqueued", "taken")
+
+    def __init__(self, item: Any, priority: int, cost: float, seq: int, enqueued: float):
+        self.item = item
+        self.priority = priority
+        self.cost = cost
+        self.seq = seq
+        self.enqueued = enqueued
+        self.taken = False
+
+
+class JobScheduler:
+    """
+    Thread-safe priority queue with shortest-job-first order inside a class.
+
+    Each priority class keeps a heap by estimated cost (SJF minimises the
+    mean completion time) and an arrival-order queue. Waiting promotes an
+    item by one class per aging_seconds, and once the oldest item of a
+    class has waited that long it is served before cheaper ones, so
+    expensive and low-priority jobs cannot starve. Aging never lifts a
+    job above PRIORITY_HIGH: interactive submissions always go first.
+    """
+
+    def __init__(self, aging_seconds: float = SCHEDULER_AGING_SECONDS, clock: Callable = time.monotonic):
+        self.aging_seconds = aging_seconds
+        self.clock = clock
+        self._heaps: Dict[int, List] = {}
+        self._arrivals: Dict[int, deque] = {}
+        self._counts: Dict[int, int] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any, priority: int = PRIORITY_NORMAL, cost: float = SCHEDULER_DEFAULT_COST):
+        """Queue an item with its priority class and estimated cost (e.g. seconds)"""
+        with self._lock:
+            entry = _Entry(item, priority, cost, next(self._seq), self.clock())
+            heapq.heappush(self._heaps.setdefault(priority, []), (cost, entry.seq, entry))
+            self._arrivals.setdefault(priority, deque()).append(entry)
+            self._counts[priority] = self._counts.get(priority, 0) + 1
+
+    def pop(self) -> Optional[Any]:
+        """Remove and return the next item, or None when the scheduler is empty"""
+        with self._lock:
+            now = self.clock()
+            best_key, best = None, None
+
+            for priority, heap in self._heaps.items():
+                arrivals = self._arrivals[priority]
+                while heap and heap[0][2].taken:
+                    heapq.heappop(heap)
+                while arrivals and arrivals[0].taken:
+                    arrivals.popleft()
+                if not heap:
+                    continue
+
+                oldest = arrivals[0]
+                levels = int((now - oldest.enqueued) // self.aging_seconds) if self.aging_seconds else 0
+                candidate = oldest if levels else heap[0][2]
+                floor = PRIORITY_INTERACTIVE if priority == PRIORITY_INTERACTIVE else PRIORITY_HIGH
+                key = (max(floor, priority - levels), -levels, candidate.cost, candidate.seq)
+
+                if best_key is None or key < best_key:
+                    best_key, best = key, candidate
+
+            if best is None:
+                return None
+
+            best.taken = True
+            self._counts[best.priority] -= 1
+            return best.item
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+    def counts(self) -> Dict[str, int]:
+        """Queued items per priority name"""
+        with self._lock:
+            return {name: self._counts.get(priority, 0) for name, priority in PRIORITY_NAMES.items()}
+
+
+class CostEstimator:
+    """
+    Expected extraction latency of a video, for shortest-job-first ordering.
+
+    Video length comes from the local transcript when there is one (cached
+    per video ID). Observed latencies are averaged per length bucket; until
+    a bucket has history, the estimate grows with the video length, and
+    videos of unknown length get the overall average.
+    """
+
+    def __init__(self, transcript_dir=None):
+        self.transcript_dir = transcript_dir
+        self.durations: Dict[str, Optional[float]] = {}
+        self._history: Dict[Optional[int], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def duration(self, video_id: str) -> Optional[float]:
+        """Video length in seconds, or None when unknown"""
+        if video_id not in self.durations:
+            path = find_transcript(video_id, self.transcript_dir) if self.transcript_dir else None
+            self.durations[video_id] = probe_duration(path) if path else None
+        return self.durations[video_id]
+
+    @staticmethod
+    def _bucket(duration: Optional[float]) -> Optional[int]:
+        if duration is None:
+            return None
+        return next((i for i, limit in enumerate(LENGTH_BUCKETS) if duration <= limit), len(LENGTH_BUCKETS))
+
+    def estimate(self, video_id: str) -> float:
+        duration = self.duration(video_id)
+        with self._lock:
+            total, count = self._history.get(self._bucket(duration), (0.0, 0))
+            if count:
+                return total / count
+            if duration is not None:
+                return SCHEDULER_DEFAULT_COST + duration / 60 * SCHEDULER_COST_PER_VIDEO_MINUTE
+            total = sum(value[0] for value in self._history.values())
+            count = sum(value[1] for value in self._history.values())
+            return total / count if count else SCHEDULER_DEFAULT_COST
+
+    def observe(self, video_id: str, elapsed: float):
+        """Add the measured latency of a finished video to its bucket"""
+        bucket = self._bucket(self.duration(video_id))
+        with self._lock:
+            total, count = self._history.get(bucket, (0.0, 0))
+            self._history[bucket] = (total + elapsed, count + 1)
@@ -0,0 +1,471 @@
+"""
+YouTube Recipe Generator - HTTP Service
+Local asyncio HTTP service with a bounded, prioritised job queue (no tkinter, no extra dependencies)
+
+Endpoints:
+    POST /jobs                 {"urls": [...], "tags": [...], "priority": "normal"} -> 202 {"jobId": ...}
+                               URLs may also be {"url": ..., "priority": ..., "durationSeconds": ...}
+                               429 when the queue cannot take the batch yet,
+                               413 when the batch is larger than the whole queue
+    GET  /jobs/<id>            job status and counters
+    GET  /jobs/<id>/results    results streamed as NDJSON as they complete
+    GET  /health               queue depth (total and per priority) and the adaptive concurrency limit
+
+Usage:
+    python service.py --port 8765 --workers 4 --max-workers 16 --queue-size 200
+    python service.py --fake-backend      # local testing without Gemini
+    python service.py --transcripts subs/ --tiers fast,strong
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from config import AVAILABLE_TAGS, CONCURRENCY_MAX, MODEL_TIERS, TRANSCRIPT_DIR, load_api_key, select_tiers
+from concurrency import AdaptiveLimiter, should_retry
+from gemini_service import call_gemini_api, extract_video_id
+from recipe_model import Recipe
+from recipe_pipeline import process_url, ExtractionResult, RESULT_ACCEPTED, RESULT_NEEDS_REVIEW
+from scheduler import JobScheduler, CostEstimator, PRIORITY_NAMES, PRIORITY_NORMAL
+
+# Finished jobs kept in memory for polling
+MAX_RETAINED_JOBS = 1000
+
+# Largest request body accepted (bytes)
+MAX_BODY_SIZE = 10 * 1024 * 1024
+
+# Seconds clients are asked to wait after a 429
+RETRY_AFTER_SECONDS = 5
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+
+HTTP_REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error"
+}
+
+
+def result_to_dict(result: ExtractionResult) -> Dict:
+    """
+    Pipeline result for the HTTP API
+
+    Kept recipes are held as compact Recipe objects until they are streamed,
+    since finished jobs stay in memory for polling.
+    """
+    recipe = result.recipe
+    if result.status in (RESULT_ACCEPTED, RESULT_NEEDS_REVIEW):
+        recipe = Recipe.from_dict(recipe)
+    return {
+        "videoId": result.video_id,
+        "url": result.url,
+        "status": result.status,
+        "recipe": recipe,
+        "message": result.message,
+        "source": result.source,
+        "tier": result.tier,
+        "elapsedMs": round(result.elapsed * 1000)
+    }
+
+
+class Job:
+    """A submitted batch of URLs and the results produced so far"""
+
+    def __init__(self, urls: List[str], available_tags: list):
+        self.job_id = uuid.uuid4().hex
+        self.urls = urls
+        self.available_tags = available_tags
+        self.results: List[Dict] = []
+        self.throttle_retries: Counter = Counter()
+        # Set when a worker takes the first URL off the queue
+        self.started = False
+        self.created_at = time.time()
+        self.changed = asyncio.Condition()
+
+    @property
+    def status(self) -> str:
+        if len(self.results) == len(self.urls):
+            return JOB_DONE
+        return JOB_RUNNING if self.started or self.results else JOB_QUEUED
+
+    async def add_result(self, result: Dict):
+        async with self.changed:
+            self.results.append(result)
+            self.changed.notify_all()
+
+    def summary(self) -> Dict:
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return {
+            "jobId": self.job_id,
+            "status": self.status,
+            "total": len(self.urls),
+            "completed": len(self.results),
+            "counts": counts
+        }
+
+
+class RecipeService:
+    """
+    Async extraction pipeline behind the HTTP API.
+
+    Submitted URLs go into a bounded JobScheduler drained by a pool of
+    workers, highest priority first and shortest expected job first
+    within a priority; the blocking Gemini call and validation run in a
+    thread pool. How many workers may extract at once is set by an
+    AdaptiveLimiter, starting at `workers` and adapted between 1 and
+    `max_workers` from latency and throttling. A batch that does not fit
+    into the queue is refused as a whole, which the HTTP layer turns into
+    a 429 (backpressure); a batch larger than the whole queue could never
+    fit and is rejected with a 413 instead. Like the CLI, extraction uses
+    local transcripts from `transcript_dir` when present and cascades
+    through `tiers`.
+    """
+
+    def __init__(self, api_key: str, extract_fn: Callable = call_gemini_api,
+                 workers: int = 4, queue_size: int = 200, max_workers: Optional[int] = CONCURRENCY_MAX,
+                 transcript_dir=None, tiers: Optional[List[Dict]] = None):
+        self.api_key = api_key
+        self.extract_fn = extract_fn
+        self.queue_size = queue_size
+        self.transcript_dir = transcript_dir
+        self.tiers = tiers
+        self.scheduler = JobScheduler()
+        self.estimator = CostEstimator(transcript_dir)
+        # max_workers=None keeps `workers` fixed
+        self.limiter = AdaptiveLimiter(workers, max_limit=max_workers or workers, adaptive=max_workers is not None)
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._ready: Optional[asyncio.Semaphore] = None
+        self._capacity: Optional[asyncio.Condition] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        # Counts queued items; created here so it belongs to the running loop
+        self._ready = asyncio.Semaphore(0)
+        self._capacity = asyncio.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=self.limiter.max_limit)
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.limiter.max_limit)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+    def submit(self, urls: List[str], available_tags: list,
+               priorities: Optional[List[int]] = None) -> Optional[Job]:
+        """
+        Queue a batch of URLs
+
+        Args:
+            urls: Valid YouTube URLs
+            available_tags: Tags the model may choose from
+            priorities: Priority class of each URL (default: PRIORITY_NORMAL)
+
+        Returns:
+            Job, or None when the queue has no room for the whole batch yet
+
+        Raises:
+            ValueError: The batch has more URLs than the queue can ever hold
+        """
+        if len(urls) > self.queue_size:
+            raise ValueError(f"Batch of {len(urls)} URLs exceeds the queue size of {self.queue_size}, "
+                             f"split it into smaller batches")
+        if self.queue_size - len(self.scheduler) < len(urls):
+            return None
+
+        job = Job(urls, available_tags)
+        for url, priority in zip(urls, priorities or [PRIORITY_NORMAL] * len(urls)):
+            cost = self.estimator.estimate(extract_video_id(url))
+            self.scheduler.submit((job, url, priority), priority, cost)
+            self._ready.release()
+
+        self.jobs[job.job_id] = job
+        self._evict_finished()
+        return job
+
+    def _evict_finished(self):
+        """Forget the oldest finished jobs beyond MAX_RETAINED_JOBS (live jobs are always kept)"""
+        excess = len(self.jobs) - MAX_RETAINED_JOBS
+        if excess <= 0:
+            return
+        finished = [job_id for job_id, job in self.jobs.items() if job.status == JOB_DONE]
+        for job_id in finished[:excess]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            await self._ready.acquire()
+            async with self._capacity:
+                await self._capacity.wait_for(lambda: self.limiter.available() > 0)
+                token = self.limiter.acquire()
+            item = self.scheduler.pop()
+            job, url, priority = item
+            job.started = True
+            released = False
+            try:
+                expected = self.estimator.estimate(extract_video_id(url))
+                result = await loop.run_in_executor(
+                    self._executor, partial(process_url, url, job.available_tags, self.api_key, self.extract_fn,
+                                            self.transcript_dir, self.tiers)
+                )
+                self.limiter.release_result(token, result, expected)
+                released = True
+                if should_retry(result, job.throttle_retries[url]):
+                    # Rate limited, not broken: queue it again behind the limiter's backoff
+                    job.throttle_retries[url] += 1
+                    self.scheduler.submit(item, priority, expected)
+                    self._ready.release()
+                    continue
+                self.estimator.observe(result.video_id, result.elapsed)
+                await job.add_result(result_to_dict(result))
+            except Exception as e:
+                if not released:
+                    self.limiter.release(token, 0.0, error=True)
+                await job.add_result({"url": url, "status": "error", "message": str(e)})
+            finally:
+                # A finished call frees a slot and may have raised the limit
+                async with self._capacity:
+                    self._capacity.notify_all()
+
+
+class HttpServer:
+    """Minimal HTTP/1.1 front-end (one request per connection)"""
+
+    def __init__(self, service: RecipeService):
+        self.service = service
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            if not request_line:
+                return
+            method, path, _ = request_line.split(" ", 2)
+
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_SIZE:
+                await self._send_json(writer, 413, {"error": "Request body too large"})
+                return
+            body = await reader.readexactly(length) if length else b""
+
+            await self.route(method, path, body, writer)
+        except (ValueError, asyncio.IncompleteReadError):
+            await self._send_json(writer, 400, {"error": "Malformed request"})
+        except Exception as e:
+            await self._send_json(writer, 500, {"error": str(e)})
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+            except ConnectionError:
+                pass
+
+    async def route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+
+        if parts == ["health"] and method == "GET":
+            await self._send_json(writer, 200, {
+                "queued": len(self.service.scheduler),
+                "queuedByPriority": self.service.scheduler.counts(),
+                "capacity": self.service.queue_size,
+                "concurrency": self.service.limiter.snapshot()
+            })
+        elif parts == ["jobs"] and method == "POST":
+            await self._submit(body, writer)
+        elif len(parts) in (2, 3) and parts[0] == "jobs" and method == "GET":
+            job = self.service.jobs.get(parts[1])
+            if job is None:
+                await self._send_json(writer, 404, {"error": "Unknown job"})
+            elif len(parts) == 2:
+                await self._send_json(writer, 200, job.summary())
+            elif parts[2] == "results":
+                await self._stream_results(job, writer)
+            else:
+                await self._send_json(writer, 404, {"error": "Not found"})
+        elif parts in (["health"], ["jobs"]) or (parts and parts[0] == "jobs"):
+            await self._send_json(writer, 405, {"error": "Method not allowed"})
+        else:
+            await self._send_json(writer, 404, {"error": "Not found"})
+
+    async def _submit(self, body: bytes, writer: asyncio.StreamWriter):
+        try:
+            payload = json.loads(body or b"{}")
+            urls = payload["urls"]
+            if not isinstance(urls, list):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            await self._send_json(writer, 400, {"error": 'Expected JSON body {"urls": [...]}'})
+            return
+
+        batch_priority = payload.get("priority", "normal")
+        if not isinstance(batch_priority, str) or batch_priority not in PRIORITY_NAMES:
+            await self._send_json(writer, 400, {"error": f"Unknown priority, expected one of {list(PRIORITY_NAMES)}"})
+            return
+
+        available_tags = payload.get("tags") or AVAILABLE_TAGS
+        valid_urls, priorities, invalid_urls = [], [], []
+        for entry in urls:
+            # Either a plain URL or {"url": ..., "priority": ..., "durationSeconds": ...}
+            url, priority, duration = entry, batch_priority, None
+            if isinstance(entry, dict):
+                url = entry.get("url")
+                priority = entry.get("priority", batch_priority)
+                duration = entry.get("durationSeconds")
+
+            try:
+                video_id = extract_video_id(url)
+            except (ValueError, TypeError):
+                video_id = None
+            if video_id is None or not isinstance(priority, str) or priority not in PRIORITY_NAMES:
+                invalid_urls.append(entry)
+                continue
+            if isinstance(duration, (int, float)):
+                self.service.estimator.durations.setdefault(video_id, float(duration))
+            valid_urls.append(url)
+            priorities.append(PRIORITY_NAMES[priority])
+
+        if not valid_urls:
+            await self._send_json(writer, 400, {"error": "No valid YouTube URLs", "invalid": invalid_urls})
+            return
+
+        try:
+            job = self.service.submit(valid_urls, available_tags, priorities)
+        except ValueError as e:
+            await self._send_json(writer, 413, {"error": str(e), "capacity": self.service.queue_size})
+            return
+        if job is None:
+            await self._send_json(writer, 429, {"error": "Queue full, retry later"},
+                                  extra_headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+            return
+
+        await self._send_json(writer, 202, {
+            "jobId": job.job_id,
+            "accepted": len(valid_urls),
+            "invalid": invalid_urls
+        })
+
+    async def _stream_results(self, job: Job, writer: asyncio.StreamWriter):
+        """Send results as NDJSON with chunked encoding, as soon as each one completes"""
+        writer.write(self._head(200, {
+            "Content-Type": "application/x-ndjson; charset=utf-8",
+            "Transfer-Encoding": "chunked"
+        }))
+
+        sent = 0
+        while True:
+            async with job.changed:
+                await job.changed.wait_for(lambda: len(job.results) > sent or job.status == JOB_DONE)
+                pending = job.results[sent:]
+
+            for result in pending:
+                line = json.dumps(result, ensure_ascii=False, default=Recipe.to_dict).encode("utf-8") + b"\n"
+                writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            sent += len(pending)
+            await writer.drain()
+
+            if sent == len(job.urls):
+                break
+
+        writer.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _head(status: int, headers: Dict) -> bytes:
+        lines = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append("Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Dict,
+                         extra_headers: Optional[Dict] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json; charset=utf-8", "Content-Length": str(len(body))}
+        headers.update(extra_headers or {})
+        writer.write(self._head(status, headers) + body)
+
+
+async def serve(host: str, port: int, service: RecipeService):
+    """Run the HTTP service until cancelled"""
+    service.start()
+    http = HttpServer(service)
+    server = await asyncio.start_server(http.handle_connection, host, port)
+    print(f"Recipe service listening on http://{host}:{port}", file=sys.stderr, flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local HTTP service for recipe extraction")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Concurrent extractions at the start, adapted to latency and throttling (default: 4)")
+    parser.add_argument("--max-workers", type=int, default=CONCURRENCY_MAX,
+                        help=f"Upper bound of the adaptive concurrency (default: {CONCURRENCY_MAX})")
+    parser.add_argument("--fixed-workers", action="store_true", help="Keep --workers fixed instead of adapting it")
+    parser.add_argument("--queue-size", type=int, default=200,
+                        help="Maximum queued URLs before clients get 429 (default: 200)")
+    parser.add_argument("--api-key", default=None,
+                        help="Gemini API key (default: GEMINI_API_KEY or the saved .env key)")
+    parser.add_argument("--transcripts", default=str(TRANSCRIPT_DIR),
+                        help="Directory with <video_id>.vtt/.srt/.txt transcripts used instead of video analysis "
+                             f"(default: {TRANSCRIPT_DIR})")
+    parser.add_argument("--tiers", default=None,
+                        help="Comma separated model tiers to cascade through "
+                             f"(default: {','.join(tier['name'] for tier in MODEL_TIERS)})")
+    parser.add_argument("--fake-backend", action="store_true",
+                        help="Use the deterministic local fake instead of Gemini")
+    args = parser.parse_args(argv)
+
+    try:
+        tiers = select_tiers(args.tiers)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    transcript_dir = args.transcripts if args.transcripts and os.path.isdir(args.transcripts) else None
+
+    if args.fake_backend:
+        from fake_backend import fake_call_gemini_api
+        extract_fn, api_key = fake_call_gemini_api, "fake"
+    else:
+        extract_fn = call_gemini_api
+        api_key = args.api_key or os.getenv("GEMINI_API_KEY") or load_api_key()
+        if not api_key:
+            print("Error: no Gemini API key (use --api-key or GEMINI_API_KEY)", file=sys.stderr)
+            return 1
+
+    service = RecipeService(api_key, extract_fn, workers=args.workers, queue_size=args.queue_size,
+                            max_workers=None if args.fixed_workers else args.max_workers,
+                            transcript_dir=transcript_dir, tiers=tiers)
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
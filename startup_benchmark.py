@@ -0,0 +1,168 @@
+"""
+Startup Benchmark
+Measures cold start of the GUI and the CLI in fresh interpreters and fails on regressions
+
+Usage:
+    python startup_benchmark.py                 # 5 runs per measurement, exit code 1 on regression
+    python startup_benchmark.py --repeat 10 --json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+BASE_DIR = Path(__file__).parent
+
+# Median limits in seconds, measured from process spawn
+THRESHOLDS = {
+    "gui_import": 0.5,
+    "time_to_window": 1.5,
+    "cli_import": 0.5,
+    "time_to_first_request": 3.0
+}
+
+# Measurements that must run everywhere; the GUI window needs a display and may be skipped
+REQUIRED = {"gui_import", "cli_import", "time_to_first_request"}
+
+# Modules that must not be loaded before the first request
+HEAVY_MODULES = ["google.generativeai", "jsonschema", "pyarrow", "zstandard", "numpy"]
+
+READY = "__ready__"
+
+GUI_IMPORT = f"""
+import sys, main, cli
+print({READY!r}, [m for m in {HEAVY_MODULES!r} if m in sys.modules], flush=True)
+"""
+
+CLI_IMPORT = f"""
+import sys, cli
+print({READY!r}, [m for m in {HEAVY_MODULES!r} if m in sys.modules], flush=True)
+"""
+
+TIME_TO_WINDOW = f"""
+import tkinter as tk
+import main
+root = tk.Tk()
+app = main.YouTubeRecipeGeneratorApp(root)
+root.update()
+print({READY!r}, flush=True)
+root.destroy()
+"""
+
+# Runs the real CLI path up to the point where the Gemini SDK is loaded and
+# the first request would go out, then exits
+TIME_TO_FIRST_REQUEST = f"""
+import os, sys
+import cli
+
+def first_request(video_url, available_tags, api_key, **kwargs):
+    try:
+        import google.generativeai
+    except ImportError:
+        pass
+    print({READY!r}, flush=True)
+    os._exit(0)
+
+cli.call_gemini_api = first_request
+cli.main(sys.argv[1:])
+"""
+
+
+def measure(code: str, args=()) -> Optional[float]:
+    """
+    Run code in a fresh interpreter and time spawn -> READY line
+
+    Returns:
+        float: Seconds, or None when the child exited without reaching READY
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code, *args], cwd=BASE_DIR,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    for line in process.stdout:
+        if line.startswith(READY):
+            elapsed = time.perf_counter() - start
+            loaded = line[len(READY):].strip()
+            process.communicate()
+            if loaded not in ("", "[]"):
+                raise RuntimeError(f"Heavy modules loaded at startup: {loaded}")
+            return elapsed
+    process.wait()
+    return None
+
+
+def run_benchmark(repeat: int) -> Dict[str, Optional[float]]:
+    """Median start-up timings in seconds (None when a measurement cannot run here)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        urls_file = Path(tmp) / "urls.txt"
+        urls_file.write_text("https://www.youtube.com/watch?v=dQw4w9WgXcQ\n", encoding="utf-8")
+        cli_args = [
+            "--input", str(urls_file), "--api-key", "benchmark", "--concurrency", "1",
+            "--store", str(Path(tmp) / "recipes.db"), "--journal", str(Path(tmp) / "journal.jsonl"),
+            "--no-transcript", "reject"
+        ]
+
+        # Warm the filesystem cache and __pycache__ once so runs are comparable
+        measure(GUI_IMPORT)
+
+        cases = {
+            "gui_import": (GUI_IMPORT, []),
+            "time_to_window": (TIME_TO_WINDOW, []),
+            "cli_import": (CLI_IMPORT, []),
+            "time_to_first_request": (TIME_TO_FIRST_REQUEST, cli_args)
+        }
+
+        results = {}
+        for name, (code, args) in cases.items():
+            timings = []
+            for _ in range(repeat):
+                elapsed = measure(code, args)
+                if elapsed is None:
+                    break
+                timings.append(elapsed)
+            results[name] = statistics.median(timings) if timings else None
+        return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold start benchmark for the GUI and CLI")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        results = run_benchmark(max(1, args.repeat))
+    except RuntimeError as e:
+        print(f"FAIL: {e}", file=sys.stderr)
+        return 1
+
+    regressions = [name for name, value in results.items()
+                   if value is not None and value > THRESHOLDS[name]]
+    # A required measurement that never reached READY means the probe itself is broken
+    missing = [name for name, value in results.items() if value is None and name in REQUIRED]
+
+    if args.json:
+        print(json.dumps({"results": results, "thresholds": THRESHOLDS, "regressions": regressions,
+                          "missing": missing}))
+    else:
+        for name, value in results.items():
+            if value is None and name in missing:
+                print(f"{name:<24} FAIL (never reached {READY})")
+            elif value is None:
+                print(f"{name:<24} skipped (not available in this environment)")
+            else:
+                status = "FAIL" if name in regressions else "ok"
+                print(f"{name:<24} {value * 1000:8.1f} ms   (limit {THRESHOLDS[name] * 1000:.0f} ms)  {status}")
+
+    return 1 if regressions or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Checkpoint journal: per-batch files, recipes kept on disk and the cli runner's use of it"""
+
+import json
+
+import cli
+from batch_journal import (
+    BatchJournal,
+    batch_journal_path,
+    latest_batch_journal,
+    STATUS_DEFERRED,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_PENDING
+)
+
+URLS = [f"https://www.youtube.com/watch?v=jnl{i:08d}" for i in range(3)]
+
+
+def run_cli(tmp_path, *extra):
+    input_path = tmp_path / "urls.txt"
+    input_path.write_text("\n".join(URLS) + "\n", encoding="utf-8")
+    return cli.main([
+        "--input", str(input_path), "--fake-backend", "--no-transcript", "accept",
+        "--store", str(tmp_path / "recipes.db"), "--journal", str(tmp_path / "journal.jsonl"),
+        "--rejects", str(tmp_path / "rejects.txt"), "--transcripts", str(tmp_path / "none"),
+        *extra
+    ])
+
+
+def test_batches_get_their_own_journal(tmp_path):
+    assert latest_batch_journal(tmp_path) is None
+
+    old = BatchJournal(batch_journal_path(tmp_path, "20260101_090000"))
+    old.start(URLS[:1], ["a"])
+    new = BatchJournal(batch_journal_path(tmp_path, "20260101_100000"))
+    new.start(URLS[1:2], ["b"])
+
+    # A review of the old batch resolved after the new batch started
+    old.record("a", URLS[0], STATUS_DONE)
+
+    assert latest_batch_journal(tmp_path) == new.path
+    reloaded = BatchJournal(new.path)
+    reloaded.load()
+    assert reloaded.status("a") is None
+    assert reloaded.status("b") == STATUS_PENDING
+
+
+def test_cli_refuses_to_wipe_an_unfinished_run(tmp_path):
+    journal = BatchJournal(tmp_path / "journal.jsonl")
+    journal.start([], [])
+    journal.record("jnl00000000", URLS[0], STATUS_DONE)
+
+    assert run_cli(tmp_path) == 1
+    assert BatchJournal(journal.path).unfinished()
+
+    assert run_cli(tmp_path, "--resume") == 0
+    assert not BatchJournal(journal.path).unfinished()
+
+    # A finished run may be started over without --fresh
+    assert run_cli(tmp_path) == 0
+
+
+def test_cli_survives_a_failing_video(tmp_path, monkeypatch):
+    process_url = cli.process_url
+
+    def flaky_process_url(url, *args, **kwargs):
+        if url == URLS[1]:
+            raise ImportError("Local nutrition requires numpy")
+        return process_url(url, *args, **kwargs)
+
+    monkeypatch.setattr(cli, "process_url", flaky_process_url)
+    assert run_cli(tmp_path) == 0
+
+    journal = BatchJournal(tmp_path / "journal.jsonl")
+    journal.load()
+    assert [journal.status(url[-11:]) for url in URLS] == [STATUS_DONE, STATUS_FAILED, STATUS_DONE]
+
+
+def test_cli_fresh_discards_an_unfinished_run(tmp_path):
+    journal = BatchJournal(tmp_path / "journal.jsonl")
+    journal.start([], [])
+    journal.record("jnl00000000", URLS[0], STATUS_DONE)
+
+    assert run_cli(tmp_path, "--fresh") == 0
+    journal.load()
+    assert all(journal.status(url[-11:]) == STATUS_DONE for url in URLS)
+
+
+def test_recipes_stay_on_disk(tmp_path):
+    journal = BatchJournal(tmp_path / "journal.jsonl")
+    journal.start(URLS, ["a", "b", "c"])
+    journal.record("a", URLS[0], STATUS_DONE, recipe={"recipeId": "r-a", "title": "Prima"})
+    journal.record("b", URLS[1], STATUS_DEFERRED, recipe={"recipeId": "r-b", "title": "A doua"})
+    journal.record("a", URLS[0], STATUS_DONE, recipe={"recipeId": "r-a", "title": "Prima, refăcută"})
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"videoId": "c", "url": "torn')
+
+    resumed = BatchJournal(journal.path)
+    resumed.start([], [], resume=True)
+    assert all(len(entry) == 3 for entry in resumed.load().values())
+    assert [recipe["title"] for recipe in resumed.completed_recipes()] == ["Prima, refăcută"]
+    assert [(video_id, recipe["title"]) for video_id, _, recipe in resumed.deferred_entries()] == [("b", "A doua")]
+    assert resumed.unfinished_urls() == [URLS[2]]
+
+    # The torn line was cut off, so the next entry is readable
+    resumed.record("c", URLS[2], STATUS_DONE, recipe={"recipeId": "r-c", "title": "A treia"})
+    assert [recipe["title"] for recipe in resumed.completed_recipes()] == ["Prima, refăcută", "A treia"]
+
+
+def test_cli_resume_keeps_exported_recipes(tmp_path):
+    urls = [f"https://www.youtube.com/watch?v=exp{i:08d}" for i in range(12)]
+    input_path = tmp_path / "urls.txt"
+    input_path.write_text("\n".join(urls) + "\n", encoding="utf-8")
+    journal_path = tmp_path / "journal.jsonl"
+    output = tmp_path / "out.jsonl"
+    argv = ["--input", str(input_path), "--fake-backend", "--no-transcript", "accept",
+            "--journal", str(journal_path), "--rejects", str(tmp_path / "rejects.txt"),
+            "--transcripts", str(tmp_path / "none"), "-o", str(output)]
+    assert cli.main(argv) == 0
+    assert len(output.read_text(encoding="utf-8").splitlines()) == 12
+
+    # Interrupted after 7 videos
+    journal_path.write_text("".join(journal_path.read_text(encoding="utf-8").splitlines(True)[:7]),
+                            encoding="utf-8")
+    assert cli.main(argv + ["--resume"]) == 0
+
+    recipe_ids = [json.loads(line)["recipeId"] for line in output.read_text(encoding="utf-8").splitlines()]
+    assert len(recipe_ids) == len(set(recipe_ids)) == 12
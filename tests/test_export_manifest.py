@@ -0,0 +1,53 @@
+"""Delta exports: a re-extracted, unchanged video is not exported again"""
+
+import json
+import sys
+import types
+
+from config import AVAILABLE_TAGS
+from export_manifest import ExportManifest
+from fake_backend import fake_call_gemini_api
+from gemini_service import call_gemini_api
+
+VIDEO_URLS = ["https://www.youtube.com/watch?v=dlt00000001", "https://youtu.be/dlt00000001"]
+
+
+def fake_genai(monkeypatch, answer):
+    """Install a stand-in google.generativeai whose model always returns `answer`"""
+    class Model:
+        def __init__(self, **kwargs):
+            pass
+
+        def generate_content(self, prompt):
+            return types.SimpleNamespace(text=json.dumps(answer), usage_metadata=None)
+
+    genai = types.SimpleNamespace(configure=lambda api_key: None, GenerativeModel=Model)
+    google = types.ModuleType("google")
+    google.generativeai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+
+
+def test_reextracted_video_gives_empty_delta(tmp_path, monkeypatch):
+    # The compact prompt leaves recipeId and createdAt to be filled in
+    answer = fake_call_gemini_api(VIDEO_URLS[0], AVAILABLE_TAGS, "fake")
+    for field in ("recipeId", "createdAt"):
+        del answer[field]
+    fake_genai(monkeypatch, answer)
+
+    manifest_path = tmp_path / "manifest.json"
+    first = call_gemini_api(VIDEO_URLS[0], AVAILABLE_TAGS, "key")
+    manifest = ExportManifest(manifest_path)
+    assert [recipe["recipeId"] for recipe in manifest.changed([first])] == [first["recipeId"]]
+    manifest.save()
+
+    second = call_gemini_api(VIDEO_URLS[1], AVAILABLE_TAGS, "key")
+    assert second["recipeId"] == first["recipeId"]
+    manifest = ExportManifest(manifest_path)
+    assert list(manifest.changed([second])) == []
+    assert manifest.unchanged == 1
+
+
+def test_fake_backend_ids_follow_the_video():
+    recipes = [fake_call_gemini_api(url, AVAILABLE_TAGS, "fake") for url in VIDEO_URLS]
+    assert recipes[0]["recipeId"] == recipes[1]["recipeId"]
@@ -0,0 +1,47 @@
+"""Hedged requests: token accounting and concurrency slots of abandoned calls"""
+
+import threading
+import time
+
+from concurrency import AdaptiveLimiter
+from hedging import HedgedExtractor
+
+
+def test_hedge_counts_all_tokens_and_holds_the_primary_slot():
+    release_primary = threading.Event()
+    calls = []
+    lock = threading.Lock()
+
+    def backend(video_url, available_tags, api_key, usage=None, **kwargs):
+        with lock:
+            calls.append(video_url)
+            primary = len(calls) == 1
+        if primary:
+            release_primary.wait(5)
+        usage["prompt_tokens"] = 100
+        usage["output_tokens"] = 10
+        return {"title": "primary" if primary else "hedge"}
+
+    limiter = AdaptiveLimiter(2, max_limit=2, adaptive=False)
+    hedger = HedgedExtractor(backend, q=0.5, budget=1.0, limiter=limiter)
+    tracker = hedger._tracker(None)
+    for _ in range(tracker.min_samples):
+        tracker.record(0.01)
+
+    # What a runner does around one extraction
+    token = limiter.acquire()
+    usage = {"transcript_tokens": 7}
+    assert hedger("https://youtu.be/hdg00000001", [], "key", usage=usage) == {"title": "hedge"}
+    limiter.cancel(token)
+
+    # The losing primary is still in flight and billed like the winner
+    assert usage == {"transcript_tokens": 7, "prompt_tokens": 200, "output_tokens": 20}
+    assert limiter.in_flight == 1
+    assert hedger.hedges_won == 1
+
+    release_primary.set()
+    deadline = time.monotonic() + 5
+    while limiter.in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert limiter.in_flight == 0
+    assert len(hedger.report()) == 2
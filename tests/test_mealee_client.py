@@ -0,0 +1,89 @@
+"""Mealee upload against the local stub server"""
+
+import random
+
+import pytest
+
+import mealee_client
+from mealee_client import MealeeClient
+from mealee_stub import run_stub, IMPORT_PATH
+
+
+def make_recipes(count, title="Rețetă"):
+    return [{"recipeId": f"recipe-{i:05d}", "title": f"{title} {i}"} for i in range(count)]
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    """Start a stub; returns a factory taking the stub options"""
+    monkeypatch.setattr(mealee_client, "RETRY_BACKOFF_SECONDS", 0.0)
+    servers = []
+
+    def start(**kwargs):
+        server, stub = run_stub(**kwargs)
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}{IMPORT_PATH}", stub
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_retries_after_503_converge(stub_server):
+    random.seed(7)
+    url, stub = stub_server(fail_rate=0.3)
+
+    with MealeeClient(url, chunk_size=25, parallel=4, max_retries=20) as client:
+        report = client.upload(make_recipes(500))
+
+    stats = stub.snapshot()
+    assert report.failed == []
+    assert report.recipes == 500
+    assert stats["injected_failures"] > 0
+    assert report.retries == stats["injected_failures"]
+    assert stats["recipes"] == 500
+
+
+def test_replayed_idempotency_key_creates_no_duplicates(stub_server):
+    random.seed(11)
+    url, stub = stub_server(drop_rate=0.3)
+
+    # A lost answer is retried with the same body and key, and answered from the replay cache
+    with MealeeClient(url, chunk_size=10, parallel=2, max_retries=5) as client:
+        report = client.upload(make_recipes(100))
+
+    stats = stub.snapshot()
+    assert report.failed == []
+    assert stats["dropped_answers"] > 0
+    assert stats["replayed"] == stats["dropped_answers"]
+    assert stats["imports"] == 10
+    assert stats["recipes"] == 100
+
+
+def test_edited_recipes_are_not_replayed(stub_server):
+    url, stub = stub_server()
+
+    with MealeeClient(url, chunk_size=10) as client:
+        client.upload(make_recipes(10))
+        client.upload(make_recipes(10, title="Editată"))
+
+    assert stub.snapshot()["replayed"] == 0
+    assert stub.recipes["recipe-00000"]["title"] == "Editată 0"
+    assert len(stub.recipes) == 10
+
+
+def test_rejected_chunk_fails_alone(stub_server):
+    url, stub = stub_server()
+    recipes = make_recipes(30)
+    recipes[12]["recipeId"] = 12345
+
+    with MealeeClient(url, chunk_size=10, parallel=3) as client:
+        report = client.upload(recipes)
+
+    assert len(report.failed) == 1
+    assert 12345 in report.failed[0].recipe_ids
+    assert "HTTP 422" in str(report.failed[0])
+    assert report.recipes == 20
+    assert report.retries == 0
+    assert len(stub.recipes) == 20
@@ -0,0 +1,33 @@
+"""Compact prompt: token budget, tag numbers and the nutrition section"""
+
+import gemini_service
+from config import AVAILABLE_TAGS
+from gemini_service import build_prompt
+from nutrition import NUTRITION_SOURCE_LOCAL, NUTRITION_SOURCE_MODEL
+from prompt_budget import PROMPT_TOKEN_BUDGET, SAMPLE_URL
+from prompt_compiler import PROMPT_STYLE_COMPACT, decode_tags
+from transcripts import estimate_tokens
+
+
+def test_compact_prompt_within_budget():
+    # prompt_budget.py checks the same budget with the model's exact token counter
+    prompt = build_prompt(SAMPLE_URL, AVAILABLE_TAGS, prompt_style=PROMPT_STYLE_COMPACT)
+    assert estimate_tokens(prompt) <= PROMPT_TOKEN_BUDGET
+
+
+def test_decode_tags():
+    tags = ["a", "b", "c"]
+    assert decode_tags([1, "3", " 2 "], tags) == ["a", "c", "b"]
+    assert decode_tags(["b", 0, 4, "9"], tags) == ["b", "0", "4", "9"]
+    assert decode_tags(None, tags) == []
+
+
+def test_nutrition_section_follows_nutrition_source(monkeypatch):
+    monkeypatch.setattr(gemini_service, "NUTRITION_SOURCE", NUTRITION_SOURCE_LOCAL)
+    local = build_prompt(SAMPLE_URL, AVAILABLE_TAGS, prompt_style=PROMPT_STYLE_COMPACT)
+    assert "nutrition" not in local
+
+    monkeypatch.setattr(gemini_service, "NUTRITION_SOURCE", NUTRITION_SOURCE_MODEL)
+    model = build_prompt(SAMPLE_URL, AVAILABLE_TAGS, prompt_style=PROMPT_STYLE_COMPACT)
+    assert "nutrition:" in model
+    assert estimate_tokens(model) > estimate_tokens(local)
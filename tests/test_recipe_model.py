@@ -0,0 +1,30 @@
+"""Recipe model: lossless round trip through the compact classes"""
+
+import json
+
+from config import AVAILABLE_TAGS
+from fake_backend import fake_call_gemini_api
+from recipe_model import Recipe
+
+
+def test_round_trip_keeps_every_key():
+    data = fake_call_gemini_api("https://www.youtube.com/watch?v=mdl00000001", AVAILABLE_TAGS, "fake")
+    data["ingredients"][0]["note"] = "cernută"
+    data["ingredients"][1] = {"unit": "buc", "name": "ouă", "quantity": None}
+    data["nutrition"] = {"fats": 10.0, "calories": 350.0, "healthScore": None, "fiber": 4.5}
+    data["sourceChannel"] = "Bucătăria de acasă"
+    data["isFavorite"] = None
+
+    recipe = Recipe.from_dict(data)
+    assert recipe.to_dict() == data
+    # Key order too, so exports of a round-tripped recipe are byte-identical
+    assert json.dumps(recipe.to_dict(), ensure_ascii=False) == json.dumps(data, ensure_ascii=False)
+
+
+def test_empty_nutrition_is_kept():
+    data = fake_call_gemini_api("https://www.youtube.com/watch?v=mdl00000002", AVAILABLE_TAGS, "fake")
+    data["nutrition"] = {}
+    assert Recipe.from_dict(data).to_dict() == data
+
+    del data["nutrition"]
+    assert Recipe.from_dict(data).to_dict() == data
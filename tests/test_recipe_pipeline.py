@@ -0,0 +1,31 @@
+"""Model cascade: which failures escalate to the next tier"""
+
+from config import AVAILABLE_TAGS, MODEL_TIERS
+from fake_backend import fake_call_gemini_api
+from gemini_service import InvalidResponseError
+from recipe_pipeline import process_url, OUTCOME_ACCEPTED, OUTCOME_ESCALATED, OUTCOME_FAILED, RESULT_ACCEPTED, RESULT_ERROR
+
+URL = "https://www.youtube.com/watch?v=ppl00000001"
+
+
+def test_malformed_json_escalates_to_the_next_tier():
+    def truncating_backend(video_url, *args, model_name=None, **kwargs):
+        if model_name == MODEL_TIERS[0]["model"]:
+            raise InvalidResponseError("Invalid JSON response from Gemini: Unterminated string")
+        return fake_call_gemini_api(video_url, *args, model_name=model_name, **kwargs)
+
+    result = process_url(URL, AVAILABLE_TAGS, "fake", truncating_backend)
+
+    assert result.status == RESULT_ACCEPTED
+    assert result.tier == MODEL_TIERS[1]["name"]
+    assert [attempt["outcome"] for attempt in result.attempts] == [OUTCOME_ESCALATED, OUTCOME_ACCEPTED]
+
+
+def test_api_errors_end_the_cascade():
+    def throttled_backend(*args, **kwargs):
+        raise Exception("Gemini API error: 429 Resource has been exhausted")
+
+    result = process_url(URL, AVAILABLE_TAGS, "fake", throttled_backend)
+
+    assert result.status == RESULT_ERROR
+    assert [attempt["outcome"] for attempt in result.attempts] == [OUTCOME_FAILED]
@@ -0,0 +1,45 @@
+"""Preview table: page-wise merging into the sorted view and row positions (no window needed)"""
+
+import random
+import types
+
+from recipe_preview import RecipePreviewWindow
+
+
+def headless_preview(sort_column=None, sort_reverse=False, needle=""):
+    """A preview with its view state only; the Tk widgets are never created"""
+    preview = RecipePreviewWindow.__new__(RecipePreviewWindow)
+    preview.rows, preview.view, preview.positions, preview.sort_keys = [], [], {}, []
+    preview.sort_column, preview.sort_reverse = sort_column, sort_reverse
+    preview.filter_var = types.SimpleNamespace(get=lambda: needle)
+    preview.update_status = lambda: None
+    return preview
+
+
+def load(preview, rows, page_size):
+    for start in range(0, len(rows), page_size):
+        preview.rows.extend(rows[start:start + page_size])
+        preview.merge_rows(start)
+
+
+def test_pages_merge_into_the_same_order_as_a_full_sort():
+    rng = random.Random(7)
+    rows = [(f"id{i}", f"Rețetă {rng.randrange(50)}", "dinner", "romanian", rng.randrange(120), "")
+            for i in range(1000)]
+
+    for field, reverse in ((1, False), (4, True)):
+        preview = headless_preview(field, reverse)
+        load(preview, rows, 64)
+        keys = [row[field] if field == 4 else row[field].casefold() for row in rows]
+        assert preview.view == sorted(range(len(rows)), key=keys.__getitem__, reverse=reverse)
+        assert all(preview.position_of(index) == position for position, index in enumerate(preview.view))
+
+
+def test_positions_follow_the_filter():
+    rows = [(f"id{i}", "Supă" if i % 3 == 0 else "Friptură", "", "", i, "") for i in range(30)]
+    preview = headless_preview(needle="supă")
+    load(preview, rows, 7)
+
+    assert preview.view == list(range(0, 30, 3))
+    assert preview.position_of(9) == 3
+    assert preview.position_of(10) is None
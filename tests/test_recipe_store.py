@@ -0,0 +1,69 @@
+"""Recipe store: one row per video, search and the cli query mode"""
+
+import json
+
+import cli
+from config import AVAILABLE_TAGS
+from fake_backend import fake_call_gemini_api
+from gemini_service import extract_video_id
+from recipe_store import RecipeStore
+
+URLS = [f"https://www.youtube.com/watch?v=sto{i:08d}" for i in range(3)]
+
+
+def extract(url):
+    return fake_call_gemini_api(url, AVAILABLE_TAGS, "fake")
+
+
+def test_reprocessed_video_updates_its_row(tmp_path):
+    store = RecipeStore(tmp_path / "recipes.db")
+    for url in URLS:
+        store.add(extract(url), video_id=extract_video_id(url), batch_id="first")
+
+    recipe = extract(URLS[0])
+    recipe["title"] = "Supă cremă de dovleac"
+    store.add(recipe, video_id=extract_video_id(URLS[0]), batch_id="second")
+
+    assert store.count() == len(URLS)
+    assert store.count("second") == 1
+    assert [found["recipeId"] for found in store.search(text="dovleac")] == [recipe["recipeId"]]
+    assert len(store.search(text="backend")) == len(URLS)
+    store.close()
+
+
+def test_duplicate_rows_from_older_stores_are_merged(tmp_path):
+    path = tmp_path / "recipes.db"
+    store = RecipeStore(path)
+    store._conn.executescript("DROP INDEX idx_recipes_video_unique")
+    for title in ("Prima variantă", "A doua variantă"):
+        recipe = extract(URLS[0])
+        # Random ids from before recipeIds were derived from the video
+        recipe["recipeId"] = f"legacy-{title}"
+        recipe["title"] = title
+        store._upsert(recipe, None, None)
+    store._conn.execute("UPDATE recipes SET video_id = ?", (extract_video_id(URLS[0]),))
+    store._conn.commit()
+    assert store.count() == 2
+    store.close()
+
+    store = RecipeStore(path)
+    assert store.count() == 1
+    assert [recipe["title"] for recipe in store.search(text="variantă")] == ["A doua variantă"]
+    store.close()
+
+
+def test_cli_search(tmp_path, capsys):
+    path = tmp_path / "recipes.db"
+    store = RecipeStore(path)
+    for url in URLS:
+        store.add(extract(url), video_id=extract_video_id(url))
+    store.close()
+
+    tag = extract(URLS[0])["tags"][0]
+    assert cli.main(["--store", str(path), "--tag", tag, "--cuisine", "romanian", "--limit", "2"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2
+    assert all(tag in json.loads(line)["tags"] for line in lines)
+
+    assert cli.main(["--store", str(path), "--cuisine", "italian"]) == 0
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,131 @@
+"""HTTP service on localhost with the fake backend"""
+
+import asyncio
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+import service
+from fake_backend import fake_call_gemini_api
+from recipe_pipeline import RESULT_ACCEPTED, RESULT_NEEDS_REVIEW
+from service import HttpServer, RecipeService
+
+URLS = [f"https://www.youtube.com/watch?v=svc{i:08d}" for i in range(6)]
+
+
+@pytest.fixture
+def running_service():
+    """RecipeService with one fixed worker and a queue of 2, whose calls wait for `gate`"""
+    gate = threading.Event()
+
+    def gated_backend(*args, **kwargs):
+        gate.wait(10)
+        return fake_call_gemini_api(*args, **kwargs)
+
+    recipe_service = RecipeService("fake", gated_backend, workers=1, queue_size=2, max_workers=None)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    state = {}
+
+    async def start():
+        recipe_service.start()
+        state["server"] = await asyncio.start_server(HttpServer(recipe_service).handle_connection, "127.0.0.1", 0)
+        state["port"] = state["server"].sockets[0].getsockname()[1]
+        ready.set()
+
+    thread = threading.Thread(target=lambda: (loop.run_until_complete(start()), loop.run_forever()), daemon=True)
+    thread.start()
+    assert ready.wait(5)
+
+    yield recipe_service, state["port"], gate
+
+    gate.set()
+
+    async def stop():
+        state["server"].close()
+        await recipe_service.stop()
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def request(port, method, path, payload=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else None
+    connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    return response, data
+
+
+def test_submit_backpressure_and_ndjson_stream(running_service):
+    recipe_service, port, gate = running_service
+
+    response, data = request(port, "POST", "/jobs", {"urls": URLS[:2]})
+    assert response.status == 202
+    job_id = json.loads(data)["jobId"]
+
+    # The worker holds at most one URL, so the queue has no room for two more
+    response, _ = request(port, "POST", "/jobs", {"urls": URLS[2:4]})
+    assert response.status == 429
+    assert response.getheader("Retry-After") == str(service.RETRY_AFTER_SECONDS)
+
+    # Larger than the whole queue: retrying would never help
+    response, data = request(port, "POST", "/jobs", {"urls": URLS[:3]})
+    assert response.status == 413
+    assert json.loads(data)["capacity"] == 2
+
+    gate.set()
+    response, data = request(port, "GET", f"/jobs/{job_id}/results")
+    assert response.status == 200
+    assert response.getheader("Content-Type").startswith("application/x-ndjson")
+    results = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+    assert sorted(result["url"] for result in results) == URLS[:2]
+    assert all(result["status"] in (RESULT_ACCEPTED, RESULT_NEEDS_REVIEW) for result in results)
+    assert all(result["recipe"]["title"] for result in results)
+
+    response, data = request(port, "GET", f"/jobs/{job_id}")
+    assert json.loads(data)["status"] == service.JOB_DONE
+
+
+def test_live_jobs_are_not_evicted(running_service, monkeypatch):
+    recipe_service, port, gate = running_service
+    monkeypatch.setattr(service, "MAX_RETAINED_JOBS", 1)
+
+    first = json.loads(request(port, "POST", "/jobs", {"urls": URLS[:1]})[1])["jobId"]
+    second = json.loads(request(port, "POST", "/jobs", {"urls": URLS[1:2]})[1])["jobId"]
+
+    # Neither job has finished, so both stay pollable
+    assert request(port, "GET", f"/jobs/{first}")[0].status == 200
+    assert request(port, "GET", f"/jobs/{second}")[0].status == 200
+
+
+def test_job_runs_once_a_url_is_taken(running_service):
+    recipe_service, port, gate = running_service
+    job_id = json.loads(request(port, "POST", "/jobs", {"urls": URLS[:1]})[1])["jobId"]
+
+    deadline = time.monotonic() + 5
+    while recipe_service.limiter.in_flight == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Still waiting on the backend, no result yet
+    assert json.loads(request(port, "GET", f"/jobs/{job_id}")[1])["status"] == service.JOB_RUNNING
+
+
+def test_failure_after_release_keeps_the_limiter_count(running_service, monkeypatch):
+    recipe_service, port, gate = running_service
+    gate.set()
+
+    def broken_observe(*args):
+        raise RuntimeError("estimator broke")
+
+    monkeypatch.setattr(recipe_service.estimator, "observe", broken_observe)
+    job_id = json.loads(request(port, "POST", "/jobs", {"urls": URLS[:1]})[1])["jobId"]
+    results = [json.loads(line) for line in request(port, "GET", f"/jobs/{job_id}/results")[1].splitlines()]
+
+    assert [result["status"] for result in results] == ["error"]
+    assert recipe_service.limiter.in_flight == 0
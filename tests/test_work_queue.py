@@ -0,0 +1,108 @@
+"""Work queue: adaptive workers, throttled jobs and the export command"""
+
+import json
+import sqlite3
+import threading
+from collections import Counter
+
+import work_queue
+from config import AVAILABLE_TAGS, select_tiers
+from export_writer import open_export_reader
+from fake_backend import fake_call_gemini_api
+from work_queue import WorkQueue, run_worker, JOB_DONE
+
+URLS = [f"https://www.youtube.com/watch?v=wrk{i:08d}" for i in range(6)]
+
+
+def test_throttled_jobs_are_retried_without_using_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(work_queue, "THROTTLE_RETRY_SECONDS", 0.0)
+    calls = Counter()
+    lock = threading.Lock()
+
+    def throttling_backend(video_url, *args, **kwargs):
+        with lock:
+            calls[video_url] += 1
+            throttled = calls[video_url] <= 2
+        if throttled:
+            raise RuntimeError("429 Resource has been exhausted")
+        return fake_call_gemini_api(video_url, *args, **kwargs)
+
+    path = tmp_path / "jobs.db"
+    queue = WorkQueue(path)
+    assert queue.enqueue(URLS) == len(URLS)
+
+    limiter = run_worker(path, AVAILABLE_TAGS, "fake", throttling_backend,
+                         concurrency=2, max_concurrency=4, poll_interval=0.01)
+
+    assert queue.counts() == {JOB_DONE: len(URLS)}
+    rows = queue._connect().execute("SELECT attempts, throttles FROM jobs").fetchall()
+    assert rows == [(1, 2)] * len(URLS)
+    assert limiter.in_flight == 0
+    assert limiter.decreases["throttled"] >= 1
+
+
+def test_export_streams_completed_recipes(tmp_path):
+    path = tmp_path / "jobs.db"
+    queue = WorkQueue(path)
+    queue.enqueue(URLS)
+    run_worker(path, AVAILABLE_TAGS, "fake", fake_call_gemini_api, poll_interval=0.01)
+    accepted = [result["recipe"]["recipeId"] for result in queue.results() if result["status"] == "accepted"]
+
+    output = tmp_path / "recipes.jsonl.gz"
+    assert work_queue.main(["--queue", str(path), "export", str(output)]) == 0
+    with open_export_reader(output) as f:
+        assert [json.loads(line)["recipeId"] for line in f] == accepted
+
+    assert work_queue.main(["--queue", str(path), "export", str(tmp_path / "all.jsonl"), "--include-review"]) == 0
+    assert len((tmp_path / "all.jsonl").read_text(encoding="utf-8").splitlines()) == len(URLS)
+
+
+def test_workers_use_transcripts_and_tiers(tmp_path):
+    transcripts = tmp_path / "subs"
+    transcripts.mkdir()
+    (transcripts / f"{URLS[0][-11:]}.txt").write_text("Amestecăm făina cu ouăle și coacem 20 de minute.",
+                                                      encoding="utf-8")
+    calls = {}
+
+    def recording_backend(video_url, *args, transcript=None, model_name=None, **kwargs):
+        calls[video_url] = (transcript is not None, model_name)
+        return fake_call_gemini_api(video_url, *args, transcript=transcript, model_name=model_name, **kwargs)
+
+    path = tmp_path / "jobs.db"
+    WorkQueue(path).enqueue(URLS[:2])
+    assert work_queue.main(["--queue", str(path), "work", "--fake-backend", "--tiers", "fast,huge"]) == 1
+    run_worker(path, AVAILABLE_TAGS, "fake", recording_backend, poll_interval=0.01,
+               transcript_dir=transcripts, tiers=select_tiers("strong"))
+
+    strong = select_tiers("strong")[0]["model"]
+    assert calls == {URLS[0]: (True, strong), URLS[1]: (False, strong)}
+
+
+def test_worker_survives_job_errors(tmp_path, monkeypatch):
+    process_url = work_queue.process_url
+    complete = WorkQueue.complete
+    broken = {URLS[1]: ValueError("broken video"), URLS[2]: sqlite3.OperationalError("database is locked")}
+
+    def flaky_process_url(url, *args, **kwargs):
+        if isinstance(broken.get(url), ValueError):
+            raise broken.pop(url)
+        return process_url(url, *args, **kwargs)
+
+    def flaky_complete(self, video_id, *args):
+        error = broken.pop(f"https://www.youtube.com/watch?v={video_id}", None)
+        if error is not None:
+            raise error
+        return complete(self, video_id, *args)
+
+    monkeypatch.setattr(work_queue, "process_url", flaky_process_url)
+    monkeypatch.setattr(WorkQueue, "complete", flaky_complete)
+    path = tmp_path / "jobs.db"
+    queue = WorkQueue(path)
+    queue.enqueue(URLS)
+
+    # A single worker thread: had it died, jobs would be left behind
+    limiter = run_worker(path, AVAILABLE_TAGS, "fake", fake_call_gemini_api, poll_interval=0.01)
+
+    assert not broken
+    assert queue.counts() == {JOB_DONE: len(URLS)}
+    assert limiter.in_flight == 0
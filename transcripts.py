@@ -0,0 +1,244 @@
+"""
+Transcripts Module
+Local subtitle lookup, cleaning and compaction for the transcript-first extraction path
+"""
+
+import html
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import VIDEO_TOKENS_PER_SECOND
+
+# Extraction paths reported on each result
+SOURCE_TRANSCRIPT = "transcript"
+SOURCE_VIDEO = "video"
+
+# Searched in this order: <id>.vtt, <id>.srt, <id>.txt, then language-tagged <id>.<lang>.vtt/.srt
+TRANSCRIPT_SUFFIXES = (".vtt", ".srt", ".txt")
+
+# Speaking rate used to estimate the duration of plain-text transcripts
+WORDS_PER_SECOND = 2.5
+
+# Recently kept lines compared against, to drop rolling caption repeats
+DUPLICATE_WINDOW = 3
+
+# Bytes read from the end of a caption file to find its last cue
+PROBE_TAIL_BYTES = 4096
+
+_CUE_TIMING_RE = re.compile(
+    r'^\s*(?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3}\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})'
+)
+_INLINE_TAG_RE = re.compile(r'<[^>]*>')
+_ANNOTATION_RE = re.compile(r'\[[^\]]*\]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_VTT_BLOCKS = ("WEBVTT", "NOTE", "STYLE", "REGION")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+
+class Transcript:
+    """A cleaned, compacted transcript of one video"""
+
+    __slots__ = ("video_id", "path", "text", "raw_chars", "duration")
+
+    def __init__(self, video_id: str, path: Path, text: str, raw_chars: int, duration: float):
+        self.video_id = video_id
+        self.path = path
+        self.text = text
+        self.raw_chars = raw_chars
+        self.duration = duration
+
+    @property
+    def estimated_video_tokens(self) -> int:
+        """Tokens Gemini would bill for analysing the video itself"""
+        return int(self.duration * VIDEO_TOKENS_PER_SECOND)
+
+
+def find_transcript(video_id: str, transcript_dir) -> Optional[Path]:
+    """Return the transcript file of a video, or None"""
+    directory = Path(transcript_dir)
+    for suffix in TRANSCRIPT_SUFFIXES:
+        path = directory / f"{video_id}{suffix}"
+        if path.is_file():
+            return path
+    for suffix in TRANSCRIPT_SUFFIXES[:2]:
+        matches = sorted(directory.glob(f"{video_id}.*{suffix}"))
+        if matches:
+            return matches[0]
+    return None
+
+
+def clean_captions(raw: str) -> Tuple[str, float]:
+    """
+    Strip a WebVTT/SRT file down to its spoken text
+
+    Cue numbers, timings, header/NOTE/STYLE blocks, inline tags and
+    [annotations] are removed; lines repeated by rolling auto-captions are
+    dropped.
+
+    Returns:
+        tuple: (compacted text, duration in seconds from the last cue end)
+    """
+    kept: List[str] = []
+    recent = deque(maxlen=DUPLICATE_WINDOW)
+    duration = 0.0
+    skipping_block = False
+
+    for line in raw.splitlines():
+        line = line.strip()
+        if not line:
+            skipping_block = False
+            continue
+        if skipping_block:
+            continue
+        if line.startswith(_VTT_BLOCKS):
+            skipping_block = True
+            continue
+
+        timing = _CUE_TIMING_RE.match(line)
+        if timing:
+            hours, minutes, seconds, millis = timing.groups()
+            duration = max(duration, int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+                           + int(millis.ljust(3, "0")) / 1000)
+            continue
+        if line.isdigit():
+            continue
+
+        text = html.unescape(_INLINE_TAG_RE.sub("", line))
+        text = _WHITESPACE_RE.sub(" ", _ANNOTATION_RE.sub("", text)).strip()
+        if not text or text in recent:
+            continue
+        recent.append(text)
+        kept.append(text)
+
+    return " ".join(kept), duration
+
+
+def clean_plain_text(raw: str) -> str:
+    """Collapse whitespace and drop repeated lines of a plain-text transcript"""
+    kept: List[str] = []
+    recent = deque(maxlen=DUPLICATE_WINDOW)
+    for line in raw.splitlines():
+        text = _WHITESPACE_RE.sub(" ", line).strip()
+        if not text or text in recent:
+            continue
+        recent.append(text)
+        kept.append(text)
+    return " ".join(kept)
+
+
+def probe_duration(path: Path) -> Optional[float]:
+    """
+    Video length in seconds from a transcript file, without cleaning it
+
+    Caption files are read from the end: the last cue timing gives the
+    duration. Plain-text transcripts are estimated from their word count.
+    """
+    path = Path(path)
+    try:
+        if path.suffix.lower() == ".txt":
+            words = len(path.read_text(encoding="utf-8-sig", errors="replace").split())
+            return words / WORDS_PER_SECOND if words else None
+
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            f.seek(max(0, f.tell() - PROBE_TAIL_BYTES))
+            tail = f.read().decode("utf-8", errors="replace")
+    except OSError:
+        return None
+
+    for line in reversed(tail.splitlines()):
+        timing = _CUE_TIMING_RE.match(line)
+        if timing:
+            hours, minutes, seconds, millis = timing.groups()
+            return (int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+                    + int(millis.ljust(3, "0")) / 1000)
+    return None
+
+
+def load_transcript(video_id: str, transcript_dir) -> Optional[Transcript]:
+    """
+    Find, clean and compact the local transcript of a video
+
+    Args:
+        video_id: YouTube video ID
+        transcript_dir: Directory with <video_id>.vtt / .srt / .txt files
+
+    Returns:
+        Transcript, or None when no usable transcript exists
+    """
+    path = find_transcript(video_id, transcript_dir)
+    if path is None:
+        return None
+
+    raw = path.read_text(encoding="utf-8-sig", errors="replace")
+    if path.suffix.lower() == ".txt":
+        text = clean_plain_text(raw)
+        duration = len(text.split()) / WORDS_PER_SECOND
+    else:
+        text, duration = clean_captions(raw)
+
+    if not text:
+        return None
+    return Transcript(video_id, path, text, len(raw), duration)
+
+
+class SavingsTracker:
+    """
+    Token and latency savings of the transcript path, per recipe and per run.
+
+    Token savings compare the tokens of the compacted transcript with the
+    tokens of analysing the video (its duration times
+    VIDEO_TOKENS_PER_SECOND); the rest of the prompt is the same on both
+    paths. Latency savings compare against the average latency of the
+    video path observed in the same run.
+    """
+
+    def __init__(self):
+        self.transcript_count = 0
+        self.transcript_seconds = 0.0
+        self.video_count = 0
+        self.video_seconds = 0.0
+        self.tokens_saved = 0
+
+    def record(self, source: str, elapsed: float, usage: Dict) -> str:
+        """
+        Account for one successful extraction
+
+        Returns:
+            str: Short per-recipe note for the progress log
+        """
+        if source != SOURCE_TRANSCRIPT:
+            self.video_count += 1
+            self.video_seconds += elapsed
+            return "video"
+
+        self.transcript_count += 1
+        self.transcript_seconds += elapsed
+
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        video_tokens = usage.get("estimated_video_tokens", 0)
+        saved = max(0, video_tokens - usage.get("transcript_tokens", 0))
+        self.tokens_saved += saved
+
+        note = f"transcript, {prompt_tokens} tokens, ~{saved} saved vs video"
+        if self.video_count:
+            note += f", {self.video_seconds / self.video_count - elapsed:+.1f}s vs video avg"
+        return note
+
+    def summary(self) -> str:
+        """One-line report for the end of a run"""
+        if not self.transcript_count:
+            return f"Transcript path not used ({self.video_count} video extractions)"
+
+        text = (f"Transcript path: {self.transcript_count} recipes, ~{self.tokens_saved} tokens saved "
+                f"(~{self.tokens_saved // self.transcript_count}/recipe), "
+                f"avg {self.transcript_seconds / self.transcript_count:.1f}s")
+        if self.video_count:
+            text += f" vs {self.video_seconds / self.video_count:.1f}s on the video path ({self.video_count})"
+        return text
@@ -0,0 +1,94 @@
+"""
+URL Ingestion Module
+Streaming extraction of YouTube video IDs from text boxes, text files and CSV files
+"""
+
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO, Tuple
+
+from gemini_service import YOUTUBE_VIDEO_ID_RE
+
+
+def canonical_url(video_id: str) -> str:
+    """Return the canonical watch URL of a video ID"""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def open_url_file(path) -> Iterator[str]:
+    """
+    Lazily yield the lines of a text or CSV URL file
+
+    The header row of a CSV file is blanked out when it contains no YouTube URL.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            header = next(f, None)
+            if header is not None:
+                # A blank line keeps the line numbers of the reject file aligned
+                yield header if YOUTUBE_VIDEO_ID_RE.search(header) else ""
+        yield from f
+
+
+class UrlIngestor:
+    """
+    Generator pipeline turning raw lines into unique (video_id, url) pairs.
+
+    Every line is matched once against the precompiled video ID regex, so
+    a URL can sit alone on a line or anywhere inside a CSV row. Blank lines
+    and lines starting with '#' are skipped, repeated video IDs are dropped
+    and lines without a YouTube URL are appended to the reject file (opened
+    on the first reject) instead of being reported one by one. Counters are
+    available once the iteration has finished.
+    """
+
+    def __init__(self, lines: Iterable[str], reject_path=None):
+        self.lines = lines
+        self.reject_path = Path(reject_path) if reject_path else None
+        self.accepted = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self._reject_file: Optional[TextIO] = None
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        search = YOUTUBE_VIDEO_ID_RE.search
+        seen = set()
+        try:
+            for line_number, line in enumerate(self.lines, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+
+                match = search(line)
+                if match is None:
+                    self._reject(line_number, line)
+                    continue
+
+                video_id = match.group(1)
+                if video_id in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(video_id)
+
+                self.accepted += 1
+                yield video_id, canonical_url(video_id)
+        finally:
+            if self._reject_file is not None:
+                self._reject_file.close()
+                self._reject_file = None
+
+    def _reject(self, line_number: int, line: str):
+        self.rejected += 1
+        if self.reject_path is None:
+            return
+        if self._reject_file is None:
+            self.reject_path.parent.mkdir(parents=True, exist_ok=True)
+            self._reject_file = open(self.reject_path, "a", encoding="utf-8")
+        self._reject_file.write(f"{line_number}\t{line}\n")
+
+    def summary(self) -> str:
+        """One-line report of the ingestion counters"""
+        text = f"{self.accepted} URLs, {self.duplicates} duplicates, {self.rejected} rejected"
+        if self.rejected and self.reject_path:
+            text += f" (see {self.reject_path})"
+        return text
@@ -0,0 +1,464 @@
+"""
+Work Queue Module
+Durable SQLite-backed job queue with leases, for multi-process / multi-host workers
+
+Usage:
+    python work_queue.py enqueue --queue /shared/jobs.db urls.txt
+    python work_queue.py work --queue /shared/jobs.db --concurrency 4 --max-concurrency 16
+    python work_queue.py work --queue /shared/jobs.db --transcripts /shared/subs --tiers fast,strong
+    python work_queue.py status --queue /shared/jobs.db
+    python work_queue.py export --queue /shared/jobs.db output/recipes.jsonl.zst
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from config import (AVAILABLE_TAGS, WORK_QUEUE_FILE, CONCURRENCY_MAX, EXPORT_SHARD_MAX_BYTES,
+                    EXPORT_SHARD_MAX_RECIPES, MODEL_TIERS, TRANSCRIPT_DIR, ensure_dirs, load_api_key,
+                    select_tiers)
+from concurrency import AdaptiveLimiter, should_retry
+from gemini_service import call_gemini_api, extract_video_id
+from export_writer import ShardedExportWriter
+from recipe_pipeline import process_url, RESULT_ACCEPTED, RESULT_NEEDS_REVIEW
+from url_ingest import UrlIngestor, open_url_file
+
+# Job states
+JOB_PENDING = "pending"
+JOB_LEASED = "leased"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# A lease not renewed within this many seconds is considered abandoned
+LEASE_SECONDS = 300
+HEARTBEAT_INTERVAL = 60
+
+# Jobs that failed this many times are not retried any more
+MAX_ATTEMPTS = 3
+
+# Error recorded for a job whose lease ran out
+LEASE_EXPIRED_ERROR = "lease expired"
+
+# A throttled job is claimable again after this many seconds, doubled per throttle
+THROTTLE_RETRY_SECONDS = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    video_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    throttles INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, updated_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires);
+"""
+
+# Columns added after the first release: name -> definition
+ADDED_COLUMNS = {
+    "throttles": "INTEGER NOT NULL DEFAULT 0",
+    "available_at": "REAL NOT NULL DEFAULT 0"
+}
+
+
+class WorkQueue:
+    """
+    Durable URL job queue shared by any number of worker processes.
+
+    Jobs are keyed by video ID, so enqueueing and completing are
+    idempotent. A worker claims a job by taking a lease (owner, token,
+    expiry) inside a write transaction, renews it with heartbeats while the
+    extraction runs and commits the result only if it still holds the
+    lease. Expired leases are put back to pending on the next claim. A
+    throttled job goes back to pending with a delay and without using up
+    one of its attempts.
+
+    SQLite WAL mode lets readers and the single writer work concurrently;
+    put the database on a volume with working file locks when workers run
+    on several hosts.
+    """
+
+    def __init__(self, db_path, worker_id: Optional[str] = None):
+        self.db_path = str(db_path)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in ADDED_COLUMNS.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql: str, params=()) -> sqlite3.Cursor:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(sql, params)
+            conn.execute("COMMIT")
+            return cursor
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """
+        Add URLs as pending jobs (already known video IDs are ignored)
+
+        Returns:
+            int: Number of new jobs
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (video_id, url, status, updated_at) VALUES (?, ?, ?, ?)",
+                ((extract_video_id(url), url, JOB_PENDING, now) for url in urls)
+            )
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def requeue_expired(self, max_attempts: int = MAX_ATTEMPTS) -> int:
+        """
+        Return abandoned leases to the pending state
+
+        A job whose worker crashed or hung max_attempts times is marked
+        failed instead, so a poison video is not re-leased forever.
+        """
+        now = time.time()
+        return self._write(
+            """UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?,
+               lease_owner = NULL, lease_token = NULL, lease_expires = NULL,
+               updated_at = ? WHERE status = ? AND lease_expires < ?""",
+            (max_attempts, JOB_FAILED, JOB_PENDING, LEASE_EXPIRED_ERROR, now, JOB_LEASED, now)
+        ).rowcount
+
+    def claim(self, lease_seconds: int = LEASE_SECONDS) -> Optional[Dict]:
+        """
+        Lease the next pending job
+
+        Returns:
+            dict with video_id, url, lease_token and throttles (rate limited calls so far),
+            or None if no pending job is due
+        """
+        self.requeue_expired()
+
+        conn = self._connect()
+        now = time.time()
+        token = uuid.uuid4().hex
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """SELECT video_id, url, throttles FROM jobs WHERE status = ? AND available_at <= ?
+                   ORDER BY updated_at LIMIT 1""",
+                (JOB_PENDING, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                """UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_token = ?,
+                   lease_expires = ?, updated_at = ? WHERE video_id = ?""",
+                (JOB_LEASED, self.worker_id, token, now + lease_seconds, now, row[0])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return {"video_id": row[0], "url": row[1], "lease_token": token, "throttles": row[2]}
+
+    def heartbeat(self, video_id: str, lease_token: str, lease_seconds: int = LEASE_SECONDS) -> bool:
+        """Extend a lease; returns False if the lease was lost"""
+        return self._write(
+            "UPDATE jobs SET lease_expires = ? WHERE video_id = ? AND status = ? AND lease_token = ?",
+            (time.time() + lease_seconds, video_id, JOB_LEASED, lease_token)
+        ).rowcount == 1
+
+    def complete(self, video_id: str, lease_token: str, result: Dict) -> bool:
+        """
+        Store the result of a leased job
+
+        Returns:
+            bool: False if the lease expired and another worker owns the job
+        """
+        return self._write(
+            """UPDATE jobs SET status = ?, result = ?, error = NULL, lease_owner = NULL, lease_token = NULL,
+               lease_expires = NULL, updated_at = ? WHERE video_id = ? AND status = ? AND lease_token = ?""",
+            (JOB_DONE, json.dumps(result, ensure_ascii=False), time.time(), video_id, JOB_LEASED, lease_token)
+        ).rowcount == 1
+
+    def fail(self, video_id: str, lease_token: str, error: str, max_attempts: int = MAX_ATTEMPTS) -> bool:
+        """Record a failure; the job goes back to pending until max_attempts is reached"""
+        return self._write(
+            """UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?,
+               lease_owner = NULL, lease_token = NULL, lease_expires = NULL, updated_at = ?
+               WHERE video_id = ? AND status = ? AND lease_token = ?""",
+            (max_attempts, JOB_FAILED, JOB_PENDING, error, time.time(), video_id, JOB_LEASED, lease_token)
+        ).rowcount == 1
+
+    def retry_later(self, video_id: str, lease_token: str, error: str, delay: float) -> bool:
+        """Put a rate limited job back to pending after `delay` seconds; the attempt is not counted"""
+        now = time.time()
+        return self._write(
+            """UPDATE jobs SET status = ?, attempts = attempts - 1, throttles = throttles + 1, available_at = ?,
+               error = ?, lease_owner = NULL, lease_token = NULL, lease_expires = NULL, updated_at = ?
+               WHERE video_id = ? AND status = ? AND lease_token = ?""",
+            (JOB_PENDING, now + delay, error, now, video_id, JOB_LEASED, lease_token)
+        ).rowcount == 1
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per state"""
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def results(self) -> Iterable[Dict]:
+        """Yield the stored result of every completed job"""
+        cursor = self._connect().execute(
+            "SELECT result FROM jobs WHERE status = ? ORDER BY updated_at", (JOB_DONE,)
+        )
+        for (result,) in cursor:
+            yield json.loads(result)
+
+
+def _run_job(queue: WorkQueue, job: Dict, available_tags: list, api_key: str, extract_fn,
+             limiter: AdaptiveLimiter, token, transcript_dir=None, tiers: Optional[List[Dict]] = None):
+    """Process one leased job, renewing the lease while the extraction runs"""
+    stop = threading.Event()
+
+    def keep_alive():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            if not queue.heartbeat(job["video_id"], job["lease_token"]):
+                return
+
+    heartbeat = threading.Thread(target=keep_alive, daemon=True)
+    heartbeat.start()
+    try:
+        result = process_url(job["url"], available_tags, api_key, extract_fn, transcript_dir, tiers)
+    except Exception:
+        limiter.release(token, 0.0, error=True)
+        raise
+    finally:
+        stop.set()
+        heartbeat.join()
+    limiter.release_result(token, result)
+
+    if result.status in (RESULT_ACCEPTED, RESULT_NEEDS_REVIEW):
+        committed = queue.complete(job["video_id"], job["lease_token"], {
+            "status": result.status,
+            "recipe": result.recipe
+        })
+        label = "ok" if result.status == RESULT_ACCEPTED else "review"
+    elif should_retry(result, job["throttles"]):
+        # Rate limited, not broken: back to pending once the limiter has backed off
+        delay = THROTTLE_RETRY_SECONDS * 2 ** job["throttles"]
+        committed = queue.retry_later(job["video_id"], job["lease_token"], result.message, delay)
+        label = f"throttled, retry in {delay:.0f}s"
+    else:
+        committed = queue.fail(job["video_id"], job["lease_token"], result.message)
+        label = "failed"
+
+    if not committed:
+        label = "lease-lost"
+    print(f"[{label}] {job['video_id']} ({result.elapsed:.1f}s)", file=sys.stderr, flush=True)
+
+
+def run_worker(queue_path, available_tags: list, api_key: str, extract_fn=call_gemini_api,
+               concurrency: int = 1, max_concurrency: Optional[int] = None,
+               exit_when_empty: bool = True, poll_interval: float = 5.0,
+               transcript_dir=None, tiers: Optional[List[Dict]] = None) -> AdaptiveLimiter:
+    """
+    Claim and process jobs until the queue is drained
+
+    Args:
+        queue_path: SQLite queue database (shared between workers)
+        available_tags: List of allowed tags
+        api_key: Google Gemini API key
+        extract_fn: Extraction backend with the call_gemini_api signature
+        concurrency: Jobs processed in parallel by this process at the start
+        max_concurrency: Upper bound of the adaptive concurrency (None keeps `concurrency` fixed)
+        exit_when_empty: Stop when no pending or leased job is left (otherwise keep polling)
+        poll_interval: Seconds between polls of a queue with nothing due
+        transcript_dir: Directory with local <video_id>.vtt / .srt / .txt transcripts
+        tiers: Model cascade (default: MODEL_TIERS)
+
+    Returns:
+        AdaptiveLimiter: The limiter, for its report
+    """
+    def log_limit(old, new, reason):
+        print(f"[concurrency] {old} -> {new} ({reason})", file=sys.stderr, flush=True)
+
+    def log_error(subject, error: Exception):
+        print(f"[error] {subject}: {error}", file=sys.stderr, flush=True)
+
+    limiter = AdaptiveLimiter(concurrency, max_limit=max_concurrency or concurrency,
+                              adaptive=max_concurrency is not None, on_change=log_limit)
+    # Signalled whenever a slot is given back or the limit may have changed
+    capacity = threading.Condition()
+
+    def loop():
+        queue = WorkQueue(queue_path)
+        while True:
+            with capacity:
+                token = limiter.try_acquire()
+                while token is None:
+                    capacity.wait()
+                    token = limiter.try_acquire()
+            try:
+                try:
+                    job = queue.claim()
+                except sqlite3.Error as e:
+                    # Contention on a shared database: try again on the next poll
+                    log_error("claim", e)
+                    job = None
+                if job is not None:
+                    try:
+                        _run_job(queue, job, available_tags, api_key, extract_fn, limiter, token,
+                                 transcript_dir, tiers)
+                    except Exception as e:
+                        # One broken job must not cost the process a worker (the token is already released)
+                        log_error(job["video_id"], e)
+                        try:
+                            queue.fail(job["video_id"], job["lease_token"], str(e))
+                        except sqlite3.Error:
+                            pass  # the lease expires and the job is claimed again
+                    continue
+                limiter.cancel(token)
+            finally:
+                with capacity:
+                    capacity.notify_all()
+
+            try:
+                counts = queue.counts()
+            except sqlite3.Error as e:
+                log_error("status", e)
+            else:
+                if exit_when_empty and not counts.get(JOB_LEASED) and not counts.get(JOB_PENDING):
+                    return
+            time.sleep(poll_interval)
+
+    threads = [threading.Thread(target=loop) for _ in range(limiter.max_limit)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return limiter
+
+
+def _read_lines(paths: List[str]) -> Iterable[str]:
+    if not paths or paths == ["-"]:
+        yield from sys.stdin
+        return
+    for path in paths:
+        yield from open_url_file(path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Durable multi-worker recipe extraction queue")
+    parser.add_argument("--queue", default=str(WORK_QUEUE_FILE),
+                        help=f"Queue database (default: {WORK_QUEUE_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Add URLs from files or stdin")
+    enqueue.add_argument("files", nargs="*", help="Text or CSV URL files ('-' or nothing for stdin)")
+    enqueue.add_argument("--rejects", default=None, help="File for input lines without a YouTube URL")
+
+    work = commands.add_parser("work", help="Claim and process jobs")
+    work.add_argument("--concurrency", "-c", type=int, default=1,
+                      help="Parallel jobs in this process at the start, adapted to latency and throttling")
+    work.add_argument("--max-concurrency", type=int, default=CONCURRENCY_MAX,
+                      help=f"Upper bound of the adaptive concurrency (default: {CONCURRENCY_MAX})")
+    work.add_argument("--fixed-concurrency", action="store_true",
+                      help="Keep --concurrency fixed instead of adapting it")
+    work.add_argument("--transcripts", default=str(TRANSCRIPT_DIR),
+                      help="Directory with <video_id>.vtt/.srt/.txt transcripts used instead of video analysis "
+                           f"(default: {TRANSCRIPT_DIR})")
+    work.add_argument("--tiers", default=None,
+                      help="Comma separated model tiers to cascade through "
+                           f"(default: {','.join(tier['name'] for tier in MODEL_TIERS)})")
+    work.add_argument("--api-key", default=None, help="Gemini API key")
+    work.add_argument("--follow", action="store_true", help="Keep polling when the queue is empty")
+    work.add_argument("--fake-backend", action="store_true",
+                      help="Use the deterministic local fake instead of Gemini")
+
+    commands.add_parser("status", help="Show job counts per state")
+
+    export = commands.add_parser("export", help="Stream the recipes of completed jobs to an export file")
+    export.add_argument("output", help="Export file (.json, .jsonl, optionally .gz/.zst)")
+    export.add_argument("--include-review", action="store_true",
+                        help="Also export recipes generated without a transcript")
+
+    args = parser.parse_args(argv)
+    ensure_dirs()
+    queue = WorkQueue(args.queue)
+
+    if args.command == "enqueue":
+        ingestor = UrlIngestor(_read_lines(args.files), args.rejects)
+        added = queue.enqueue(url for _, url in ingestor)
+        print(f"Enqueued {added} new jobs ({ingestor.summary()})", file=sys.stderr)
+    elif args.command == "status":
+        print(json.dumps(queue.counts()))
+    elif args.command == "export":
+        statuses = {RESULT_ACCEPTED, RESULT_NEEDS_REVIEW} if args.include_review else {RESULT_ACCEPTED}
+        writer = ShardedExportWriter(args.output, max_bytes=EXPORT_SHARD_MAX_BYTES,
+                                     max_recipes=EXPORT_SHARD_MAX_RECIPES)
+        with writer:
+            writer.write_all(result["recipe"] for result in queue.results() if result["status"] in statuses)
+        print(f"Exported {writer.count} recipes to {', '.join(str(shard) for shard in writer.shards)}",
+              file=sys.stderr)
+    else:
+        try:
+            tiers = select_tiers(args.tiers)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        transcript_dir = args.transcripts if args.transcripts and os.path.isdir(args.transcripts) else None
+        if args.fake_backend:
+            from fake_backend import fake_call_gemini_api
+            extract_fn, api_key = fake_call_gemini_api, "fake"
+        else:
+            extract_fn = call_gemini_api
+            api_key = args.api_key or os.getenv("GEMINI_API_KEY") or load_api_key()
+            if not api_key:
+                print("Error: no Gemini API key (use --api-key or GEMINI_API_KEY)", file=sys.stderr)
+                return 1
+        limiter = run_worker(args.queue, AVAILABLE_TAGS, api_key, extract_fn, concurrency=args.concurrency,
+                             max_concurrency=None if args.fixed_concurrency else args.max_concurrency,
+                             exit_when_empty=not args.follow, transcript_dir=transcript_dir, tiers=tiers)
+        for line in limiter.report():
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())